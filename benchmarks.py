@@ -0,0 +1,414 @@
+"""
+Benchmarks
+Micro-benchmarks for the hot paths of the dashboard, run as `python benchmarks.py <name>`
+"""
+
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from data_loader import load_data
+
+
+# Cold import budget of the app's own modules per view, on top of streamlit/pandas/numpy
+IMPORT_BUDGET_MS = {
+    'Smart Opportunities': 150,
+    'Relationship Health': 150,
+    'Data View': 250,
+    'Analytics': 300
+}
+ENTRY_COMPILE_BUDGET_MS = 5
+
+_IMPORT_PROBE = """
+import importlib, sys, time
+import numpy, pandas, streamlit
+start = time.perf_counter()
+for module in sys.argv[1:]:
+    importlib.import_module(module)
+print((time.perf_counter() - start) * 1000, 'plotly.express' in sys.modules)
+"""
+
+
+def demo_imports():
+    """Modules demo-1 imports at start and in each branch of its view dispatch (the else branch is Smart Opportunities)"""
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "demo-1.py"), encoding="utf-8") as handle:
+        tree = ast.parse(handle.read())
+
+    def imported(statements):
+        return sorted({node.module for statement in statements for node in ast.walk(statement)
+                       if isinstance(node, ast.ImportFrom)})
+
+    entry = imported(node for node in tree.body if isinstance(node, ast.ImportFrom))
+    views = {}
+    branch = next(node for node in tree.body if isinstance(node, ast.If) and isinstance(node.test, ast.Compare)
+                  and getattr(node.test.left, "id", None) == "view_mode")
+    while isinstance(branch, ast.If):
+        views[branch.test.comparators[0].value] = imported(branch.body)
+        if len(branch.orelse) == 1 and isinstance(branch.orelse[0], ast.If):
+            branch = branch.orelse[0]
+        else:
+            views['Smart Opportunities'] = imported(branch.orelse)
+            break
+    return entry, views
+
+
+def _timed(function, repeat):
+    """Best wall time of a call over repeat runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_templates(n_clients, repeat):
+    """Opportunity script throughput: per-row generate_script vs columnar template rendering"""
+    from message_templates import render_opportunity_scripts
+    from utils import generate_script
+
+    df = load_data(n_clients, compact=True)
+    names = df["Client Name"].astype(str).to_numpy(dtype=object)
+    tags = df["Opportunity Tag"].astype(str).to_numpy(dtype=object)
+    giro = df["Avg Giro Balance (M)"].to_numpy(dtype=float)
+
+    def per_row():
+        return [generate_script(name, tag, balance) for name, tag, balance in zip(names, tags, giro)]
+
+    def columnar():
+        return render_opportunity_scripts(names, tags, giro)
+
+    assert per_row() == columnar()
+    for label, function in [("generate_script (per row)", per_row), ("render_opportunity_scripts", columnar)]:
+        seconds = _timed(function, repeat)
+        print(f"{label:<30} {seconds:7.3f}s  {n_clients / seconds:12,.0f} scripts/s")
+
+
+def bench_llm(n_clients, repeat):
+    """Analysis backend latency against a local stub model server: p50/p95 per pass"""
+    from llm_backend import AnalysisClient, serve_stub
+
+    df = load_data(n_clients, compact=True)
+    rows = [row for _, row in df.iterrows()]
+    server = serve_stub(delay_ms=200)
+    client = AnalysisClient(server.url)
+    try:
+        for run in range(repeat):
+            client._latencies.clear()
+            start = time.perf_counter()
+            client.analyze_many(rows)
+            stats = client.stats()
+            print(f"pass {run + 1}: {time.perf_counter() - start:6.2f}s  p50 {stats['p50']:7.1f}ms  "
+                  f"p95 {stats['p95']:7.1f}ms  batches {stats['batches']}  fallbacks {stats['fallbacks']}  "
+                  f"cache hit {stats['cache_hit_rate']*100:.0f}%")
+    finally:
+        client.close()
+        server.shutdown()
+
+
+def _tree_nodes(node):
+    """Every element and block below an AppTest node"""
+    yield node
+    for child in getattr(node, "children", {}).values():
+        yield from _tree_nodes(child)
+
+
+def _checked_run(app):
+    """Run an AppTest and stop if the script raised, so a broken run never reports timings"""
+    app.run()
+    if app.exception:
+        raise SystemExit(f"demo-1.py raised: {app.exception[0].value}")
+    return app
+
+
+def _top_lead():
+    """Client ID of the best lead in the configured client store"""
+    from dataset_cache import get_dataset
+    from lead_index import get_lead_index
+
+    return int(get_dataset().iloc[get_lead_index().top_k(1)]["Client ID"].iloc[0])
+
+
+def bench_leads(n_clients, repeat):
+    """Priority lead index: top K vs nlargest, and incremental update vs rebuild after re-valuing 1% of clients"""
+    from lead_index import LeadIndex
+    from rules_engine import GIRO_COLUMN, apply_opportunity_rules, target_tags
+
+    df = load_data(n_clients, compact=True)
+    index = LeadIndex(df)
+    rng = np.random.default_rng(42)
+    k = 50
+
+    def nlargest(frame):
+        leads = frame[frame["Opportunity Tag"].isin(target_tags())]
+        return leads.nlargest(k, "Potential Value (M)").index.to_numpy()
+
+    update_seconds = rebuild_seconds = 0.0
+    for _ in range(repeat):
+        # Re-value 1% of the clients; the rules re-tag the ones crossing a threshold
+        changed = rng.choice(n_clients, max(1, n_clients // 100), replace=False)
+        giro = df[GIRO_COLUMN].to_numpy().copy()
+        giro[changed] = rng.choice(giro, len(changed))
+        df = apply_opportunity_rules(df.assign(**{GIRO_COLUMN: giro}))
+
+        start = time.perf_counter()
+        index.update(df, index.changed_rows(df))
+        update_seconds += time.perf_counter() - start
+        start = time.perf_counter()
+        rebuilt = LeadIndex(df)
+        rebuild_seconds += time.perf_counter() - start
+
+        assert np.array_equal(index.top_k(k), nlargest(df)), "updated index disagrees with nlargest"
+        assert all(np.array_equal(index._positions[tag], rebuilt._positions[tag]) for tag in index.tags)
+
+    print(f"{'LeadIndex.update (1% changed)':<30} {update_seconds / repeat * 1000:9.2f}ms")
+    print(f"{'LeadIndex rebuild':<30} {rebuild_seconds / repeat * 1000:9.2f}ms")
+    print(f"{'top_k':<30} {_timed(lambda: index.top_k(k), repeat) * 1000:9.2f}ms")
+    print(f"{'nlargest':<30} {_timed(lambda: nlargest(df), repeat) * 1000:9.2f}ms")
+
+
+def bench_messages(n_clients, repeat):
+    """Delta messages and bytes one run of each demo-1 view sends to the browser (reads the configured client store)"""
+    import logging
+    from streamlit.testing.v1 import AppTest
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    top_lead = _top_lead()
+    print(f"{'view':<22} {'messages':>9} {'markdown':>9} {'KB':>9}")
+    for view in ["Smart Opportunities", "Relationship Health", "Data View", "Analytics"]:
+        app = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "demo-1.py"),
+                                default_timeout=600)
+        app.run()
+        # The Co-Pilot panel of the best lead is open, as after clicking it
+        app.session_state["selected_client"] = top_lead
+        app.sidebar.radio[0].set_value(view)
+        app.run()
+        nodes = [node for node in _tree_nodes(app._tree) if getattr(node, "proto", None) is not None]
+        size = sum(node.proto.ByteSize() for node in nodes)
+        markdown = sum(1 for node in nodes if node.type == "markdown")
+        print(f"{view:<22} {len(nodes):9d} {markdown:9d} {size / 1024:9.1f}")
+
+
+def bench_figures(n_clients, repeat):
+    """Analytics and Data View run time with a cold figure cache vs every figure cached (reads the configured client store)"""
+    import logging
+    from streamlit.testing.v1 import AppTest
+    from figure_cache import clear_figure_cache, figure_cache_stats
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    print(f"{'view':<22} {'cold':>10} {'cached':>10}")
+    for view in ["Analytics", "Data View"]:
+        app = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "demo-1.py"),
+                                default_timeout=600)
+        app.run()
+        app.sidebar.radio[0].set_value(view)
+        cold, cached = [], []
+        for _ in range(repeat):
+            clear_figure_cache()
+            _checked_run(app)
+            cold.append(app.session_state['render_timings']['app'])
+            _checked_run(app)
+            cached.append(app.session_state['render_timings']['app'])
+        print(f"{view:<22} {np.median(cold):8.1f}ms {np.median(cached):8.1f}ms")
+    stats = figure_cache_stats()
+    print(f"figure cache: {stats['entries']} figures, {stats['bytes'] / 1024:,.1f} KB, hit rate {stats['hit_rate']*100:.0f}%")
+
+
+def bench_heatmap(n_clients, repeat):
+    """Analytics heat map per chart mode: figure build time and the JSON the browser receives"""
+    from components.analytics import _binned_heat_map, _heat_map_mode, _scatter_heat_map
+
+    df = load_data(n_clients, compact=True)
+    builders = [
+        ("svg scatter", lambda: _scatter_heat_map(df, 'svg')),
+        ("webgl scatter", lambda: _scatter_heat_map(df, 'webgl')),
+        ("binned", lambda: _binned_heat_map(df))
+    ]
+    print(f"{n_clients:,} clients, mode used by the view: {_heat_map_mode(n_clients)}")
+    for label, build in builders:
+        seconds = _timed(build, repeat)
+        size = len(build().to_json())
+        print(f"{label:<30} {seconds * 1000:9.1f}ms  {size / 1024:12,.1f} KB")
+
+    # The view itself, on the configured client store
+    import logging
+    from streamlit.testing.v1 import AppTest
+    from figure_cache import clear_figure_cache
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    app = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "demo-1.py"), default_timeout=600)
+    app.run()
+    app.sidebar.radio[0].set_value("Analytics")
+    runs = []
+    for _ in range(repeat):
+        clear_figure_cache()
+        _checked_run(app)
+        runs.append(app.session_state['render_timings']['app'])
+    heat_map = json.loads([node.proto.spec for node in _tree_nodes(app._tree)
+                           if getattr(node, "type", None) == "plotly_chart" and "Hari Sejak Kontak" in node.proto.spec][0])
+    print(f"Analytics view on the client store: {np.median(runs):.1f}ms per run, heat map "
+          f"{heat_map['data'][0]['type']} {len(json.dumps(heat_map)) / 1024:,.1f} KB")
+
+
+def bench_pipeline(n_clients, repeat):
+    """Pipeline store at scale: batched write throughput and query latency over 20 updates per client"""
+    import tempfile
+    from config import PIPELINE_STATUSES
+    from pipeline_store import PipelineStore
+
+    n_events = 20 * n_clients
+    rng = np.random.default_rng(42)
+    client_ids = rng.integers(1, n_clients + 1, n_events)
+    statuses = rng.integers(0, len(PIPELINE_STATUSES), n_events)
+    rms = [f"RM {number:03d}" for number in range(50)]
+    rm_codes = rng.integers(0, len(rms), n_events)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = PipelineStore(os.path.join(directory, "pipeline.sqlite"))
+        updates = (
+            (int(client_id), rms[rm], PIPELINE_STATUSES[status], "", "", "2024-01-01 09:00")
+            for client_id, status, rm in zip(client_ids, statuses, rm_codes)
+        )
+        start = time.perf_counter()
+        store.add_many(updates)
+        seconds = time.perf_counter() - start
+        print(f"{'add_many':<30} {seconds:7.2f}s  {n_events / seconds:12,.0f} events/s  ({n_events:,} events)")
+
+        queries = [
+            ("status_counts", lambda: store.status_counts()),
+            ("status_counts (one RM)", lambda: store.status_counts(rm=rms[0])),
+            ("conversion", lambda: store.conversion()),
+            ("latest (one client)", lambda: store.latest(n_clients // 2)),
+            ("history (one client)", lambda: store.history(n_clients // 2)),
+            ("current (latest 200)", lambda: store.current(limit=200)),
+            ("client_ids", lambda: store.client_ids())
+        ]
+        for label, function in queries:
+            print(f"{label:<30} {_timed(function, repeat) * 1000:9.2f}ms")
+
+        start = time.perf_counter()
+        for client_id in client_ids[:1000]:
+            store.record(client_id, PIPELINE_STATUSES[-2])
+        print(f"{'record (one update)':<30} {time.perf_counter() - start:9.2f}ms")
+
+
+def bench_reruns(n_clients, repeat):
+    """demo-1 interactions: whole-script run time vs the fragment region that now reruns alone (reads the configured client store)"""
+    import logging
+    from streamlit.testing.v1 import AppTest
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    top_lead = _top_lead()
+    app = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "demo-1.py"), default_timeout=600)
+    app.run()
+
+    def click_lead(at):
+        at.button_group(key="lead_pick").set_value(top_lead)
+
+    def toggle_other_clients(at):
+        radio = at.radio(key="other_clients_view")
+        radio.set_value("Table View" if radio.value == "Compact Cards" else "Compact Cards")
+
+    def save_pipeline(at):
+        at.button(key="FormSubmitter:pipeline_form-💾 Simpan Update").click()
+
+    def open_relationship(at):
+        at.sidebar.radio[0].set_value("Relationship Health")
+
+    def click_relationship(at):
+        # List bodies render only when their expander is open; AppTest does not carry that state across runs
+        expander = [expander for expander in at.expander if "-priority_" in expander.proto.id][0]
+        key = expander.proto.id.split("-", 2)[-1]
+        at.session_state[key] = True
+        at.run()
+        at.session_state[key] = True
+        [button for button in at.button if button.key and button.key.startswith("detail_t1_")][0].click()
+
+    def open_data_view(at):
+        at.sidebar.radio[0].set_value("Data View")
+
+    def turn_page(at):
+        at.number_input[-1].set_value(2 if at.number_input[-1].value == 1 else 1)
+
+    # (label, setup action, measured action, region that reruns on its own)
+    scenarios = [
+        ("Analisis lead", None, click_lead, 'smart_opportunities'),
+        ("Klien Lainnya view toggle", None, toggle_other_clients, 'smart_opportunities'),
+        ("Simpan Update", None, save_pipeline, 'copilot_panel'),
+        ("Relationship detail", open_relationship, click_relationship, 'relationship_health'),
+        ("Data View page", open_data_view, turn_page, 'data_view')
+    ]
+    print(f"{'interaction':<28} {'full rerun':>12} {'fragment':>12}")
+    for label, setup, action, region in scenarios:
+        if setup:
+            setup(app)
+            app.run()
+        full, fragment = [], []
+        for _ in range(repeat):
+            action(app)
+            app.run()
+            timings = app.session_state['render_timings']
+            full.append(timings['app'])
+            fragment.append(timings[region])
+        print(f"{label:<28} {np.median(full):10.1f}ms {np.median(fragment):10.1f}ms  ({region})")
+
+
+def bench_imports(n_clients, repeat):
+    """Cold import time per view and entry-script compile time, checked against the budgets"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    entry_modules, view_modules = demo_imports()
+    over_budget = []
+    print(f"{'view':<22} {'import':>10}  plotly.express")
+    for view, modules in view_modules.items():
+        runs = []
+        for _ in range(repeat):
+            output = subprocess.run([sys.executable, "-c", _IMPORT_PROBE] + entry_modules + modules,
+                                    capture_output=True, text=True, cwd=root, check=True).stdout.split()
+            runs.append(float(output[0]))
+        milliseconds = min(runs)
+        print(f"{view:<22} {milliseconds:8.1f}ms  {output[1]}")
+        if milliseconds > IMPORT_BUDGET_MS[view]:
+            over_budget.append(f"{view}: {milliseconds:.0f}ms > {IMPORT_BUDGET_MS[view]}ms")
+
+    with open(os.path.join(root, "demo-1.py"), encoding="utf-8") as handle:
+        source = handle.read()
+    compile_ms = _timed(lambda: compile(source, "demo-1.py", "exec"), max(repeat, 10)) * 1000
+    print(f"{'demo-1.py compile':<22} {compile_ms:8.2f}ms")
+    if compile_ms > ENTRY_COMPILE_BUDGET_MS:
+        over_budget.append(f"demo-1.py compile: {compile_ms:.1f}ms > {ENTRY_COMPILE_BUDGET_MS}ms")
+
+    if over_budget:
+        raise SystemExit("Import budget exceeded: " + "; ".join(over_budget))
+
+
+BENCHMARKS = {
+    'figures': bench_figures,
+    'heatmap': bench_heatmap,
+    'imports': bench_imports,
+    'leads': bench_leads,
+    'llm': bench_llm,
+    'messages': bench_messages,
+    'pipeline': bench_pipeline,
+    'reruns': bench_reruns,
+    'templates': bench_templates
+}
+
+
+def main():
+    """Run one of the dashboard micro-benchmarks"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--n-clients", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args.n_clients, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Bulk script export
+Streams outreach drafts for a whole portfolio to JSONL or CSV, one store batch at a time
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+
+import numpy as np
+
+from client_store import ensure_client_store, iter_client_batches
+from config import CLIENT_STORE, THRESHOLDS
+from data_loader import CLIENT_ID_COLUMN
+from rules_engine import target_tags
+from message_templates import render_opportunity_scripts, render_relationship_scripts
+
+
+EXPORT_FIELDS = ["client_id", "client_name", "kind", "tag", "script"]
+
+EXPORT_COLUMNS = [CLIENT_ID_COLUMN, "Client Name", "Avg Giro Balance (M)", "Opportunity Tag",
+                  "Tenure Years", "Loyalty Status", "Last Note"]
+
+
+def iter_outreach(batches, opportunity=True, relationship=True,
+                  loyal_years=THRESHOLDS['loyal_client_years'], language=None):
+    """Outreach records for each batch: opportunity scripts for target tags, greetings for loyal clients"""
+    targets = target_tags()
+    for batch in batches:
+        # numpy round-trip decodes dictionary (categorical) columns far faster than to_pylist
+        columns = {name: batch.column(name).to_numpy(zero_copy_only=False) for name in batch.schema.names}
+        client_ids = columns[CLIENT_ID_COLUMN].tolist()
+        names = columns["Client Name"]
+        tags = columns["Opportunity Tag"]
+
+        # Render each kind for the whole batch at once, then emit in client order
+        scripts = {}
+        if opportunity:
+            rows = np.flatnonzero(np.isin(tags, targets))
+            scripts['opportunity'] = (rows, render_opportunity_scripts(
+                names[rows], tags[rows], columns["Avg Giro Balance (M)"][rows], language))
+        if relationship:
+            rows = np.flatnonzero(columns["Tenure Years"] > loyal_years)
+            scripts['relationship'] = (rows, render_relationship_scripts(
+                names[rows], columns["Tenure Years"][rows].tolist(),
+                columns["Loyalty Status"][rows], columns["Last Note"][rows], language))
+
+        # Stable sort keeps opportunity before relationship for the same client
+        order = [(row, kind, script) for kind, (rows, rendered) in scripts.items()
+                 for row, script in zip(rows.tolist(), rendered)]
+        order.sort(key=lambda item: item[0])
+        for row, kind, script in order:
+            yield {
+                "client_id": client_ids[row],
+                "client_name": names[row],
+                "kind": kind,
+                "tag": tags[row],
+                "script": script
+            }
+
+
+def write_jsonl(records, handle):
+    """Write records as JSON lines; returns the number written"""
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    count = 0
+    for record in records:
+        handle.write(encode(record))
+        handle.write("\n")
+        count += 1
+    return count
+
+
+def write_csv(records, handle):
+    """Write records as CSV with a header row; returns the number written"""
+    writer = csv.DictWriter(handle, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    count = 0
+    for record in records:
+        writer.writerow(record)
+        count += 1
+    return count
+
+
+WRITERS = {'jsonl': write_jsonl, 'csv': write_csv}
+
+
+def export_outreach(handle, fmt='jsonl', path=CLIENT_STORE['path'], batch_size=16384, **options):
+    """Stream the outreach drafts of every client in the store to an open text handle"""
+    batches = iter_client_batches(path, EXPORT_COLUMNS, batch_size)
+    return WRITERS[fmt](iter_outreach(batches, **options), handle)
+
+
+def main():
+    """Export the day's outreach drafts for the whole target list"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("output", help="Output file (.jsonl or .csv), '-' for stdout")
+    parser.add_argument("--format", choices=sorted(WRITERS), help="Defaults to the output file extension")
+    parser.add_argument("--store", default=CLIENT_STORE['path'], help="Client store to read")
+    parser.add_argument("--n-clients", type=int,
+                        help="Portfolio size to generate; regenerates a generated store of another size "
+                             f"(default: keep the store, or {CLIENT_STORE['n_clients']} clients for a new one)")
+    parser.add_argument("--batch-size", type=int, default=16384)
+    parser.add_argument("--language", help="Template language (defaults to USER_PROFILE['language'])")
+    parser.add_argument("--no-opportunity", action="store_true", help="Skip SME loan / payroll scripts")
+    parser.add_argument("--no-relationship", action="store_true", help="Skip loyal-client greetings")
+    args = parser.parse_args()
+
+    fmt = args.format or ('csv' if args.output.endswith(".csv") else 'jsonl')
+    ensure_client_store(args.store, n_clients=args.n_clients)
+
+    start = time.perf_counter()
+    handle = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        count = export_outreach(handle, fmt, args.store, args.batch_size,
+                                opportunity=not args.no_opportunity,
+                                relationship=not args.no_relationship,
+                                language=args.language)
+    finally:
+        if handle is not sys.stdout:
+            handle.close()
+    print(f"{count:,} scripts in {time.perf_counter() - start:.2f}s -> {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
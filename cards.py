@@ -0,0 +1,65 @@
+"""
+Card renderer
+Fills HTML card templates column-wise and sends a whole set of cards to the browser as one element
+"""
+
+import html
+import string
+
+import numpy as np
+import streamlit as st
+
+
+# Element-wise helpers over object arrays
+_TO_TEXT = np.frompyfunc(str, 1, 1)
+_ESCAPE = np.frompyfunc(html.escape, 1, 1)
+_FORMAT = np.frompyfunc(format, 2, 1)
+
+
+def _column_text(values, spec):
+    """A column as text: formatted with spec if given, otherwise str() and HTML-escaped"""
+    values = values.to_numpy(dtype=object) if hasattr(values, "to_numpy") else np.asarray(values, dtype=object)
+    if spec:
+        return _FORMAT(values, spec)
+    return _ESCAPE(_TO_TEXT(values))
+
+
+class CardTemplate:
+    """HTML card with {slot} or {slot:spec} placeholders, rendered for many rows at once"""
+
+    def __init__(self, markup, name="<card>"):
+        self.name = name
+        # One line per card: indented lines after a blank line would turn into markdown code blocks
+        markup = " ".join(line.strip() for line in markup.strip().splitlines())
+        self._parts = []
+        for literal, field, spec, conversion in string.Formatter().parse(markup):
+            if field is not None and (not field.isidentifier() or conversion):
+                raise ValueError(f"{name}: unsupported placeholder '{{{field}}}'")
+            self._parts.append((literal, field, spec))
+        self.slots = [field for _, field, _ in self._parts if field is not None]
+
+    def render_many(self, columns):
+        """HTML of one card per row; columns maps every slot to an equal-length sequence"""
+        missing = [slot for slot in self.slots if slot not in columns]
+        if missing:
+            raise KeyError(f"{self.name}: no column for {missing}")
+        n_rows = len(next(iter(columns.values()))) if columns else 1
+        cards = np.full(n_rows, "", dtype=object)
+        for literal, field, spec in self._parts:
+            cards = cards + literal
+            if field is not None:
+                cards = cards + _column_text(columns[field], spec)
+        return cards
+
+    def render(self, **values):
+        """HTML of a single card"""
+        return self.render_many({slot: [value] for slot, value in values.items()})[0]
+
+
+def render_cards(cards, columns=1, gap="15px"):
+    """Send rendered cards as a single markdown element, stacked or in a grid of equal columns"""
+    body = "".join(cards)
+    if columns > 1:
+        body = (f'<div style="display: grid; grid-template-columns: repeat({columns}, minmax(0, 1fr)); '
+                f'gap: {gap}; margin-bottom: 15px;">{body}</div>')
+    st.markdown(body, unsafe_allow_html=True)
@@ -0,0 +1,46 @@
+"""
+Client index module
+Resolves stable client IDs to row positions through a hash index
+"""
+
+import pandas as pd
+
+from data_loader import CLIENT_ID_COLUMN
+from dataset_cache import get_derived
+
+
+class ClientIndex:
+    """Hash index from client ID to row position"""
+
+    def __init__(self, df):
+        self._index = pd.Index(df[CLIENT_ID_COLUMN].to_numpy())
+        if not self._index.is_unique:
+            raise ValueError(f"'{CLIENT_ID_COLUMN}' values must be unique")
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, client_id):
+        return client_id in self._index
+
+    def position(self, client_id):
+        """Row position of one client; KeyError if the ID is unknown"""
+        return self._index.get_loc(client_id)
+
+    def positions(self, client_ids):
+        """Row positions of the known IDs among client_ids"""
+        positions = self._index.get_indexer(list(client_ids))
+        return positions[positions >= 0]
+
+    def row(self, df, client_id):
+        """The client's row as a Series"""
+        return df.iloc[self.position(client_id)]
+
+    def rows(self, df, client_ids):
+        """The clients' rows as a frame"""
+        return df.iloc[self.positions(client_ids)]
+
+
+def get_client_index():
+    """Client index of the process-wide dataset, built once per dataset version"""
+    return get_derived('client_index', ClientIndex)
@@ -0,0 +1,139 @@
+"""
+Columnar client store module
+Persists the client portfolio to Arrow/Parquet and opens it memory-mapped
+"""
+
+import json
+import os
+from datetime import date
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from config import CLIENT_STORE
+from data_loader import CLIENT_ID_COLUMN, load_data
+
+
+def _is_parquet(path):
+    return str(path).endswith(".parquet")
+
+
+def write_client_store(df, path=CLIENT_STORE['path'], as_of=None, generated_with=None):
+    """Write the portfolio frame to disk once, atomically replacing any previous store.
+
+    generated_with records the load_data settings of a generated portfolio,
+    so ensure_client_store can tell when the configuration moved on.
+    """
+    as_of = as_of or date.today()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = {**(table.schema.metadata or {}), b"as_of": as_of.isoformat().encode()}
+    if generated_with is not None:
+        metadata[b"generated_with"] = json.dumps(generated_with, sort_keys=True).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+
+    if _is_parquet(path):
+        pq.write_table(table, tmp_path)
+    else:
+        # Uncompressed IPC file so readers can map column buffers without decoding
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table, max_chunksize=1 << 20)
+
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_client_table(path=CLIENT_STORE['path'], columns=None):
+    """Open the store memory-mapped and return an Arrow table with only the requested columns"""
+    if _is_parquet(path):
+        return pq.read_table(path, columns=columns, memory_map=True)
+
+    with pa.memory_map(path, "r") as source:
+        table = ipc.open_file(source).read_all()
+    # Projection only keeps references to the selected buffers; pages of the
+    # other columns are never faulted into memory
+    return table.select(columns) if columns else table
+
+
+def iter_client_batches(path=CLIENT_STORE['path'], columns=None, batch_size=65536):
+    """Stream the store as Arrow record batches of at most batch_size rows"""
+    if _is_parquet(path):
+        yield from pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=batch_size, columns=columns)
+        return
+
+    with pa.memory_map(path, "r") as source:
+        reader = ipc.open_file(source)
+        for index in range(reader.num_record_batches):
+            batch = reader.get_batch(index)
+            if columns:
+                batch = batch.select(columns)
+            for offset in range(0, batch.num_rows, batch_size):
+                yield batch.slice(offset, batch_size)
+
+
+# 32-bit-offset strings only come from compact frames; keep them compact on load
+_STRING_TYPES = {pa.string(): pd.ArrowDtype(pa.string())}
+
+
+def read_client_store(path=CLIENT_STORE['path'], columns=None):
+    """Load the portfolio frame from the store, projecting to the given columns"""
+    return read_client_table(path, columns).to_pandas(types_mapper=_STRING_TYPES.get)
+
+
+def read_store_schema(path=CLIENT_STORE['path']):
+    """Arrow schema of the store, read without loading any column"""
+    if _is_parquet(path):
+        return pq.read_schema(path)
+    with pa.memory_map(path, "r") as source:
+        return ipc.open_file(source).schema
+
+
+def read_store_as_of(path=CLIENT_STORE['path']):
+    """Return the date the store snapshot was written"""
+    as_of = (read_store_schema(path).metadata or {}).get(b"as_of")
+    return date.fromisoformat(as_of.decode()) if as_of else None
+
+
+def ensure_client_store(path=CLIENT_STORE['path'], n_clients=None, seed=None, compact=None):
+    """Generate the portfolio if no store exists yet (or it predates client IDs).
+
+    An existing generated store is only regenerated when the caller explicitly
+    passes settings that differ from the ones it was generated with; settings
+    left as None keep the stored (or configured) value. Stores written without
+    generation settings are never replaced.
+    """
+    requested = {name: value for name, value in
+                 {'n_clients': n_clients, 'seed': seed, 'compact': compact}.items() if value is not None}
+    generated_with = None
+    stale = not os.path.exists(path)
+    if not stale:
+        schema = read_store_schema(path)
+        if b"generated_with" in (schema.metadata or {}):
+            generated_with = json.loads(schema.metadata[b"generated_with"])
+        stale = (CLIENT_ID_COLUMN not in schema.names
+                 or (generated_with is not None
+                     and any(generated_with.get(name) != value for name, value in requested.items())))
+    if stale:
+        settings = {
+            'n_clients': CLIENT_STORE['n_clients'],
+            'seed': CLIENT_STORE['seed'],
+            'compact': CLIENT_STORE['compact'],
+            **(generated_with or {}),
+            **requested
+        }
+        write_client_store(load_data(settings['n_clients'], settings['seed'], settings['compact']),
+                           path, generated_with=settings)
+    return path
+
+
+def open_client_store(path=CLIENT_STORE['path'], columns=None):
+    """Open the client store, building it on first use"""
+    ensure_client_store(path)
+    return read_client_store(path, columns)
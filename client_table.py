@@ -0,0 +1,82 @@
+"""
+Client table module
+Filters, sorts and pages the client table on the server; only the visible page is styled
+"""
+
+import numpy as np
+import pandas as pd
+
+from config import THRESHOLDS, TABLE_HIGHLIGHTS
+from dataset_cache import get_derived
+
+
+def sort_order(df, column, ascending=True):
+    """Row positions of the whole frame sorted by a column; ties keep frame order"""
+    column = df[column]
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # Sort codes by label rank so compact frames order like plain strings
+        ranks = np.argsort(np.argsort(column.cat.categories.to_numpy(), kind="stable"))
+        values = ranks[column.cat.codes.to_numpy()]
+    else:
+        values = column.to_numpy()
+    if ascending:
+        return np.argsort(values, kind="stable")
+    # Stable descending: sort the reversed column and map positions back
+    return len(values) - 1 - np.argsort(values[::-1], kind="stable")[::-1]
+
+
+def sorted_positions(positions, order, n_rows):
+    """Restrict a full-frame sort order to the given row positions"""
+    selected = np.zeros(n_rows, dtype=bool)
+    selected[positions] = True
+    return order[selected[order]]
+
+
+def page_count(n_rows, page_size):
+    """Number of pages needed for n_rows (at least one)"""
+    return max(1, -(-n_rows // page_size))
+
+
+def page_slice(positions, page, page_size):
+    """Row positions shown on a 1-based page, clamped to the last page"""
+    page = min(max(page, 1), page_count(len(positions), page_size))
+    return positions[(page - 1) * page_size:page * page_size]
+
+
+def page_excluding(order, excluded, page, page_size):
+    """Row positions on a 1-based page of order with the excluded positions left out.
+
+    Only the head of order up to the requested page is read, so the first pages
+    cost the same however large the frame is.
+    """
+    page = min(max(page, 1), page_count(len(order) - len(excluded), page_size))
+    window = order[:page * page_size + len(excluded)]
+    return page_slice(window[~np.isin(window, excluded)], page, page_size)
+
+
+def highlight_colors(df, critical_days=THRESHOLDS['contact_critical_days']):
+    """Background color per row as a vectorized column ('' for no highlight)"""
+    tags = df["Opportunity Tag"].astype(str).to_numpy()
+    return np.select(
+        [
+            tags == 'TARGET SME LOAN',
+            tags == 'TARGET PAYROLL',
+            df["Days Since Contact"].to_numpy() > critical_days
+        ],
+        [TABLE_HIGHLIGHTS['TARGET SME LOAN'], TABLE_HIGHLIGHTS['TARGET PAYROLL'], TABLE_HIGHLIGHTS['stale_contact']],
+        default=''
+    )
+
+
+def styled_page(df, positions):
+    """Styler over only the given rows, with the row highlight applied in one call"""
+    page = df.iloc[positions]
+    colors = highlight_colors(page)
+    css = np.where(colors != '', 'background-color: ' + colors.astype(object), '')
+    css = pd.DataFrame(np.repeat(css[:, None], page.shape[1], axis=1), index=page.index, columns=page.columns)
+    return page.style.apply(lambda _: css, axis=None)
+
+
+def get_sort_order(column, ascending=True):
+    """Sort order of the process-wide dataset by a column, computed once per dataset version"""
+    return get_derived(f'sort_order:{column}:{ascending}', lambda df: sort_order(df, column, ascending))
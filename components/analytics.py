@@ -0,0 +1,711 @@
+"""
+Analytics View Component
+Displays portfolio KPIs, trends, cross-sell analysis and what-if simulations
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+from cards import CardTemplate, render_cards
+from client_index import ClientIndex
+from config import HEAT_MAP, OPPORTUNITY_COLORS, PIPELINE_STORE, THRESHOLDS
+from dataset_cache import dataset_version
+from figure_cache import array_digest, cached_figure, values_key
+from fragments import timed_fragment
+from insight_engine import INSIGHT_TYPES, evaluate_insights, has_insight, insight_counts
+from kpi_cube import build_kpi_cube, range_counts
+from pipeline_store import get_pipeline_store
+from rules_engine import target_tags
+from threshold_simulator import ThresholdSimulator
+
+
+_KPI_TILE = CardTemplate("""
+<div style="background: linear-gradient(135deg, {gradient});
+            border-radius: 12px; color: white; box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+            height: 200px; padding: 20px 10px;
+            display: flex; flex-direction: column; align-items: center; justify-content: center; text-align: center;">
+    <h4 style="margin: 0 0 10px 0; font-size: 15px; font-weight: normal;">{title}</h4>
+    <h1 style="margin: 0 0 8px 0; font-weight: bold; {value_style}">{value}</h1>
+    <p style="margin: 0; font-size: {caption_size}; opacity: 0.9;">{caption}</p>
+</div>
+""", "analytics KPI tile")
+
+
+def render_analytics(df, cube=None, client_index=None, insights=None, pipeline_store=None):
+    """Render the Analytics view"""
+    
+    if cube is None:
+        cube = build_kpi_cube(df)
+    if client_index is None:
+        client_index = ClientIndex(df)
+    if insights is None:
+        insights = evaluate_insights(df)
+    if pipeline_store is None:
+        pipeline_store = get_pipeline_store()
+    
+    st.header("📊 Dashboard Analitik Portfolio")
+    st.markdown("---")
+    
+    # Top KPI Row with Enhanced Styling
+    st.subheader("Indikator Kinerja Utama")
+    
+    total_clients = cube.count()
+    total_giro = cube.total('giro')
+    total_potential = cube.total('potential')
+    target_sme = cube.count(tag="TARGET SME LOAN")
+    target_payroll = cube.count(tag="TARGET PAYROLL")
+    
+    target_sme_pct = (target_sme/total_clients*100) if total_clients > 0 else 0
+    target_payroll_pct = (target_payroll/total_clients*100) if total_clients > 0 else 0
+    count_style = "font-size: 56px; line-height: 1;"
+    amount_style = "font-size: 36px; line-height: 1.1; white-space: nowrap;"
+    render_cards(_KPI_TILE.render_many({
+        'gradient': ["#667eea 0%, #764ba2 100%", "#1976d2 0%, #42a5f5 100%", "#f093fb 0%, #f5576c 100%",
+                     "#ff6b6b 0%, #c92a2a 100%", "#f57c00 0%, #e65100 100%"],
+        'title': ["Total Klien", "Total Giro", "Total Potensial", "Target SME", "Target Payroll"],
+        'value_style': [count_style, amount_style, amount_style, count_style, count_style],
+        'value': [total_clients, f"Rp {total_giro:,.0f}M", f"Rp {total_potential:,.0f}M", target_sme, target_payroll],
+        'caption_size': ["12px", "11px", "11px", "11px", "11px"],
+        'caption': ["Portfolio aktif", "▲ +18% vs last month", "Revenue opportunity",
+                    f"▲ {target_sme_pct:.1f}%", f"▲ {target_payroll_pct:.1f}%"]
+    }), columns=5)
+    
+    st.markdown("---")
+    
+    # Monthly Trend Analysis
+    st.subheader("📈 Trend Bulanan - SME Loan Achievement")
+    
+    # Simulate 6-month trend
+    months = pd.date_range(end=datetime.now(), periods=6, freq='ME')
+    trend_data = pd.DataFrame({
+        'Month': months.strftime('%b %Y'),
+        'SME Loans (%)': [25, 27, 29, 31, 32, 33],
+        'Target (%)': [100] * 6
+    })
+    
+    fig_trend = cached_figure('analytics.trend', tuple(trend_data['Month']), lambda: _trend_figure(trend_data))
+    st.plotly_chart(fig_trend, use_container_width=True)
+    
+    col_trend1, col_trend2, col_trend3 = st.columns(3)
+    with col_trend1:
+        st.metric("Current Month", "33%", "+1% MoM")
+    with col_trend2:
+        st.metric("Gap to Target", "-67%", "Action needed!", delta_color="inverse")
+    with col_trend3:
+        st.metric("Projected Next Month", "35%", "+2% forecast")
+    
+    st.markdown("---")
+    
+    # Portfolio Distribution
+    col_chart1, col_chart2 = st.columns(2)
+    
+    with col_chart1:
+        st.subheader("📈 Distribusi Peluang")
+        tag_counts = cube.breakdown('tag').astype(int)
+        tag_counts = tag_counts[tag_counts > 0]
+        
+        chart_data = pd.DataFrame({
+            'Tag': tag_counts.index,
+            'Jumlah': tag_counts.values
+        }).sort_values('Jumlah', ascending=False)
+        
+        fig1 = cached_figure('analytics.opportunity', values_key(chart_data), lambda: _opportunity_figure(chart_data))
+        st.plotly_chart(fig1, use_container_width=True)
+        
+        # Contact Recency Alert for Opportunity Segment
+        st.markdown("**Alert: Klien Belum Dihubungi**")
+        target_clients = cube.count(tag=target_tags())
+        not_contacted = cube.count(tag=target_tags(), contact=('>', 30))
+        urgent = cube.count(tag=target_tags(), contact=('>', 90))
+        
+        col_a1, col_a2 = st.columns(2)
+        with col_a1:
+            st.metric(">30 hari", not_contacted, f"{not_contacted/target_clients*100:.0f}%" if target_clients > 0 else "0%")
+        with col_a2:
+            st.metric(">90 hari", urgent, "URGENT!" if urgent > 0 else "OK", delta_color="inverse")
+    
+    with col_chart2:
+        st.subheader("💰 Distribusi Saldo Giro")
+        
+        # Create bins for giro balance
+        bins = [0, 1000, 2000, 5000, 10000]
+        labels = ['< 1M', '1-2M', '2-5M', '> 5M']
+        giro_range_counts = range_counts(cube, 'giro', bins, labels).astype(int)
+        
+        chart_data2 = pd.DataFrame({
+            'Rentang': giro_range_counts.index.astype(str),
+            'Jumlah': giro_range_counts.values
+        }).sort_values('Jumlah', ascending=False)
+        
+        fig2 = cached_figure('analytics.giro_funnel', values_key(chart_data2), lambda: _giro_funnel_figure(chart_data2))
+        st.plotly_chart(fig2, use_container_width=True)
+        
+        # High-Value Client Contact Status
+        st.markdown("**Alert: High-Value Klien**")
+        high_value = cube.count(giro=('>=', 2000))
+        hv_not_contacted = cube.count(giro=('>=', 2000), contact=('>', 30))
+        hv_urgent = cube.count(giro=('>=', 2000), contact=('>', 90))
+        
+        col_b1, col_b2 = st.columns(2)
+        with col_b1:
+            st.metric(">30 hari", hv_not_contacted, f"{hv_not_contacted/high_value*100:.0f}%" if high_value > 0 else "0%")
+        with col_b2:
+            st.metric(">90 hari", hv_urgent, "CRITICAL!" if hv_urgent > 0 else "OK", delta_color="inverse")
+    
+    st.markdown("---")
+    
+    # Cross-Sell Analysis
+    st.subheader("🎯 Analisis Cross-Sell")
+    col_cross1, col_cross2, col_cross3 = st.columns(3)
+    
+    with col_cross1:
+        st.write("**Penetrasi Pinjaman SME**")
+        sme_active = cube.count(sme="Active")
+        sme_none = cube.count(sme="None")
+        
+        st.metric("Pinjaman Aktif", sme_active, f"{sme_active/total_clients*100:.1f}%")
+        st.metric("Tanpa Pinjaman", sme_none, f"{sme_none/total_clients*100:.1f}%")
+        
+        st.progress(sme_active / total_clients)
+        st.caption(f"Tingkat Penetrasi: {sme_active/total_clients*100:.1f}%")
+    
+    with col_cross2:
+        st.write("**Penetrasi Payroll**")
+        payroll_active = cube.count(payroll="Active")
+        payroll_none = cube.count(payroll="None")
+        
+        st.metric("Payroll Aktif", payroll_active, f"{payroll_active/total_clients*100:.1f}%")
+        st.metric("Tanpa Payroll", payroll_none, f"{payroll_none/total_clients*100:.1f}%")
+        
+        st.progress(payroll_active / total_clients)
+        st.caption(f"Tingkat Penetrasi: {payroll_active/total_clients*100:.1f}%")
+    
+    with col_cross3:
+        st.write("**Aktivitas Transaksi**")
+        high_freq = cube.count(txn="High")
+        med_freq = cube.count(txn="Medium")
+        low_freq = cube.count(txn="Low")
+        
+        st.write(f"🟢 Tinggi: {high_freq} ({high_freq/total_clients*100:.1f}%)")
+        st.write(f"🟡 Sedang: {med_freq} ({med_freq/total_clients*100:.1f}%)")
+        st.write(f"🔴 Rendah: {low_freq} ({low_freq/total_clients*100:.1f}%)")
+        
+        engagement_score = (high_freq * 3 + med_freq * 2 + low_freq * 1) / (total_clients * 3)
+        st.metric("Skor Engagement", f"{engagement_score*100:.1f}%")
+    
+    st.markdown("---")
+    
+    # Portfolio Heat Map
+    st.subheader("🗺️ Portfolio Heat Map: Giro vs Aktivitas")
+    
+    _render_portfolio_heat_map(df, cube)
+    
+    st.markdown("---")
+    
+    # Priority Matrix
+    st.subheader("🎯 Matriks Prioritas Aksi")
+    
+    # Create priority segments
+    high_value_no_loan = dict(giro=('>=', 2000), sme='None')
+    med_value_no_payroll = dict(giro=[('>=', 1000), ('<', 2000)], payroll='None')
+    low_activity = cube.count(txn='Low')
+    
+    col_matrix1, col_matrix2, col_matrix3 = st.columns(3)
+    
+    with col_matrix1:
+        st.error("🔴 **PRIORITAS KRITIS**")
+        st.metric("Giro Tinggi, Tanpa Pinjaman SME", cube.count(**high_value_no_loan))
+        st.write(f"Potensial: Rp {cube.total('potential', **high_value_no_loan):,.0f}M")
+        st.write("**Tindakan:** Segera tawarkan pinjaman SME")
+    
+    with col_matrix2:
+        st.warning("🟡 **PRIORITAS SEDANG**")
+        st.metric("Giro Sedang, Tanpa Payroll", cube.count(**med_value_no_payroll))
+        st.write(f"Potensial: Rp {cube.total('potential', **med_value_no_payroll):,.0f}M")
+        st.write("**Tindakan:** Tawarkan produk Payroll")
+    
+    with col_matrix3:
+        st.info("🔵 **FOKUS RETENSI**")
+        st.metric("Aktivitas Transaksi Rendah", low_activity)
+        st.write("**Risiko Churn:** Tinggi")
+        st.write("**Tindakan:** Review relasi & tingkatkan engagement")
+    
+    st.markdown("---")
+    
+    _render_threshold_simulation(df)
+    
+    st.markdown("---")
+    
+    # Client Journey Sankey
+    st.subheader("🔄 Customer Journey Flow")
+    
+    # Calculate flows
+    giro_only = cube.count(sme='None', payroll='None')
+    giro_sme = cube.count(sme='Active', payroll='None')
+    giro_payroll = cube.count(sme='None', payroll='Active')
+    full_package = cube.count(sme='Active', payroll='Active')
+    
+    fig_sankey = cached_figure('analytics.sankey', (giro_only, giro_sme, giro_payroll, full_package),
+                               lambda: _sankey_figure(giro_only, giro_sme, giro_payroll, full_package))
+    st.plotly_chart(fig_sankey, use_container_width=True)
+    
+    col_sk1, col_sk2, col_sk3 = st.columns(3)
+    with col_sk1:
+        st.metric("Giro Only", giro_only, f"{giro_only/len(df)*100:.1f}% - Opportunity!")
+    with col_sk2:
+        st.metric("Single Product", giro_sme + giro_payroll, "Cross-sell potential")
+    with col_sk3:
+        st.metric("Full Package", full_package, f"{full_package/len(df)*100:.1f}% - Excellent!")
+    
+    st.markdown("---")
+    
+    _render_insight_portfolio(df, insights)
+    
+    st.markdown("---")
+    
+    # Pipeline Forecast
+    st.subheader("📈 Proyeksi Pipeline")
+    
+    status_counts = pipeline_store.status_counts()
+    
+    if len(status_counts):
+        st.write("**Status Pipeline Saat Ini:**")
+        
+        # Latest clients only; the totals below come from aggregate queries over the whole store
+        recent = pipeline_store.current(limit=PIPELINE_STORE['table_rows'])
+        recent = recent[[client_id in client_index for client_id in recent['client_id']]]
+        pipeline_df = pd.DataFrame({
+            'Klien': client_index.rows(df, recent['client_id'])['Client Name'].to_numpy(),
+            'Status': recent['status'].to_numpy(),
+            'Terakhir Diperbarui': recent['updated_at'].to_numpy()
+        })
+        
+        col_pipe1, col_pipe2 = st.columns(2)
+        
+        with col_pipe1:
+            st.dataframe(pipeline_df, use_container_width=True, height=300)
+        
+        with col_pipe2:
+            st.write("**Distribusi Status:**")
+            for status, count in status_counts.items():
+                st.write(f"• {status}: {count}")
+            
+            st.markdown("---")
+            
+            # Calculate conversion estimate
+            conversion = pipeline_store.conversion()
+            
+            if conversion['clients'] > 0:
+                conversion_rate = conversion['rate'] * 100
+                st.metric("Tingkat Konversi", f"{conversion_rate:.1f}%")
+                
+                # Estimate based on clients in pipeline
+                clients_in_pipeline = pipeline_store.client_ids()
+                pipeline_potential = client_index.rows(df, clients_in_pipeline)['Potential Value (M)'].sum()
+                
+                st.metric("Nilai Pipeline", f"Rp {pipeline_potential:,.0f}M")
+                st.metric("Estimasi Revenue", f"Rp {pipeline_potential * (conversion_rate/100):,.0f}M")
+    else:
+        st.info("Belum ada aktivitas pipeline yang tercatat. Mulai analisis klien untuk membangun pipeline Anda.")
+    
+    st.markdown("---")
+    
+    # Recommendations
+    st.subheader("💡 Rekomendasi AI")
+    
+    col_rec1, col_rec2 = st.columns(2)
+    
+    with col_rec1:
+        st.write("**5 Klien Prioritas Tertinggi (berdasarkan Nilai Potensial):**")
+        top_5 = df.nlargest(5, 'Potential Value (M)')[['Client Name', 'Opportunity Tag', 'Potential Value (M)']]
+        
+        # Create styled dataframe
+        top_5_display = top_5.copy()
+        top_5_display['Rank'] = [1, 2, 3, 4, 5]
+        top_5_display = top_5_display[['Rank', 'Client Name', 'Opportunity Tag', 'Potential Value (M)']]
+        top_5_display.columns = ['Rank', 'Nama Klien', 'Tag', 'Nilai Potensial (M)']
+        
+        st.dataframe(
+            top_5_display,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Rank": st.column_config.NumberColumn("Rank"),
+                "Nama Klien": st.column_config.TextColumn("Nama Klien"),
+                "Tag": st.column_config.TextColumn("Opportunity Tag"),
+                "Nilai Potensial (M)": st.column_config.NumberColumn("Nilai Potensial", format="Rp %.1f M"),
+            }
+        )
+    
+    with col_rec2:
+        st.write("**Aksi Strategis Minggu Ini:**")
+        
+        # Create action items table
+        action_items = pd.DataFrame({
+            'Priority': ['🔴', '🔴', '🟡', '🟡', '🟢'],
+            'Action': [
+                'Hubungi semua klien PRIORITAS TINGGI',
+                f'Lakukan {target_sme} pitching pinjaman SME',
+                f'Jadwalkan {min(target_payroll, 5)} demo payroll',
+                f'Review {low_activity} akun aktivitas rendah',
+                'Update status pipeline setiap hari'
+            ],
+            'Target': ['Semua', f'{target_sme} klien', f'{min(target_payroll, 5)} klien', f'{low_activity} klien', 'Harian']
+        })
+        
+        st.dataframe(
+            action_items,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Priority": st.column_config.TextColumn(""),
+                "Action": st.column_config.TextColumn("Aksi"),
+                "Target": st.column_config.TextColumn("Target"),
+            }
+        )
+
+
+def _trend_figure(trend_data):
+    """SME loan achievement per month against the target"""
+    fig_trend = go.Figure()
+    
+    # Add actual line
+    fig_trend.add_trace(go.Scatter(
+        x=trend_data['Month'],
+        y=trend_data['SME Loans (%)'],
+        mode='lines+markers+text',
+        name='Actual',
+        line=dict(color='#d32f2f', width=3),
+        marker=dict(size=10),
+        text=trend_data['SME Loans (%)'],
+        textposition='top center',
+        texttemplate='%{text}%'
+    ))
+    
+    # Add target line
+    fig_trend.add_trace(go.Scatter(
+        x=trend_data['Month'],
+        y=trend_data['Target (%)'],
+        mode='lines',
+        name='Target',
+        line=dict(color='#2e7d32', width=2, dash='dash')
+    ))
+    
+    fig_trend.update_layout(
+        height=280,
+        yaxis_title='Achievement (%)',
+        xaxis_title='',
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        margin=dict(t=40, b=20, l=20, r=20)
+    )
+    
+    return fig_trend
+
+
+def _opportunity_figure(chart_data):
+    """Clients per opportunity tag"""
+    # Replace pie with horizontal bar chart for better comparison
+    fig1 = px.bar(
+        chart_data,
+        y='Tag',
+        x='Jumlah',
+        color='Tag',
+        color_discrete_map=OPPORTUNITY_COLORS,
+        text='Jumlah',
+        orientation='h'
+    )
+    fig1.update_traces(
+        texttemplate='%{text} klien<br>(%{x:.1%} of total)', 
+        textposition='outside'
+    )
+    fig1.update_layout(
+        showlegend=False,
+        height=350,
+        margin=dict(t=10, b=0, l=0, r=80),
+        xaxis_title="Jumlah Klien",
+        yaxis_title=""
+    )
+    return fig1
+
+
+def _giro_funnel_figure(chart_data):
+    """Clients per giro balance range"""
+    # Create funnel chart for better hierarchy visualization
+    fig2 = px.funnel(
+        chart_data,
+        x='Jumlah',
+        y='Rentang',
+        color='Rentang',
+        color_discrete_sequence=['#1976d2', '#42a5f5', '#90caf9', '#bbdefb']
+    )
+    fig2.update_traces(textinfo='value+percent total')
+    fig2.update_layout(
+        showlegend=False,
+        height=350,
+        margin=dict(t=10, b=0, l=0, r=0)
+    )
+    return fig2
+
+
+def _sankey_figure(giro_only, giro_sme, giro_payroll, full_package):
+    """Product penetration flow from giro to the full package"""
+    fig_sankey = go.Figure(data=[go.Sankey(
+        node=dict(
+            pad=15,
+            thickness=20,
+            line=dict(color="black", width=0.5),
+            label=["Total Clients", "Giro Only", "+ SME Loan", "+ Payroll", "Full Package"],
+            color=["#1976d2", "#ff9800", "#4caf50", "#9c27b0", "#ffd700"]
+        ),
+        link=dict(
+            source=[0, 0, 0, 0],
+            target=[1, 2, 3, 4],
+            value=[giro_only, giro_sme, giro_payroll, full_package],
+            color=["rgba(255, 152, 0, 0.4)", "rgba(76, 175, 80, 0.4)", 
+                   "rgba(156, 39, 176, 0.4)", "rgba(255, 215, 0, 0.6)"]
+        )
+    )])
+    
+    fig_sankey.update_layout(
+        title_text="Product Penetration Flow",
+        height=300,
+        font_size=12,
+        margin=dict(t=40, b=10, l=10, r=10)
+    )
+    
+    return fig_sankey
+
+
+def _heat_map_mode(n_clients):
+    """Chart mode for a portfolio of n_clients: 'svg', 'webgl' or 'binned'"""
+    if n_clients >= HEAT_MAP['binned_from']:
+        return 'binned'
+    if n_clients >= HEAT_MAP['webgl_from']:
+        return 'webgl'
+    return 'svg'
+
+
+def _scatter_heat_map(df, render_mode):
+    """One marker per client, drawn as SVG or WebGL"""
+    return px.scatter(
+        df,
+        x='Days Since Contact',
+        y='Avg Giro Balance (M)',
+        size='Potential Value (M)',
+        color='Opportunity Tag',
+        color_discrete_map=OPPORTUNITY_COLORS,
+        hover_data=['Client Name', 'SME Loan Status', 'Payroll Status', 'Tenure Years'],
+        labels={'Days Since Contact': 'Hari Sejak Kontak Terakhir',
+                'Avg Giro Balance (M)': 'Saldo Giro (Juta)'},
+        render_mode=render_mode
+    )
+
+
+def _heat_map_bins(df, bins=HEAT_MAP['bins'], giro_quantile=HEAT_MAP['giro_quantile']):
+    """Client counts and potential value per Days Since Contact × Giro bin.
+    
+    Giro above the giro_quantile value is folded into the top row, so a few
+    very large balances do not squeeze the rest of the portfolio into one bin.
+    Returns (day edges, giro edges, counts, potential), the grids indexed [giro bin, day bin].
+    """
+    days = df['Days Since Contact'].to_numpy(dtype=np.float64)
+    giro = df['Avg Giro Balance (M)'].to_numpy(dtype=np.float64)
+    potential = df['Potential Value (M)'].to_numpy(dtype=np.float64)
+    n_days, n_giro = bins
+    day_edges = np.linspace(0, max(days.max(initial=0), 1) + 1, n_days + 1)
+    giro_top = max(np.quantile(giro, giro_quantile) if len(giro) else 0, 1)
+    giro_edges = np.linspace(min(giro.min(initial=0), 0), giro_top, n_giro + 1)
+    giro = np.minimum(giro, giro_top)
+    counts, _, _ = np.histogram2d(giro, days, bins=[giro_edges, day_edges])
+    values, _, _ = np.histogram2d(giro, days, bins=[giro_edges, day_edges], weights=potential)
+    return day_edges, giro_edges, counts, values
+
+
+def _binned_heat_map(df):
+    """Client density over Days Since Contact × Giro, binned on the server"""
+    day_edges, giro_edges, counts, values = _heat_map_bins(df)
+    empty = counts == 0
+    fig = go.Figure(go.Heatmap(
+        x=(day_edges[:-1] + day_edges[1:]) / 2,
+        y=(giro_edges[:-1] + giro_edges[1:]) / 2,
+        z=np.where(empty, np.nan, counts),
+        customdata=values,
+        colorscale="YlOrRd",
+        colorbar=dict(title="Klien"),
+        hovertemplate=("Hari Sejak Kontak: %{x:.0f}<br>Saldo Giro: Rp %{y:,.0f}M<br>"
+                       "Klien: %{z:,.0f}<br>Potensial: Rp %{customdata:,.0f}M<extra></extra>")
+    ))
+    fig.update_layout(xaxis_title='Hari Sejak Kontak Terakhir', yaxis_title='Saldo Giro (Juta)')
+    return fig
+
+
+def _heat_map_figure(df, mode, high_value, recent):
+    """Heat map figure in the given mode, with the quadrant lines"""
+    if mode == 'binned':
+        fig_scatter = _binned_heat_map(df)
+    else:
+        fig_scatter = _scatter_heat_map(df, mode)
+    
+    # Add quadrant lines
+    fig_scatter.add_hline(y=high_value, line_dash="dash", line_color="red", opacity=0.5, annotation_text="High Value Threshold")
+    fig_scatter.add_vline(x=recent, line_dash="dash", line_color="orange", opacity=0.5, annotation_text="Contact Threshold")
+    
+    fig_scatter.update_layout(
+        height=450,
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig_scatter
+
+
+def _render_portfolio_heat_map(df, cube):
+    """Giro vs days since contact: scatter for small portfolios, binned density for large ones"""
+    high_value = THRESHOLDS['high_value_giro']
+    recent = THRESHOLDS['contact_warning_days']
+    
+    mode = _heat_map_mode(len(df))
+    if mode == 'binned':
+        st.caption(f"{len(df):,} klien — ditampilkan sebagai kepadatan per sel (jumlah klien dan potensial)")
+    # Keyed on the rows drawn (a filtered frame draws other clients) and on Days Since Contact,
+    # which moves with every logged contact; the other columns are fixed per dataset version
+    params = (mode, high_value, recent, array_digest(df['Client ID'].to_numpy()),
+              array_digest(df['Days Since Contact'].to_numpy()))
+    fig_scatter = cached_figure('analytics.heat_map', params, lambda: _heat_map_figure(df, mode, high_value, recent))
+    
+    st.plotly_chart(fig_scatter, use_container_width=True)
+    
+    # Quadrant explanation with the clients in each quadrant, from the cube
+    quadrants = {
+        'ideal': dict(giro=('>=', high_value), contact=('<=', recent)),
+        'urgent': dict(giro=('>=', high_value), contact=('>', recent)),
+        'good': dict(giro=('<', high_value), contact=('<=', recent)),
+        'review': dict(giro=('<', high_value), contact=('>', recent))
+    }
+    counts = {name: (cube.count(**conditions), cube.total('potential', **conditions))
+              for name, conditions in quadrants.items()}
+    
+    def callout(name):
+        clients, potential = counts[name]
+        return f"{clients:,} klien • Potensial Rp {potential:,.0f}M"
+    
+    col_q1, col_q2, col_q3, col_q4 = st.columns(4)
+    with col_q1:
+        st.info(f"**🔴 Top Left:** High Value + Recent Contact = Ideal\n\n{callout('ideal')}")
+    with col_q2:
+        st.warning(f"**🟡 Top Right:** High Value + Old Contact = URGENT!\n\n{callout('urgent')}")
+    with col_q3:
+        st.success(f"**🟢 Bottom Left:** Low Value + Recent = Good\n\n{callout('good')}")
+    with col_q4:
+        st.error(f"**⚫ Bottom Right:** Low Value + Old = Re-evaluate\n\n{callout('review')}")
+
+
+@timed_fragment("threshold_simulation")
+def _render_threshold_simulation(df):
+    """Render the threshold what-if simulator"""
+    st.subheader("🧪 Simulasi Threshold (What-If)")
+    
+    # One simulator per session, rebuilt only when the shared dataset changes
+    if st.session_state.get('threshold_simulator_version') != dataset_version():
+        st.session_state['threshold_simulator'] = ThresholdSimulator(df)
+        st.session_state['threshold_simulator_version'] = dataset_version()
+    simulator = st.session_state['threshold_simulator']
+    
+    col_sim1, col_sim2 = st.columns(2)
+    with col_sim1:
+        sim_high_value = st.slider(
+            "Threshold Giro Tinggi - TARGET SME LOAN (M)",
+            min_value=500, max_value=10000, value=THRESHOLDS['high_value_giro'], step=100,
+            key="sim_high_value_giro"
+        )
+    with col_sim2:
+        sim_medium_value = st.slider(
+            "Threshold Giro Sedang - TARGET PAYROLL (M)",
+            min_value=0, max_value=5000, value=THRESHOLDS['medium_value_giro'], step=100,
+            key="sim_medium_value_giro"
+        )
+    
+    simulator.set_thresholds(high_value_giro=sim_high_value, medium_value_giro=sim_medium_value)
+    st.caption(f"{simulator.last_evaluated} klien dievaluasi ulang dari total {len(df)} klien")
+    
+    col_sim3, col_sim4 = st.columns([3, 2])
+    with col_sim3:
+        st.write("**Dampak ke Tag Peluang:**")
+        st.dataframe(
+            simulator.summary(),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Potensi Awal (M)": st.column_config.NumberColumn("Potensi Awal", format="Rp %.0f M"),
+                "Potensi Simulasi (M)": st.column_config.NumberColumn("Potensi Simulasi", format="Rp %.0f M"),
+            }
+        )
+    with col_sim4:
+        st.write("**Perpindahan Klien (Awal → Simulasi):**")
+        st.dataframe(simulator.flip_matrix(), use_container_width=True)
+
+
+def _insight_figure(counts):
+    """Clients per insight type"""
+    fig_insights = px.bar(
+        x=counts.values,
+        y=counts.index,
+        orientation='h',
+        text=counts.values,
+        color_discrete_sequence=['#1976d2']
+    )
+    fig_insights.update_layout(
+        height=300,
+        margin=dict(t=10, b=10, l=10, r=40),
+        xaxis_title="Jumlah Klien",
+        yaxis_title=""
+    )
+    return fig_insights
+
+
+@timed_fragment("insight_portfolio")
+def _render_insight_portfolio(df, insights):
+    """Render the client count per insight type"""
+    st.subheader("🔎 Insight Portfolio")
+    
+    counts = insight_counts(insights)
+    insight_labels = {label: code for code, label, _ in INSIGHT_TYPES}
+    
+    col_ins1, col_ins2 = st.columns([1, 2])
+    
+    with col_ins1:
+        selected_insight = st.selectbox("Jenis Insight", list(insight_labels), key="insight_type")
+        insight_code = insight_labels[selected_insight]
+        matches = np.flatnonzero(has_insight(insights, insight_code))
+        
+        st.metric("Jumlah Klien", f"{len(matches):,}", f"{len(matches)/len(df)*100:.0f}% dari portfolio")
+        if insight_code == 'sme_opportunity':
+            st.metric("Estimasi Modal Kerja", f"Rp {insights['SME Estimate (M)'].to_numpy()[matches].sum():,.0f}M")
+        elif insight_code == 'payroll_cross_sell':
+            st.metric("Potensi Fee Payroll", f"Rp {insights['Payroll Fee (M)'].to_numpy()[matches].sum():,.0f}M/bulan")
+    
+    with col_ins2:
+        fig_insights = cached_figure('analytics.insights', values_key(counts), lambda: _insight_figure(counts))
+        st.plotly_chart(fig_insights, use_container_width=True)
+    
+    # Largest balances first; only the shown rows are read from the frame
+    giro_values = df['Avg Giro Balance (M)'].to_numpy()[matches]
+    shown = matches[np.argsort(-giro_values, kind="stable")[:50]]
+    st.dataframe(
+        df.iloc[shown][['Client ID', 'Client Name', 'Avg Giro Balance (M)', 'Opportunity Tag', 'Days Since Contact']],
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Client ID": st.column_config.NumberColumn("ID Klien", format="%d"),
+            "Client Name": "Nama Klien",
+            "Avg Giro Balance (M)": st.column_config.NumberColumn("Saldo Giro (M)", format="Rp %.0f M"),
+            "Opportunity Tag": "Tag",
+            "Days Since Contact": st.column_config.NumberColumn("Hari Sejak Kontak", format="%d hari")
+        }
+    )
+    if len(matches) > len(shown):
+        st.caption(f"Menampilkan {len(shown)} dari {len(matches):,} klien dengan saldo giro tertinggi")
@@ -5,12 +5,35 @@ Displays full client data table with filtering and statistics
 
 import streamlit as st
 import plotly.express as px
-from config import OPPORTUNITY_COLORS
+from cards import CardTemplate, render_cards
+from config import OPPORTUNITY_COLORS, TABLE_PAGE_SIZES
+from figure_cache import cached_figure, values_key
+from fragments import timed_fragment
+from client_table import page_count, sort_order, styled_page
+from kpi_cube import FilterCube
+from rules_engine import GIRO_COLUMN, target_tags
 
 
-def render_data_view(df):
+_STAT_TILE = CardTemplate("""
+<div style="background: linear-gradient(135deg, {gradient});
+            padding: 25px; border-radius: 12px; text-align: center; color: white;
+            box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
+    <h4 style="margin: 0; font-size: 14px; opacity: 0.9;">{title}</h4>
+    <h1 style="margin: 10px 0; font-size: 32px; font-weight: bold;">{value}</h1>
+    <p style="margin: 0; font-size: 12px; opacity: 0.8;">{caption}</p>
+</div>
+""", "statistics tile")
+
+
+@timed_fragment("data_view")
+def render_data_view(df, filter_cube=None, get_sort_order=None):
     """Render the Data View"""
     
+    if filter_cube is None:
+        filter_cube = FilterCube(df)
+    if get_sort_order is None:
+        get_sort_order = lambda column, ascending: sort_order(df, column, ascending)
+    
     st.header("📋 Data Semua Klien")
     st.markdown("---")
     
@@ -19,52 +42,60 @@ def render_data_view(df):
     with col_f1:
         filter_tag = st.multiselect(
             "Filter berdasarkan Tag Peluang",
-            options=df["Opportunity Tag"].unique(),
-            default=df["Opportunity Tag"].unique()
+            options=filter_cube.labels('tag'),
+            default=filter_cube.labels('tag')
         )
     with col_f2:
         filter_sme = st.multiselect(
             "Filter berdasarkan Status Pinjaman SME",
-            options=df["SME Loan Status"].unique(),
-            default=df["SME Loan Status"].unique()
+            options=filter_cube.labels('sme'),
+            default=filter_cube.labels('sme')
         )
     with col_f3:
         min_giro = st.number_input("Saldo Giro Minimum (M)", min_value=0, value=0, step=100)
     
-    # Apply filters
-    filtered_df = df[
-        (df["Opportunity Tag"].isin(filter_tag)) &
-        (df["SME Loan Status"].isin(filter_sme)) &
-        (df["Avg Giro Balance (M)"] >= min_giro)
-    ]
+    # Statistics come from the filter cube; only the table page reads rows
+    filtered_cube = filter_cube.select(min_giro, tag=filter_tag, sme=filter_sme)
     
     st.markdown("---")
     
     # Enhanced Ringkasan Statistik (at top)
-    _render_statistics_summary(filtered_df, len(df))
+    _render_statistics_summary(filtered_cube, len(df))
     
     st.markdown("---")
     
     # Data Table
-    st.markdown(f"Menampilkan **{len(filtered_df)}** klien dari total **{len(df)}** klien")
-    
-    # Apply conditional formatting
-    def highlight_priority(row):
-        if row['Opportunity Tag'] == 'TARGET SME LOAN':
-            return ['background-color: #ffebee'] * len(row)
-        elif row['Opportunity Tag'] == 'TARGET PAYROLL':
-            return ['background-color: #fff3e0'] * len(row)
-        elif row['Days Since Contact'] > 90:
-            return ['background-color: #fce4ec'] * len(row)
-        return [''] * len(row)
-    
-    display_df = filtered_df.copy()
+    st.markdown(f"Menampilkan **{filtered_cube.count()}** klien dari total **{len(df)}** klien")
+    
+    # Server-side sort and paging; only the visible page is styled and sent
+    col_t1, col_t2, col_t3, col_t4 = st.columns(4)
+    with col_t1:
+        sort_by = st.selectbox("Urutkan berdasarkan", ["Urutan Awal"] + list(df.columns))
+    with col_t2:
+        sort_direction = st.radio("Urutan", ["Naik", "Turun"], horizontal=True)
+    with col_t3:
+        page_size = st.selectbox("Baris per halaman", TABLE_PAGE_SIZES, index=TABLE_PAGE_SIZES.index(50))
+    with col_t4:
+        page = st.number_input("Halaman", min_value=1, value=1, step=1)
+    
+    # The page's rows come from the filter cube: giro sorts merge its giro-sorted cells,
+    # other orders are read from their head only up to the page
+    n_pages = page_count(filtered_cube.count(), page_size)
+    page = min(page, n_pages)
+    start, stop = (page - 1) * page_size, page * page_size
+    filters = dict(tag=filter_tag, sme=filter_sme)
+    if sort_by == GIRO_COLUMN:
+        positions = filter_cube.giro_positions(start, stop, sort_direction == "Naik", min_giro, **filters)
+    else:
+        order = None if sort_by == "Urutan Awal" else get_sort_order(sort_by, sort_direction == "Naik")
+        positions = filter_cube.positions(start, stop, min_giro, order, **filters)
     
     st.dataframe(
-        display_df.style.apply(highlight_priority, axis=1),
+        styled_page(df, positions),
         use_container_width=True,
         height=600,
         column_config={
+            "Client ID": st.column_config.NumberColumn("ID Klien", format="%d", width="small"),
             "Client Name": st.column_config.TextColumn("Nama Klien", width="medium"),
             "Avg Giro Balance (M)": st.column_config.NumberColumn("Saldo Giro (M)", format="Rp %.1f M"),
             "Potential Value (M)": st.column_config.NumberColumn("Nilai Potensial (M)", format="Rp %.1f M"),
@@ -74,6 +105,7 @@ def render_data_view(df):
             "Loyalty Status": st.column_config.TextColumn("Status Loyalitas", width="small"),
         }
     )
+    st.caption(f"Halaman {page} dari {n_pages}")
     
     # Legend
     col_leg1, col_leg2, col_leg3 = st.columns(3)
@@ -85,69 +117,75 @@ def render_data_view(df):
         st.markdown("🟣 **Pink highlight:** Not contacted >90 days")
 
 
-def _render_statistics_summary(filtered_df, total_clients):
+def _breakdown_figure(tag_counts):
+    """Clients per opportunity tag"""
+    fig_breakdown = px.bar(
+        x=tag_counts.values,
+        y=tag_counts.index,
+        orientation='h',
+        color=tag_counts.index,
+        color_discrete_map=OPPORTUNITY_COLORS,
+        text=tag_counts.values
+    )
+    fig_breakdown.update_traces(texttemplate='%{text} klien', textposition='outside')
+    fig_breakdown.update_layout(
+        showlegend=False,
+        height=200,
+        margin=dict(t=10, b=10, l=10, r=80),
+        xaxis_title="",
+        yaxis_title=""
+    )
+    return fig_breakdown
+
+
+def _value_figure(value_by_tag):
+    """Potential value per opportunity tag"""
+    fig_value = px.bar(
+        x=value_by_tag.values,
+        y=value_by_tag.index,
+        orientation='h',
+        color=value_by_tag.index,
+        color_discrete_map=OPPORTUNITY_COLORS,
+        text=value_by_tag.values
+    )
+    fig_value.update_traces(texttemplate='Rp %{text:,.0f}M', textposition='outside')
+    fig_value.update_layout(
+        showlegend=False,
+        height=200,
+        margin=dict(t=10, b=10, l=10, r=100),
+        xaxis_title="",
+        yaxis_title=""
+    )
+    return fig_value
+
+
+def _render_statistics_summary(cube, total_clients):
     """Render enhanced statistics summary"""
     
     st.subheader("📊 Ringkasan Statistik")
     
     # Calculate metrics
-    total_giro = filtered_df['Avg Giro Balance (M)'].sum()
-    total_potential = filtered_df['Potential Value (M)'].sum()
-    target_count = len(filtered_df[filtered_df["Opportunity Tag"].str.contains("TARGET")])
-    no_sme = len(filtered_df[filtered_df["SME Loan Status"] == "None"])
-    sme_active = len(filtered_df[filtered_df["SME Loan Status"] == "Active"])
-    payroll_active = len(filtered_df[filtered_df["Payroll Status"] == "Active"])
-    avg_tenure = filtered_df['Tenure Years'].mean()
-    avg_giro = filtered_df['Avg Giro Balance (M)'].mean()
+    n_clients = cube.count()
+    total_giro = cube.total('giro')
+    total_potential = cube.total('potential')
+    target_count = cube.count(tag=target_tags())
+    no_sme = cube.count(sme="None")
+    sme_active = cube.count(sme="Active")
+    payroll_active = cube.count(payroll="Active")
+    avg_tenure = cube.mean('tenure')
+    avg_giro = cube.mean('giro')
     
     # Top Row - Main KPIs with Enhanced Cards
-    col_stat1, col_stat2, col_stat3, col_stat4 = st.columns(4)
-    
-    with col_stat1:
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, #1976d2 0%, #42a5f5 100%); 
-                    padding: 25px; border-radius: 12px; text-align: center; color: white;
-                    box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
-            <h4 style="margin: 0; font-size: 14px; opacity: 0.9;">Total Giro</h4>
-            <h1 style="margin: 10px 0; font-size: 32px; font-weight: bold;">Rp {total_giro:,.0f}M</h1>
-            <p style="margin: 0; font-size: 12px; opacity: 0.8;">Avg: Rp {avg_giro:,.0f}M per klien</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col_stat2:
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); 
-                    padding: 25px; border-radius: 12px; text-align: center; color: white;
-                    box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
-            <h4 style="margin: 0; font-size: 14px; opacity: 0.9;">Total Potensial</h4>
-            <h1 style="margin: 10px 0; font-size: 32px; font-weight: bold;">Rp {total_potential:,.0f}M</h1>
-            <p style="margin: 0; font-size: 12px; opacity: 0.8;">Revenue opportunity</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col_stat3:
-        target_percentage = (target_count / len(filtered_df) * 100) if len(filtered_df) > 0 else 0
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, #ff6b6b 0%, #c92a2a 100%); 
-                    padding: 25px; border-radius: 12px; text-align: center; color: white;
-                    box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
-            <h4 style="margin: 0; font-size: 14px; opacity: 0.9;">Klien Target</h4>
-            <h1 style="margin: 10px 0; font-size: 32px; font-weight: bold;">{target_count}</h1>
-            <p style="margin: 0; font-size: 12px; opacity: 0.8;">{target_percentage:.1f}% dari portfolio</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col_stat4:
-        sme_gap_percentage = (no_sme / len(filtered_df) * 100) if len(filtered_df) > 0 else 0
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, #f57c00 0%, #e65100 100%); 
-                    padding: 25px; border-radius: 12px; text-align: center; color: white;
-                    box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
-            <h4 style="margin: 0; font-size: 14px; opacity: 0.9;">Tanpa Pinjaman SME</h4>
-            <h1 style="margin: 10px 0; font-size: 32px; font-weight: bold;">{no_sme}</h1>
-            <p style="margin: 0; font-size: 12px; opacity: 0.8;">{sme_gap_percentage:.1f}% - Opportunity!</p>
-        </div>
-        """, unsafe_allow_html=True)
+    target_percentage = (target_count / n_clients * 100) if n_clients > 0 else 0
+    sme_gap_percentage = (no_sme / n_clients * 100) if n_clients > 0 else 0
+    render_cards(_STAT_TILE.render_many({
+        'gradient': ["#1976d2 0%, #42a5f5 100%", "#f093fb 0%, #f5576c 100%",
+                     "#ff6b6b 0%, #c92a2a 100%", "#f57c00 0%, #e65100 100%"],
+        'title': ["Total Giro", "Total Potensial", "Klien Target", "Tanpa Pinjaman SME"],
+        'value': [f"Rp {total_giro:,.0f}M", f"Rp {total_potential:,.0f}M", target_count, no_sme],
+        'caption': [f"Avg: Rp {avg_giro:,.0f}M per klien", "Revenue opportunity",
+                    f"{target_percentage:.1f}% dari portfolio", f"{sme_gap_percentage:.1f}% - Opportunity!"]
+    }), columns=4)
     
     st.markdown("<br>", unsafe_allow_html=True)
     
@@ -155,24 +193,23 @@ def _render_statistics_summary(filtered_df, total_clients):
     col_pen1, col_pen2, col_pen3, col_pen4 = st.columns(4)
     
     with col_pen1:
-        sme_penetration = (sme_active / len(filtered_df)) if len(filtered_df) > 0 else 0
+        sme_penetration = (sme_active / n_clients) if n_clients > 0 else 0
         st.markdown("**SME Loan Penetration**")
         st.progress(sme_penetration)
-        st.caption(f"{sme_active}/{len(filtered_df)} klien ({sme_penetration*100:.1f}%)")
+        st.caption(f"{sme_active}/{n_clients} klien ({sme_penetration*100:.1f}%)")
     
     with col_pen2:
-        payroll_penetration = (payroll_active / len(filtered_df)) if len(filtered_df) > 0 else 0
+        payroll_penetration = (payroll_active / n_clients) if n_clients > 0 else 0
         st.markdown("**Payroll Penetration**")
         st.progress(payroll_penetration)
-        st.caption(f"{payroll_active}/{len(filtered_df)} klien ({payroll_penetration*100:.1f}%)")
+        st.caption(f"{payroll_active}/{n_clients} klien ({payroll_penetration*100:.1f}%)")
     
     with col_pen3:
-        full_package = len(filtered_df[(filtered_df["SME Loan Status"] == "Active") & 
-                                       (filtered_df["Payroll Status"] == "Active")])
-        full_penetration = (full_package / len(filtered_df)) if len(filtered_df) > 0 else 0
+        full_package = cube.count(sme="Active", payroll="Active")
+        full_penetration = (full_package / n_clients) if n_clients > 0 else 0
         st.markdown("**Full Package (SME+Payroll)**")
         st.progress(full_penetration)
-        st.caption(f"{full_package}/{len(filtered_df)} klien ({full_penetration*100:.1f}%)")
+        st.caption(f"{full_package}/{n_clients} klien ({full_penetration*100:.1f}%)")
     
     with col_pen4:
         st.metric("Avg Tenure", f"{avg_tenure:.1f} tahun", "Loyalty indicator")
@@ -184,45 +221,16 @@ def _render_statistics_summary(filtered_df, total_clients):
     
     with col_chart1:
         st.markdown("**📈 Opportunity Breakdown**")
-        tag_counts = filtered_df['Opportunity Tag'].value_counts()
+        tag_counts = cube.breakdown('tag').astype(int)
+        tag_counts = tag_counts[tag_counts > 0].sort_values(ascending=False, kind="stable")
         
-        fig_breakdown = px.bar(
-            x=tag_counts.values,
-            y=tag_counts.index,
-            orientation='h',
-            color=tag_counts.index,
-            color_discrete_map=OPPORTUNITY_COLORS,
-            text=tag_counts.values
-        )
-        fig_breakdown.update_traces(texttemplate='%{text} klien', textposition='outside')
-        fig_breakdown.update_layout(
-            showlegend=False,
-            height=200,
-            margin=dict(t=10, b=10, l=10, r=80),
-            xaxis_title="",
-            yaxis_title=""
-        )
+        fig_breakdown = cached_figure('data_view.breakdown', values_key(tag_counts), lambda: _breakdown_figure(tag_counts))
         st.plotly_chart(fig_breakdown, use_container_width=True)
     
     with col_chart2:
         st.markdown("**💰 Value Distribution**")
         
-        value_by_tag = filtered_df.groupby('Opportunity Tag')['Potential Value (M)'].sum().sort_values(ascending=True)
+        value_by_tag = cube.breakdown('tag', 'potential')[cube.breakdown('tag') > 0].sort_values(ascending=True)
         
-        fig_value = px.bar(
-            x=value_by_tag.values,
-            y=value_by_tag.index,
-            orientation='h',
-            color=value_by_tag.index,
-            color_discrete_map=OPPORTUNITY_COLORS,
-            text=value_by_tag.values
-        )
-        fig_value.update_traces(texttemplate='Rp %{text:,.0f}M', textposition='outside')
-        fig_value.update_layout(
-            showlegend=False,
-            height=200,
-            margin=dict(t=10, b=10, l=10, r=100),
-            xaxis_title="",
-            yaxis_title=""
-        )
+        fig_value = cached_figure('data_view.value', values_key(value_by_tag), lambda: _value_figure(value_by_tag))
         st.plotly_chart(fig_value, use_container_width=True)
@@ -3,15 +3,36 @@ Relationship Health View Component
 Displays customer relationship metrics and engagement tracking
 """
 
+import json
+import urllib.parse
+
+import numpy as np
 import streamlit as st
-from datetime import datetime
-from utils import generate_relationship_script
-from config import THRESHOLDS
+import streamlit.components.v1 as components
+from datetime import date
+from script_cache import cached_relationship_script
+from client_table import page_count, page_slice, sort_order, sorted_positions
+from config import CONTACT_TYPES, RELATIONSHIP_PAGE_SIZE, THRESHOLDS
+from contact_log import log_contact
+from fragments import timed_fragment
+from client_index import ClientIndex
+from kpi_cube import build_kpi_cube
 
 
-def render_relationship_health(df):
+@timed_fragment("relationship_health")
+def render_relationship_health(df, cube=None, client_index=None, contact_days=None, get_sort_order=None):
     """Render the Relationship Health view"""
     
+    if contact_days is not None:
+        # Fragment reruns get the frame of the last full run; refresh contacts logged since
+        df = contact_days.apply(df)
+    if cube is None:
+        cube = build_kpi_cube(df)
+    if client_index is None:
+        client_index = ClientIndex(df)
+    if get_sort_order is None:
+        get_sort_order = lambda column, ascending: sort_order(df, column, ascending)
+    
     st.header("💝 Relationship Health Dashboard")
     st.markdown("*Memastikan nasabah loyal merasa dihargai dan dikenali*")
     st.markdown("---")
@@ -20,28 +41,28 @@ def render_relationship_health(df):
     st.subheader("📊 Retention KPIs")
     col_r1, col_r2, col_r3, col_r4 = st.columns(4)
     
-    loyal_clients = df[df["Tenure Years"] > THRESHOLDS['loyal_client_years']]
-    ignored_loyal = df[(df["Tenure Years"] > THRESHOLDS['loyal_client_years']) & 
-                       (df["Days Since Contact"] > THRESHOLDS['contact_critical_days'])]
-    platinum_clients = df[df["Loyalty Status"] == "Platinum"]
-    at_risk_clients = df[(df["Avg Giro Balance (M)"] > THRESHOLDS['medium_value_giro']) & 
-                          (df["Days Since Contact"] > 120)]
+    total_clients = cube.count()
+    loyal_clients = cube.count(tenure=('>', THRESHOLDS['loyal_client_years']))
+    ignored_loyal = cube.count(tenure=('>', THRESHOLDS['loyal_client_years']),
+                               contact=('>', THRESHOLDS['contact_critical_days']))
+    platinum_clients = cube.count(loyalty="Platinum")
+    at_risk_clients = cube.count(giro=('>', THRESHOLDS['medium_value_giro']), contact=('>', 120))
     
     with col_r1:
-        st.metric("Nasabah Loyal (>10 Tahun)", len(loyal_clients), f"{len(loyal_clients)/len(df)*100:.0f}%")
+        st.metric("Nasabah Loyal (>10 Tahun)", loyal_clients, f"{loyal_clients/total_clients*100:.0f}%")
     with col_r2:
-        st.metric("Loyal Tapi Terabaikan", len(ignored_loyal), "Action needed!", delta_color="inverse")
+        st.metric("Loyal Tapi Terabaikan", ignored_loyal, "Action needed!", delta_color="inverse")
     with col_r3:
-        st.metric("Platinum Members", len(platinum_clients), f"{len(platinum_clients)/len(df)*100:.0f}%")
+        st.metric("Platinum Members", platinum_clients, f"{platinum_clients/total_clients*100:.0f}%")
     with col_r4:
-        st.metric("At-Risk (High Value)", len(at_risk_clients), "Need attention", delta_color="inverse")
+        st.metric("At-Risk (High Value)", at_risk_clients, "Need attention", delta_color="inverse")
     
     st.markdown("---")
     
     # Milestone Celebrations
     st.subheader("🎉 Milestone Celebrations - Top 3 Oldest Customers")
     
-    oldest_clients = df.nlargest(3, "Tenure Years")
+    oldest_clients = df.iloc[get_sort_order("Tenure Years", False)[:3]]
     
     for idx, row in oldest_clients.iterrows():
         with st.container():
@@ -63,7 +84,7 @@ def render_relationship_health(df):
             col_cel1, col_cel2 = st.columns([7, 3])
             
             with col_cel1:
-                celebration_script = generate_relationship_script(row)
+                celebration_script = cached_relationship_script(row)
                 st.text_area(
                     f"Skrip Apresiasi untuk {row['Client Name']}", 
                     value=celebration_script, 
@@ -75,11 +96,8 @@ def render_relationship_health(df):
                 st.write(f"**Catatan Terakhir:**")
                 st.info(row['Last Note'])
                 
-                if st.button(f"📋 Salin Skrip", key=f"copy_cel_{idx}"):
-                    st.success("Skrip berhasil disalin!")
-                
-                if st.button(f"✉️ Kirim WA", key=f"send_cel_{idx}"):
-                    st.success("Membuka WhatsApp...")
+                _render_copy_button(celebration_script, "margin-bottom: 10px;")
+                _render_whatsapp_link(celebration_script)
     
     st.markdown("---")
     
@@ -87,26 +105,32 @@ def render_relationship_health(df):
     tab1, tab2 = st.tabs(["🎯 Priority Recognition", "🔄 Re-engagement Needed"])
     
     with tab1:
-        _render_priority_recognition(df)
+        _render_priority_recognition(df, get_sort_order)
     
     with tab2:
-        _render_reengagement_needed(df)
+        _render_reengagement_needed(df, get_sort_order)
     
     # Context Log Panel
-    if st.session_state.get('selected_relationship_client'):
-        _render_context_log(df)
+    if st.session_state.get('selected_relationship_client') is not None:
+        _render_context_log(df, client_index)
 
 
-def _render_priority_recognition(df):
+def _render_priority_recognition(df, get_sort_order):
     """Render priority recognition tab"""
     st.subheader("Nasabah High Tenure yang Perlu Pengakuan")
     
-    high_tenure = df[df["Tenure Years"] >= THRESHOLDS['loyal_client_years']].sort_values("Tenure Years", ascending=False)
+    loyal = np.flatnonzero(df["Tenure Years"].to_numpy() >= THRESHOLDS['loyal_client_years'])
+    high_tenure = sorted_positions(loyal, get_sort_order("Tenure Years", False), len(df))
     
     st.markdown(f"**{len(high_tenure)} nasabah** telah setia lebih dari 10 tahun")
     
-    for idx, row in high_tenure.iterrows():
-        with st.expander(f"📌 {row['Client Name']} - {row['Tenure Years']} tahun - {row['Loyalty Status']}"):
+    for position in _page_positions(high_tenure, "priority_page"):
+        row = df.iloc[position]
+        expander = st.expander(f"📌 {row['Client Name']} - {row['Tenure Years']} tahun - {row['Loyalty Status']}",
+                               key=f"priority_{row['Client ID']}", on_change="rerun")
+        if not expander.open:
+            continue
+        with expander:
             col_t1, col_t2, col_t3 = st.columns([2, 2, 1])
             
             with col_t1:
@@ -120,34 +144,39 @@ def _render_priority_recognition(df):
                 st.write(f"**Tag Peluang:** {row['Opportunity Tag']}")
             
             with col_t3:
-                if st.button(f"🔍 Detail", key=f"detail_t1_{idx}"):
-                    st.session_state['selected_relationship_client'] = row['Client Name']
-                    st.rerun()
+                if st.button(f"🔍 Detail", key=f"detail_t1_{position}"):
+                    st.session_state['selected_relationship_client'] = int(row['Client ID'])
             
             st.markdown("**Context:**")
             st.info(row['Last Note'])
 
 
-def _render_reengagement_needed(df):
+def _render_reengagement_needed(df, get_sort_order):
     """Render re-engagement needed tab"""
     st.subheader("Nasabah Bernilai Tinggi yang Lama Tidak Dihubungi")
     
-    reengagement = df[(df["Avg Giro Balance (M)"] >= THRESHOLDS['medium_value_giro']) & 
-                      (df["Days Since Contact"] > 60)].sort_values("Days Since Contact", ascending=False)
+    neglected = np.flatnonzero((df["Avg Giro Balance (M)"].to_numpy() >= THRESHOLDS['medium_value_giro']) &
+                               (df["Days Since Contact"].to_numpy() > 60))
+    reengagement = sorted_positions(neglected, get_sort_order("Days Since Contact", False), len(df))
     
     st.markdown(f"**{len(reengagement)} nasabah** dengan saldo tinggi namun lama tidak dihubungi")
     
-    for idx, row in reengagement.iterrows():
+    for position in _page_positions(reengagement, "reengagement_page"):
+        row = df.iloc[position]
         days = row['Days Since Contact']
         
         if days > 180:
-            urgency_label = "🔴 CRITICAL"
+            urgency_label = "CRITICAL"
         elif days > 90:
-            urgency_label = "🟠 HIGH"
+            urgency_label = "HIGH"
         else:
-            urgency_label = "🟡 MEDIUM"
+            urgency_label = "MEDIUM"
         
-        with st.expander(f"{urgency_label} {row['Client Name']} - {days} hari | {row['Tenure Years']} tahun tenure"):
+        expander = st.expander(f"{urgency_label} {row['Client Name']} - {days} hari | {row['Tenure Years']} tahun tenure",
+                               key=f"reengagement_{row['Client ID']}", on_change="rerun")
+        if not expander.open:
+            continue
+        with expander:
             col_t1, col_t2, col_t3 = st.columns([2, 2, 1])
             
             with col_t1:
@@ -161,20 +190,32 @@ def _render_reengagement_needed(df):
                 st.write(f"**Risiko:** {'Sangat Tinggi' if days > 180 else 'Tinggi' if days > 90 else 'Sedang'}")
             
             with col_t3:
-                if st.button(f"🔍 Re-engage", key=f"detail_t2_{idx}"):
-                    st.session_state['selected_relationship_client'] = row['Client Name']
-                    st.rerun()
+                if st.button(f"🔍 Re-engage", key=f"detail_t2_{position}"):
+                    st.session_state['selected_relationship_client'] = int(row['Client ID'])
             
             st.markdown("**Last Context:**")
             st.warning(row['Last Note'])
 
 
-def _render_context_log(df):
+def _page_positions(positions, key):
+    """Row positions on the selected page of a client list; the pager only shows for several pages"""
+    n_pages = page_count(len(positions), RELATIONSHIP_PAGE_SIZE)
+    if n_pages == 1:
+        return positions
+    page = st.number_input(f"Halaman (1-{n_pages})", min_value=1, max_value=n_pages, value=1, step=1, key=key)
+    return page_slice(positions, page, RELATIONSHIP_PAGE_SIZE)
+
+
+@timed_fragment("relationship_context_log")
+def _render_context_log(df, client_index):
     """Render context log panel"""
-    st.markdown("---")
-    st.subheader(f"📝 Context Log: {st.session_state['selected_relationship_client']}")
+    # A saved contact changes Days Since Contact everywhere (KPIs, lists, sidebar), not only in this panel
+    if st.session_state.pop('contact_moved', False):
+        st.rerun(scope="app")
+    client_row = client_index.row(df, st.session_state['selected_relationship_client'])
     
-    client_row = df[df["Client Name"] == st.session_state['selected_relationship_client']].iloc[0]
+    st.markdown("---")
+    st.subheader(f"📝 Context Log: {client_row['Client Name']}")
     
     col_ctx1, col_ctx2 = st.columns([6, 4])
     
@@ -200,7 +241,7 @@ def _render_context_log(df):
         
         st.markdown("---")
         st.markdown("**Suggested Greeting Script:**")
-        greeting_script = generate_relationship_script(client_row)
+        greeting_script = cached_relationship_script(client_row)
         st.text_area(
             "Draft Pesan",
             value=greeting_script,
@@ -210,29 +251,26 @@ def _render_context_log(df):
         
         col_btn1, col_btn2 = st.columns(2)
         with col_btn1:
-            if st.button("📋 Salin Skrip"):
-                st.success("Skrip berhasil disalin!")
+            _render_copy_button(greeting_script)
         with col_btn2:
-            if st.button("✉️ Kirim via WA"):
-                st.success("Membuka WhatsApp...")
+            _render_whatsapp_link(greeting_script)
     
     with col_ctx2:
         st.markdown("**Quick Actions:**")
         
         with st.form("relationship_update"):
-            contact_date = st.date_input("Tanggal Kontak", datetime.now())
-            contact_type = st.selectbox(
-                "Tipe Kontak",
-                ["Phone Call", "WhatsApp", "Email", "Meeting", "Courtesy Visit"]
-            )
-            notes = st.text_area("Catatan Baru", placeholder="Tambahkan catatan tentang interaksi...")
-            next_action = st.text_input("Follow-up Action", placeholder="Tindakan selanjutnya...")
+            st.date_input("Tanggal Kontak", date.today(), max_value=date.today(), key="contact_date")
+            st.selectbox("Tipe Kontak", CONTACT_TYPES, key="contact_type")
+            st.text_area("Catatan Baru", placeholder="Tambahkan catatan tentang interaksi...", key="contact_notes")
+            st.text_input("Follow-up Action", placeholder="Tindakan selanjutnya...", key="contact_next_action")
             
-            submitted = st.form_submit_button("💾 Simpan Log Kontak")
+            # Saved in the callback, before the rerun, so the next run already shows the new contact
+            st.form_submit_button("💾 Simpan Log Kontak", on_click=_save_contact, args=(client_row,))
             
-            if submitted:
+            saved = st.session_state.pop('contact_saved', None)
+            if saved is not None:
                 st.success(f"Log kontak untuk {client_row['Client Name']} berhasil disimpan!")
-                st.info(f"Kontak via {contact_type} pada {contact_date}")
+                st.info(f"Kontak via {saved['contact_type']} pada {saved['contact_date']}")
         
         st.markdown("---")
         st.markdown("**Red Flags:**")
@@ -247,3 +285,42 @@ def _render_context_log(df):
         
         if client_row['Tenure Years'] > 15 and client_row['Days Since Contact'] > 60:
             st.error("Nasabah VIP lama tidak diperhatikan!")
+
+
+def _save_contact(client_row):
+    """Form callback: append the contact to the log and move the client's last contact date"""
+    saved = {
+        'contact_date': st.session_state['contact_date'],
+        'contact_type': st.session_state['contact_type']
+    }
+    moved = log_contact(client_row['Client ID'], saved['contact_date'], saved['contact_type'],
+                        st.session_state['contact_notes'], st.session_state['contact_next_action'])
+    st.session_state['contact_saved'] = saved
+    st.session_state['contact_moved'] = moved
+
+
+def _render_copy_button(script, extra_style=""):
+    """Copy-to-clipboard button, handled in the browser without a rerun"""
+    script_json = json.dumps(script)
+    components.html(f"""
+    <button onclick="copyToClipboard()" 
+            style="background: #4CAF50; color: white; border: none; padding: 8px 16px; 
+                   border-radius: 5px; cursor: pointer; width: 100%; {extra_style}">
+        📋 Salin Skrip
+    </button>
+    <script>
+    function copyToClipboard() {{
+        navigator.clipboard.writeText({script_json}).then(function() {{
+            alert('Skrip berhasil disalin ke clipboard!');
+        }}).catch(function(err) {{
+            alert('Gagal menyalin: ' + err);
+        }});
+    }}
+    </script>
+    """, height=50)
+
+
+def _render_whatsapp_link(script):
+    """Button linking to WhatsApp with the script as the message"""
+    wa_link = f"https://wa.me/6286276272612?text={urllib.parse.quote(script)}"
+    st.markdown(f'<a href="{wa_link}" target="_blank"><button style="background: #25D366; color: white; border: none; padding: 8px 16px; border-radius: 5px; cursor: pointer; width: 100%;">✉️ Kirim WA</button></a>', unsafe_allow_html=True)
@@ -0,0 +1,192 @@
+"""
+Sidebar Component
+Displays the RM profile, branch KPIs, portfolio alerts and the view navigation
+"""
+
+from datetime import datetime
+
+import streamlit as st
+from config import LLM_BACKEND, USER_PROFILE
+from kpi_cube import build_kpi_cube
+from script_cache import script_cache_stats
+
+VIEWS = ["Smart Opportunities", "Relationship Health", "Data View", "Analytics"]
+
+
+def render_sidebar(df, cube=None):
+    """Render the sidebar; returns the selected view and the number of priority leads"""
+    
+    if cube is None:
+        cube = build_kpi_cube(df)
+    
+    with st.sidebar:
+        st.title("🏦 Mandiri Smart-RM")
+        st.markdown("---")
+        
+        # User Profile
+        st.markdown("### 👤 Profil")
+        st.write(f"**RM:** {USER_PROFILE['name']}")
+        st.write(f"**Cabang:** {USER_PROFILE['branch']}")
+        st.write(f"**Tanggal:** {datetime.now().strftime('%d %B %Y')}")
+        top_k_leads = st.number_input(
+            "Jumlah Leads Prioritas",
+            min_value=1,
+            max_value=50,
+            value=USER_PROFILE['top_k_leads'],
+            key="top_k_leads"
+        )
+        
+        st.markdown("---")
+        
+        # Branch KPIs
+        st.markdown("### 📊 Performa Cabang")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric(
+                label="Giro (Funding)", 
+                value="118%", 
+                delta="+Rp 98M",
+                delta_color="normal"
+            )
+        with col2:
+            st.metric(
+                label="SME (Lending)", 
+                value="33%", 
+                delta="-Rp 144M",
+                delta_color="inverse"
+            )
+        
+        # Enhanced visual progress bar for SME penetration
+        st.markdown("### SME Penetration")
+        sme_penetration = 0.33
+        color = '#d32f2f' if sme_penetration < 0.4 else '#f57c00' if sme_penetration < 0.7 else '#388e3c'
+        
+        st.markdown(f"""
+        <style>
+        .stProgress > div > div > div > div {{
+            background-color: {color};
+        }}
+        </style>
+        """, unsafe_allow_html=True)
+        
+        st.progress(sme_penetration)
+        st.caption(f"Target: 100% | Current: {sme_penetration*100:.0f}%")
+        
+        st.metric(
+            label="Tabungan (Retail)", 
+            value="85%", 
+            delta="-Rp 22M",
+            delta_color="inverse"
+        )
+        
+        st.markdown("---")
+        
+        # Problem Statement - Enhanced with Metrics and Actions
+        sme_gap = cube.count(sme="None")
+        sme_gap_percentage = (sme_gap / cube.count()) * 100
+        potential_revenue = cube.total('potential', sme="None", giro=('>=', 2000))
+        
+        st.markdown(f"""
+        <div style="
+            background: linear-gradient(135deg, #ff6b6b 0%, #c92a2a 100%);
+            padding: 20px;
+            border-radius: 10px;
+            border-left: 5px solid #a61e1e;
+            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+            margin: 10px 0;
+        ">
+            <h3 style="color: white; margin: 0 0 10px 0; font-size: 18px;">
+                LIQUIDITY UNBALANCE
+            </h3>
+            <p style="color: white; margin: 0 0 15px 0; font-size: 14px; line-height: 1.6;">
+                Funding Giro tinggi namun lending SME sangat rendah. 
+                <strong>Diperlukan tindakan segera</strong> untuk menyeimbangkan portfolio.
+            </p>
+            <div style="background: rgba(255,255,255,0.2); padding: 10px; border-radius: 5px; margin-bottom: 10px;">
+                <div style="display: flex; justify-content: space-between; margin-bottom: 5px;">
+                    <span style="color: white; font-size: 12px;">Klien Tanpa Pinjaman SME</span>
+                    <span style="color: white; font-weight: bold;">{sme_gap} klien ({sme_gap_percentage:.0f}%)</span>
+                </div>
+                <div style="background: rgba(255,255,255,0.3); height: 6px; border-radius: 3px; overflow: hidden;">
+                    <div style="background: white; width: {sme_gap_percentage}%; height: 100%;"></div>
+                </div>
+            </div>
+            <div style="background: rgba(255,255,255,0.2); padding: 10px; border-radius: 5px;">
+                <div style="color: white; font-size: 12px; margin-bottom: 3px;">Potensi Revenue</div>
+                <div style="color: white; font-size: 20px; font-weight: bold;">Rp {potential_revenue:.0f}M</div>
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        if st.button("📊 View SME Opportunities", key="nav_sme", use_container_width=True):
+            st.session_state['nav_override'] = "Smart Opportunities"
+            st.rerun()
+        
+        # Relationship Health Alert - Enhanced
+        loyal_clients = cube.count(tenure=('>', 10))
+        ignored_loyal = cube.count(tenure=('>', 10), contact=('>', 90))
+        ignored_percentage = (ignored_loyal / loyal_clients) * 100 if loyal_clients > 0 else 0
+        at_risk_value = cube.total('giro', tenure=('>', 10), contact=('>', 90))
+        
+        st.markdown(f"""
+        <div style="
+            background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
+            padding: 20px;
+            border-radius: 10px;
+            border-left: 5px solid #a626d3;
+            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+            margin: 10px 0;
+        ">
+            <h3 style="color: white; margin: 0 0 10px 0; font-size: 18px;">
+                RELATIONSHIP RISK
+            </h3>
+            <p style="color: white; margin: 0 0 15px 0; font-size: 14px; line-height: 1.6;">
+                <strong>{ignored_loyal} nasabah loyal</strong> (>10 tahun) belum dihubungi lebih dari 90 hari. 
+                Risiko churn tinggi jika tidak segera ditangani.
+            </p>
+            <div style="background: rgba(255,255,255,0.2); padding: 10px; border-radius: 5px; margin-bottom: 10px;">
+                <div style="display: flex; justify-content: space-between; margin-bottom: 5px;">
+                    <span style="color: white; font-size: 12px;">Loyal Clients Terabaikan</span>
+                    <span style="color: white; font-weight: bold;">{ignored_loyal}/{loyal_clients} ({ignored_percentage:.0f}%)</span>
+                </div>
+                <div style="background: rgba(255,255,255,0.3); height: 6px; border-radius: 3px; overflow: hidden;">
+                    <div style="background: white; width: {ignored_percentage}%; height: 100%;"></div>
+                </div>
+            </div>
+            <div style="background: rgba(255,255,255,0.2); padding: 10px; border-radius: 5px;">
+                <div style="color: white; font-size: 12px; margin-bottom: 3px;">Nilai Portfolio At-Risk</div>
+                <div style="color: white; font-size: 20px; font-weight: bold;">Rp {at_risk_value:.0f}M</div>
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        if st.button("💝 View Relationship Health", key="nav_relationship", use_container_width=True):
+            st.session_state['nav_override'] = "Relationship Health"
+            st.rerun()
+        
+        st.markdown("---")
+        
+        # Navigation - Check for override from alert buttons
+        if 'nav_override' in st.session_state and st.session_state['nav_override']:
+            default_view = st.session_state['nav_override']
+            st.session_state['nav_override'] = None  # Clear override
+        else:
+            default_view = "Smart Opportunities"
+        
+        view_mode = st.radio(
+            "📍 Navigasi", 
+            VIEWS,
+            index=VIEWS.index(default_view) if default_view in VIEWS else 0
+        )
+        
+        script_stats = script_cache_stats()
+        st.caption(f"⚡ Cache skrip: {script_stats['hit_rate']*100:.0f}% hit · {script_stats['entries']} entri")
+        if LLM_BACKEND['url']:
+            # The model-server client is only loaded when a backend is configured
+            from llm_backend import get_analysis_client
+            llm_stats = get_analysis_client().stats()
+            st.caption(f"🧠 Model AI: p50 {llm_stats['p50']:.0f} ms · p95 {llm_stats['p95']:.0f} ms · "
+                       f"{llm_stats['fallbacks']} fallback")
+    
+    return view_mode, top_k_leads
@@ -1,21 +1,196 @@
 """
 Smart Opportunities View Component
-Displays priority leads and opportunity analysis
+Displays priority leads, the remaining clients and the Co-Pilot panel of the selected client
 """
 
+import numpy as np
 import streamlit as st
-from utils import mock_ai_analysis, generate_script
+import streamlit.components.v1 as components
+from cards import CardTemplate, render_cards
+from client_index import ClientIndex
+from client_table import page_count, page_excluding, sort_order
+from config import (CARD_PAGE_SIZE, OPPORTUNITY_COLORS, OTHER_CLIENTS_PAGE_SIZE, PIPELINE_STATUSES, PREFETCH,
+                    USER_PROFILE)
+from fragments import timed_fragment
+from lead_index import LeadIndex
+from llm_backend import analyze_client
+from pipeline_store import get_pipeline_store
+from prefetch import prefetch_clients
+from script_cache import cached_script
 
 
-def render_smart_opportunities(df):
+_LEAD_CARD = CardTemplate("""
+<div style="
+    border-left: 6px solid {border_color};
+    background: {bg_color};
+    padding: 15px;
+    border-radius: 8px;
+    margin-bottom: 15px;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+">
+    <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 10px;">
+        <h4 style="margin: 0;">{icon} {name}</h4>
+        <span style="
+            background: {border_color};
+            color: white;
+            padding: 4px 12px;
+            border-radius: 12px;
+            font-size: 12px;
+            font-weight: bold;
+        ">{tag_badge}</span>
+    </div>
+    <div style="display: flex; gap: 15px; align-items: center;">
+        <div style="flex: 3;">
+            <div><strong>Saldo Giro:</strong> Rp {giro}M</div>
+            <div style="background: #e0e0e0; border-radius: 4px; height: 8px; margin: 4px 0 10px 0;">
+                <div style="background: #ff4b4b; border-radius: 4px; height: 8px; width: {giro_pct:.1f}%;"></div>
+            </div>
+            <div><strong>Nilai Potensial:</strong> Rp {potential}M</div>
+            <div style="background: #e0e0e0; border-radius: 4px; height: 8px; margin: 4px 0 0 0;">
+                <div style="background: #ff4b4b; border-radius: 4px; height: 8px; width: {potential_pct:.1f}%;"></div>
+            </div>
+        </div>
+        <div style="flex: 2; text-align: center;">
+            <div style="font-size: 11px; color: #666;">Frekuensi Transaksi</div>
+            <div style="font-size: 24px;">{freq_badge}</div>
+            <div style="color: {freq_color}; font-weight: bold; margin-bottom: 10px;">{freq}</div>
+            <div style="font-size: 11px; color: #666;">Priority Score</div>
+            <div style="font-size: 28px; font-weight: bold; color: {border_color};">{priority_score}</div>
+        </div>
+    </div>
+</div>
+""", "lead")
+
+_COMPACT_CARD = CardTemplate("""
+<div style="
+    border: 1px solid #e0e0e0;
+    border-left: 4px solid {tag_color};
+    padding: 10px;
+    border-radius: 6px;
+">
+    <div style="display: flex; justify-content: space-between; align-items: center; gap: 6px;">
+        <strong style="font-size: 14px;">{name}</strong>
+        <span style="
+            background: {tag_color};
+            color: white;
+            padding: 2px 6px;
+            border-radius: 5px;
+            font-size: 10px;
+            white-space: nowrap;
+        ">{tag_label}</span>
+    </div>
+    <div style="font-size: 13px; margin-top: 6px;">Saldo Giro: <strong>Rp {giro}M</strong> • Potensial: <strong>Rp {potential}M</strong></div>
+    <div style="font-size: 12px; color: #666; margin-top: 4px;">📍 {sme} SME | {payroll} Payroll</div>
+    <div style="font-size: 12px; color: #666;">🔄 {freq} | 📅 {days} hari lalu</div>
+</div>
+""", "compact")
+
+
+_PROFILE_TILE = CardTemplate("""
+<div style="
+    background: linear-gradient(135deg, {color} 0%, {color}cc 100%);
+    padding: 15px;
+    border-radius: 8px;
+    text-align: center;
+    color: white;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+">
+    <div style="font-size: 12px; opacity: 0.9;">{title}</div>
+    <div style="font-size: 24px; font-weight: bold; margin: 5px 0;">{value}</div>
+    <div style="font-size: 11px;">{caption}</div>
+</div>
+""", "profile tile")
+
+_METRIC_TILE = CardTemplate("""
+<div style="
+    background: linear-gradient(135deg, {background});
+    padding: 15px;
+    border-radius: 8px;
+    color: white;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+">
+    <div style="display: flex; align-items: center; gap: 10px;">
+        <div style="font-size: 28px;">{icon}</div>
+        <div style="flex: 1;">
+            <div style="font-size: 12px; opacity: 0.9;">{title}</div>
+            <div style="font-size: 22px; font-weight: bold;">{value}</div>
+        </div>
+    </div>
+</div>
+""", "metric tile")
+
+
+def _lead_card_columns(leads):
+    """Card slots of the priority leads, computed column-wise"""
+    sme = (leads["Opportunity Tag"] == "TARGET SME LOAN").to_numpy()
+    freq = leads["Transaction Frequency"].astype(str).to_numpy()
+    giro = leads["Avg Giro Balance (M)"].to_numpy(dtype=float)
+    potential = leads["Potential Value (M)"].to_numpy(dtype=float)
+    frequency_levels = [freq == "Low", freq == "Medium"]
+    return {
+        'border_color': np.where(sme, "#e74c3c", "#3498db"),
+        'bg_color': np.where(sme, "#fee", "#eef"),
+        'icon': np.where(sme, "💰", "💼"),
+        'tag_badge': np.where(sme, "SME LOAN", "PAYROLL"),
+        'name': leads["Client Name"],
+        'giro': leads["Avg Giro Balance (M)"],
+        'giro_pct': np.minimum(100, giro / 10000 * 100),
+        'potential': leads["Potential Value (M)"],
+        'potential_pct': np.minimum(100, potential / 3000 * 100),
+        'freq': freq,
+        'freq_badge': np.select(frequency_levels, ["🔴", "🟡"], default="🟢"),
+        'freq_color': np.select(frequency_levels, ["#e74c3c", "#f39c12"], default="#27ae60"),
+        # Priority score (0-100)
+        'priority_score': np.minimum(100, (potential / 100 + np.select([freq == "High", freq == "Medium"], [50, 25], 0))
+                                     .astype(int))
+    }
+
+
+def _compact_card_columns(clients):
+    """Card slots of a page of other clients, computed column-wise"""
+    tags = clients["Opportunity Tag"].astype(str)
+    return {
+        'tag_color': tags.map(OPPORTUNITY_COLORS).fillna('#95a5a6'),
+        'tag_label': tags.str.replace('TARGET ', '', regex=False),
+        'name': clients["Client Name"],
+        'giro': clients["Avg Giro Balance (M)"],
+        'potential': clients["Potential Value (M)"],
+        'sme': clients["SME Loan Status"],
+        'payroll': clients["Payroll Status"],
+        'freq': clients["Transaction Frequency"],
+        'days': clients["Days Since Contact"]
+    }
+
+
+def _select_from(key):
+    """Widget callback: analyse the client picked in a selection widget, then clear the widget"""
+    if st.session_state[key] is not None:
+        st.session_state['selected_client'] = st.session_state[key]
+    st.session_state[key] = None
+
+
+@timed_fragment("smart_opportunities")
+def render_smart_opportunities(df, lead_index=None, client_index=None, top_k=USER_PROFILE['top_k_leads'],
+                               get_sort_order=None):
     """Render the Smart Opportunities view"""
     
-    # Filter high-priority leads
-    priority_leads = df[df["Opportunity Tag"].str.contains("TARGET")].nlargest(5, "Potential Value (M)")
+    if lead_index is None:
+        lead_index = LeadIndex(df)
+    if client_index is None:
+        client_index = ClientIndex(df)
+    if get_sort_order is None:
+        get_sort_order = lambda column, ascending: sort_order(df, column, ascending)
     
-    # Summary Dashboard at Top
+    # ========== SUMMARY DASHBOARD AT TOP ==========
     st.header("🎯 Peluang Hari Ini")
     
+    # High-priority leads from the maintained index
+    lead_positions = lead_index.top_k(top_k)
+    priority_leads = df.iloc[lead_positions]
+    # Warm insights and scripts in the background while the page renders
+    prefetch_clients(priority_leads)
+    
+    # Visual Summary Dashboard
     col_sum1, col_sum2, col_sum3, col_sum4 = st.columns(4)
     
     with col_sum1:
@@ -55,96 +230,276 @@ def render_smart_opportunities(df):
     
     col_middle, col_right = st.columns([4, 6])
 
-    # Action List
+    # ========== ZONE 2: MIDDLE COLUMN (ACTION LIST) ==========
     with col_middle:
         st.subheader(f"📋 {len(priority_leads)} Leads Aktif")
         
-        for idx, row in priority_leads.iterrows():
-            with st.container():
-                if row["Opportunity Tag"] == "TARGET SME LOAN":
-                    border_color = "#e74c3c"
-                    bg_color = "#fee"
-                    icon = "💰"
-                    tag_badge = "SME LOAN"
-                else:
-                    border_color = "#3498db"
-                    bg_color = "#eff"
-                    icon = "💼"
-                    tag_badge = "PAYROLL"
-                
-                st.markdown(f"""
-                <div style="
-                    border-left: 5px solid {border_color};
-                    background-color: {bg_color};
-                    padding: 15px;
-                    margin: 10px 0;
-                    border-radius: 5px;
-                ">
-                    <h4 style="margin: 0; color: #333;">{icon} {row['Client Name']}</h4>
-                    <p style="margin: 5px 0;"><strong>Giro:</strong> Rp {row['Avg Giro Balance (M)']}M | <strong>Potensial:</strong> Rp {row['Potential Value (M)']}M</p>
-                    <span style="
-                        background-color: {border_color};
-                        color: white;
-                        padding: 3px 10px;
-                        border-radius: 3px;
-                        font-size: 12px;
-                        font-weight: bold;
-                    ">{tag_badge}</span>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                if st.button(f"🔍 Analisis {row['Client Name']}", key=f"analyze_{idx}"):
-                    st.session_state['selected_client'] = row['Client Name']
-                    st.rerun()
+        # Display top leads as enhanced visual cards, sent as one element
+        render_cards(_LEAD_CARD.render_many(_lead_card_columns(priority_leads)))
+        
+        # Selection clears itself, so the same lead can be picked again
+        st.pills(
+            "🔍 Analisis Detail",
+            priority_leads['Client ID'].tolist(),
+            format_func=dict(zip(priority_leads['Client ID'].tolist(), priority_leads['Client Name'].tolist())).get,
+            key="lead_pick",
+            on_change=_select_from,
+            args=("lead_pick",)
+        )
+        
+        # ========== OTHER CLIENTS SECTION ==========
+        st.markdown("---")
+        st.subheader(f"📊 Klien Lainnya ({len(df) - len(priority_leads)} klien)")
+        
+        # Other clients by giro, from the cached sort order; only the shown page is read
+        giro_order = get_sort_order('Avg Giro Balance (M)', False)
+        n_others = len(df) - len(priority_leads)
+        
+        # Display options
+        display_mode = st.radio(
+            "Tampilkan sebagai:",
+            ["Compact Cards", "Table View"],
+            horizontal=True,
+            key="other_clients_view"
+        )
+        page_size = CARD_PAGE_SIZE if display_mode == "Compact Cards" else OTHER_CLIENTS_PAGE_SIZE
+        n_pages = page_count(n_others, page_size)
+        page = 1
+        if n_pages > 1:
+            # One page widget per mode, as the page sizes differ
+            page = st.number_input(f"Halaman (1-{n_pages})", min_value=1, max_value=n_pages, value=1, step=1,
+                                   key=f"other_clients_page:{display_mode}")
+        page_clients = df.iloc[page_excluding(giro_order, lead_positions, page, page_size)]
+        
+        if display_mode == "Compact Cards":
+            # One page of compact cards, sent as one element
+            prefetch_clients(page_clients)
+            render_cards(_COMPACT_CARD.render_many(_compact_card_columns(page_clients)), columns=2, gap="10px")
+        
+        else:
+            # Table view of one page
+            prefetch_clients(page_clients.head(PREFETCH['other_clients']))
+            table_df = page_clients[['Client Name', 'Avg Giro Balance (M)', 'Potential Value (M)', 
+                                     'Opportunity Tag', 'Transaction Frequency', 'Days Since Contact']]
+            
+            # Add analyze column with buttons
+            st.dataframe(
+                table_df,
+                use_container_width=True,
+                height=400,
+                column_config={
+                    "Client Name": st.column_config.TextColumn("Nama Klien", width="medium"),
+                    "Avg Giro Balance (M)": st.column_config.NumberColumn("Giro (M)", format="Rp %.1f M"),
+                    "Potential Value (M)": st.column_config.NumberColumn("Potensial (M)", format="Rp %.1f M"),
+                    "Opportunity Tag": st.column_config.TextColumn("Tag", width="medium"),
+                    "Transaction Frequency": st.column_config.TextColumn("Freq", width="small"),
+                    "Days Since Contact": st.column_config.NumberColumn("Hari", format="%d hari"),
+                }
+            )
+        
+        # Quick analyze selector below the cards or table, over the clients of the shown page
+        st.markdown("**Pilih klien untuk analisis:**")
+        other_names = dict(zip(page_clients['Client ID'].tolist(), page_clients['Client Name'].tolist()))
+        if st.session_state.get("select_other_client") not in other_names:
+            # The previous pick is on another page
+            st.session_state["select_other_client"] = None
+        selected_client_id = st.selectbox(
+            "Klien",
+            options=[None] + list(other_names),
+            format_func=lambda client_id: "-- Pilih Klien --" if client_id is None else other_names[client_id],
+            key="select_other_client"
+        )
+        
+        col_btn1, col_btn2 = st.columns([1, 3])
+        with col_btn1:
+            if st.button("🔍 Analisis Client Terpilih", disabled=(selected_client_id is None)):
+                st.session_state['selected_client'] = selected_client_id
+        with col_btn2:
+            if selected_client_id is not None:
+                st.info(f"Siap menganalisis: {other_names[selected_client_id]}")
 
-    # Analysis Panel
+    # ========== ZONE 3: RIGHT COLUMN (CO-PILOT PANEL) ==========
     with col_right:
-        if st.session_state.get('selected_client'):
-            st.subheader(f"🤖 AI Analysis: {st.session_state['selected_client']}")
+        render_copilot_panel(df, client_index)
+
+
+@timed_fragment("copilot_panel")
+def render_copilot_panel(df, client_index, pipeline_store=None):
+    """Render the Co-Pilot panel of the selected client"""
+    if pipeline_store is None:
+        pipeline_store = get_pipeline_store()
+    if st.session_state['selected_client'] is not None:
+        client_id = st.session_state['selected_client']
+        client_row = client_index.row(df, client_id)
+        client_name = client_row['Client Name']
+        
+        st.header(f"🤖 Co-Pilot: {client_name}")
+        
+        # Client Profile Section - Enhanced with Color-Coded Cards
+        st.subheader("📋 Profil Klien")
+        
+        # Timeline/Context Row
+        loyalty = client_row['Loyalty Status']
+        loyalty_color = "#9b59b6" if loyalty == "Platinum" else "#3498db" if loyalty == "Gold" else "#95a5a6"
+        days_contact = client_row['Days Since Contact']
+        contact_color = "#27ae60" if days_contact < 30 else "#f39c12" if days_contact < 90 else "#e74c3c"
+        contact_status = "Good" if days_contact < 30 else "Warning" if days_contact < 90 else "Critical"
+        freq = client_row['Transaction Frequency']
+        freq_color = "#27ae60" if freq == "High" else "#f39c12" if freq == "Medium" else "#e74c3c"
+        freq_icon = "🟢" if freq == "High" else "🟡" if freq == "Medium" else "🔴"
+        render_cards(_PROFILE_TILE.render_many({
+            'color': [loyalty_color, contact_color, freq_color],
+            'title': ["Tenure", "Last Contact", "Frekuensi"],
+            'value': [client_row['Tenure Years'], days_contact, freq_icon],
+            'caption': [f"{loyalty} Member", f"hari lalu • {contact_status}", freq]
+        }), columns=3)
+        
+        # Financial Metrics Row with Color-Coded Cards (row-major: giro, SME, potential, payroll)
+        sme_active = client_row['SME Loan Status'] != "None"
+        payroll_active = client_row['Payroll Status'] != "None"
+        render_cards(_METRIC_TILE.render_many({
+            'background': ["#3498db 0%, #2980b9 100%",
+                           "#27ae60 0%, #27ae60cc 100%" if sme_active else "#e74c3c 0%, #e74c3ccc 100%",
+                           "#16a085 0%, #138d75 100%",
+                           "#27ae60 0%, #27ae60cc 100%" if payroll_active else "#f39c12 0%, #f39c12cc 100%"],
+            'icon': ["💰", "✅" if sme_active else "⚠️", "📈", "✅" if payroll_active else "💼"],
+            'title': ["Saldo Giro", "Pinjaman SME", "Nilai Potensial", "Payroll"],
+            'value': [f"Rp {client_row['Avg Giro Balance (M)']}M", "Aktif" if sme_active else "Belum Ada",
+                      f"Rp {client_row['Potential Value (M)']}M", "Aktif" if payroll_active else "Belum Ada"]
+        }), columns=2, gap="10px")
+        
+        st.markdown("---")
+        
+        # AI Analysis Section
+        st.subheader("🧠 Analisis AI")
+        with st.expander("📊 Insight Lengkap", expanded=True):
+            analysis = analyze_client(client_row)
+            st.markdown(analysis)
+        
+        st.markdown("---")
+        
+        # Script Generation Section
+        st.subheader("💬 Skrip WhatsApp yang Dihasilkan")
+        script = cached_script(client_row)
+        
+        script_area = st.text_area(
+            "Draft Pesan", 
+            value=script, 
+            height=300,
+            key="script_area"
+        )
+        
+        col_b1, col_b2, col_b3 = st.columns(3)
+        with col_b1:
+            # Copy button with JavaScript
+            import json
+            script_json = json.dumps(script_area)
+            copy_button_html = f"""
+            <button onclick="copyToClipboard()" 
+                    style="background: #4CAF50; color: white; border: none; padding: 8px 16px; 
+                           border-radius: 5px; cursor: pointer; width: 100%; height: 38px;">
+                📋 Salin Skrip
+            </button>
+            <script>
+            function copyToClipboard() {{
+                navigator.clipboard.writeText({script_json}).then(function() {{
+                    alert('Skrip berhasil disalin ke clipboard!');
+                }}).catch(function(err) {{
+                    alert('Gagal menyalin: ' + err);
+                }});
+            }}
+            </script>
+            """
+            components.html(copy_button_html, height=50)
+        with col_b2:
+            if st.button("🔄 Generate Ulang (Formal)"):
+                st.info("Sedang generate ulang dengan tone formal...")
+        with col_b3:
+            import urllib.parse
+            wa_message = urllib.parse.quote(script)
+            wa_link = f"https://wa.me/6286276272612?text={wa_message}"
+            st.markdown(f'<a href="{wa_link}" target="_blank"><button style="background: #25D366; color: white; border: none; padding: 8px 16px; border-radius: 5px; cursor: pointer; width: 100%; height: 38px;">✉️ Kirim WA</button></a>', unsafe_allow_html=True)
+        
+        st.markdown("---")
+        
+        # Pipeline Management
+        st.subheader("📈 Aksi Pipeline")
+        with st.form("pipeline_form"):
+            status = st.selectbox("Perbarui Status", PIPELINE_STATUSES)
             
-            client_row = df[df["Client Name"] == st.session_state['selected_client']].iloc[0]
+            notes = st.text_area("Catatan", placeholder="Tambahkan catatan tentang interaksi ini...")
             
-            # AI Insights
-            with st.expander("📊 Smart Insights", expanded=True):
-                insights = mock_ai_analysis(client_row)
-                st.markdown(insights)
+            next_action = st.text_input("Tindakan Selanjutnya", placeholder="contoh: Jadwalkan meeting Jumat jam 2 siang")
             
-            # Action Script
-            with st.expander("📝 Draft WhatsApp Script", expanded=True):
-                script = generate_script(
-                    client_row['Client Name'],
-                    client_row['Opportunity Tag'],
-                    client_row['Avg Giro Balance (M)']
-                )
-                st.text_area("Script", value=script, height=400, key="wa_script")
-                
-                col_btn1, col_btn2 = st.columns(2)
-                with col_btn1:
-                    if st.button("📋 Copy Script"):
-                        st.success("Script copied to clipboard!")
-                with col_btn2:
-                    if st.button("✉️ Send via WhatsApp"):
-                        st.success("Opening WhatsApp...")
+            submitted = st.form_submit_button("💾 Simpan Update")
             
-            # Pipeline Tracker
-            with st.expander("📈 Pipeline Status"):
-                status = st.selectbox(
-                    "Update Status",
-                    ["Not Contacted", "Contacted", "Interested", "Proposal Sent", "Negotiation", "Closed Won", "Closed Lost"],
-                    key=f"status_{st.session_state['selected_client']}"
-                )
-                
-                notes = st.text_area("Notes", placeholder="Add notes about this interaction...")
-                
-                if st.button("💾 Save Update"):
-                    if 'pipeline_updates' not in st.session_state:
-                        st.session_state['pipeline_updates'] = {}
-                    
-                    st.session_state['pipeline_updates'][st.session_state['selected_client']] = {
-                        'status': status,
-                        'notes': notes,
-                        'updated_at': st.timestamp()
-                    }
-                    st.success(f"Pipeline updated for {st.session_state['selected_client']}")
-        else:
-            st.info("👈 Pilih klien dari daftar untuk melihat analisis lengkap dan generate action script")
+            if submitted:
+                pipeline_store.record(client_id, status, notes, next_action)
+                st.success(f"Pipeline berhasil diperbarui untuk {client_name}!")
+        
+        # Show previous updates
+        update = pipeline_store.latest(client_id)
+        if update is not None:
+            st.markdown("---")
+            st.subheader("📝 Update Sebelumnya")
+            st.write(f"**Status:** {update['status']}")
+            st.write(f"**Terakhir Diperbarui:** {update['updated_at']}")
+            if update['notes']:
+                st.write(f"**Catatan:** {update['notes']}")
+            if update['next_action']:
+                st.write(f"**Tindakan Selanjutnya:** {update['next_action']}")
+    
+    else:
+        # Empty state with visual tips cards
+        st.info("Pilih klien dari daftar peluang untuk mengaktifkan analisis Co-Pilot")
+        
+        st.markdown("---")
+        st.markdown("### 💡 Tips & Best Practices")
+        
+        # Visual tip cards
+        tip_cards = [
+            {
+                "icon": "🎯",
+                "title": "Prioritas",
+                "desc": "Fokus pada leads dengan tag TARGET SME LOAN",
+                "color": "#e74c3c"
+            },
+            {
+                "icon": "⏰",
+                "title": "Waktu Terbaik",
+                "desc": "Hubungi antara jam 10-11 pagi atau 2-3 sore",
+                "color": "#3498db"
+            },
+            {
+                "icon": "🤝",
+                "title": "Pendekatan",
+                "desc": "Gunakan personal touch, referensi riwayat transaksi",
+                "color": "#9b59b6"
+            },
+            {
+                "icon": "📞",
+                "title": "Follow-up",
+                "desc": "Jangan lebih dari 3 hari untuk merespons",
+                "color": "#27ae60"
+            }
+        ]
+        
+        for tip in tip_cards:
+            st.markdown(f"""
+            <div style="
+                border-left: 4px solid {tip['color']};
+                background: linear-gradient(135deg, #ffffff 0%, #f8f9fa 100%);
+                padding: 15px;
+                margin-bottom: 12px;
+                border-radius: 8px;
+                box-shadow: 0 2px 4px rgba(0,0,0,0.08);
+            ">
+                <div style="display: flex; align-items: center; gap: 12px;">
+                    <div style="font-size: 32px;">{tip['icon']}</div>
+                    <div>
+                        <div style="font-weight: bold; color: {tip['color']}; margin-bottom: 4px;">{tip['title']}</div>
+                        <div style="font-size: 14px; color: #555;">{tip['desc']}</div>
+                    </div>
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
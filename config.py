@@ -3,6 +3,11 @@ Configuration file for Mandiri Smart-RM Co-Pilot Dashboard
 Contains all constants, color schemes, and configuration settings
 """
 
+import os
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
 # Custom Color Scheme for Banking Dashboard
 OPPORTUNITY_COLORS = {
     'TARGET SME LOAN': '#d32f2f',      # Red - Critical opportunity
@@ -40,7 +45,18 @@ PAGE_CONFIG = {
 USER_PROFILE = {
     'name': 'Budi Santoso',
     'branch': 'Tangerang BSD',
-    'phone': '0812-3456-7890'
+    'phone': '0812-3456-7890',
+    'top_k_leads': 5,                 # Priority leads shown in Smart Opportunities
+    'language': 'id'                  # Message template language (templates/<language>/)
+}
+
+# Message template per opportunity tag (templates/<language>/<name>.txt);
+# tags not listed use 'default'
+MESSAGE_TEMPLATES = {
+    'TARGET SME LOAN': 'sme_loan',
+    'TARGET PAYROLL': 'payroll',
+    'default': 'courtesy',
+    'relationship': 'relationship'
 }
 
 # Giro Balance Bins
@@ -57,3 +73,128 @@ THRESHOLDS = {
     'platinum_years': 15,
     'gold_years': 5
 }
+
+# Generated insight/script texts kept across sessions (LRU)
+SCRIPT_CACHE = {
+    'max_entries': 4096
+}
+
+# Model-server analysis backend; an empty url keeps the rules-based mock_ai_analysis
+LLM_BACKEND = {
+    'url': os.environ.get('LLM_BACKEND_URL', ''),
+    'batch_size': 16,            # clients per request
+    'batch_wait_ms': 20,         # how long a batch waits to fill up
+    'max_concurrency': 4,        # requests in flight
+    'request_timeout_s': 10.0,   # a late answer is still cached for the next click
+    'latency_budget_s': 1.5,     # after this the panel shows the mock analysis
+    'cache_entries': 4096
+}
+
+# Background warming of the script cache for the clients on screen
+PREFETCH = {
+    'workers': 2,
+    'other_clients': 20    # first rows of a "Klien Lainnya" table page treated as visible
+}
+
+# Client table: row highlight colors (first match wins) and paging
+TABLE_HIGHLIGHTS = {
+    'TARGET SME LOAN': '#ffebee',     # Light red
+    'TARGET PAYROLL': '#fff3e0',      # Light orange
+    'stale_contact': '#fce4ec'        # Light pink - not contacted > contact_critical_days
+}
+
+TABLE_PAGE_SIZES = [25, 50, 100, 250]
+
+# Expanders per page in the Relationship Health client lists
+RELATIONSHIP_PAGE_SIZE = 10
+
+# Compact cards per page in the Smart Opportunities "Klien Lainnya" list
+CARD_PAGE_SIZE = 20
+
+# Rows per page of the Smart Opportunities "Klien Lainnya" table
+OTHER_CLIENTS_PAGE_SIZE = 50
+
+# Analytics heat map: one SVG marker per client for small portfolios, WebGL
+# markers from webgl_from clients and a server-side binned density from binned_from
+HEAT_MAP = {
+    'webgl_from': 1000,
+    'binned_from': 50000,
+    'bins': (60, 40),          # Days Since Contact × Giro
+    'giro_quantile': 0.995     # giro above this quantile goes into the top row
+}
+
+# Serialized Plotly figures kept across reruns (LRU by size)
+FIGURE_CACHE = {
+    'max_mb': 64
+}
+
+# Bucket edges of the numeric KPI cube dimensions. Any KPI comparing a column
+# against one of these values (>, >=, <, <=) is answered exactly from the cube.
+KPI_CUBE_EDGES = {
+    'giro': sorted(set(GIRO_BINS) | {THRESHOLDS['medium_value_giro'], THRESHOLDS['high_value_giro']}),
+    'contact': sorted({30, 60, 90, 120, 180, THRESHOLDS['contact_warning_days'], THRESHOLDS['contact_critical_days']}),
+    'tenure': sorted({THRESHOLDS['gold_years'], THRESHOLDS['loyal_client_years'], THRESHOLDS['platinum_years']})
+}
+
+# Columnar client store (Arrow IPC for memory-mapped reads, .parquet also supported)
+CLIENT_STORE = {
+    'path': os.path.join(DATA_DIR, 'clients.arrow'),
+    'n_clients': 20,
+    'seed': 42,
+    'compact': True
+}
+
+# Pipeline statuses in funnel order, as offered in the "Aksi Pipeline" form
+PIPELINE_STATUSES = [
+    "Belum Dihubungi",
+    "Sudah Dihubungi",
+    "Meeting Terjadwal",
+    "Proposal Terkirim",
+    "Tertarik",
+    "Berhasil Closing",
+    "Gagal Closing"
+]
+
+# Contact types offered in the Relationship Health "Simpan Log Kontak" form
+CONTACT_TYPES = ["Phone Call", "WhatsApp", "Email", "Meeting", "Courtesy Visit"]
+
+# Append-only contact log, compacted into a last contact date per client
+CONTACT_LOG = {
+    'log_path': os.path.join(DATA_DIR, 'contact_log.csv'),
+    'snapshot_path': os.path.join(DATA_DIR, 'last_contact.arrow'),
+    'compact_every': 500         # logged contacts between compactions
+}
+
+# Shared pipeline store (SQLite in WAL mode)
+PIPELINE_STORE = {
+    'path': os.environ.get('PIPELINE_STORE_PATH', os.path.join(DATA_DIR, 'pipeline.sqlite')),
+    'batch_size': 10000,         # buffered updates per write transaction
+    'busy_timeout_s': 5.0,       # wait for another session's write before failing
+    'cache_mb': 64,              # page cache per connection, keeps the index pages of a batch in memory
+    'won_status': "Berhasil Closing",
+    'table_rows': 200            # latest clients listed in Analytics
+}
+
+# Opportunity tagging rules, evaluated in order; the first rule whose conditions
+# all hold assigns its tag. A condition compares a column against a THRESHOLDS
+# key ('threshold') or a literal ('value'). Potential value = giro * multiplier.
+OPPORTUNITY_RULES = [
+    {
+        'tag': 'TARGET SME LOAN',
+        'value_multiplier': 0.7,    # 70% of balance as loan potential
+        'conditions': [
+            {'column': 'Avg Giro Balance (M)', 'op': '>=', 'threshold': 'high_value_giro'},
+            {'column': 'SME Loan Status', 'op': '==', 'value': 'None'}
+        ]
+    },
+    {
+        'tag': 'TARGET PAYROLL',
+        'value_multiplier': 0.05,   # 5% monthly fee potential
+        'conditions': [
+            {'column': 'Avg Giro Balance (M)', 'op': '>=', 'threshold': 'medium_value_giro'},
+            {'column': 'Payroll Status', 'op': '==', 'value': 'None'}
+        ]
+    }
+]
+
+DEFAULT_OPPORTUNITY = {'tag': 'MAINTAIN', 'value_multiplier': 0.02}
@@ -0,0 +1,237 @@
+"""
+Contact log module
+Append-only log of client contacts, compacted into a last-contact date per client; Days Since Contact is derived from it at read time
+"""
+
+import csv
+import os
+import threading
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from client_index import ClientIndex
+from client_store import read_client_store, read_store_as_of, write_client_store
+from client_table import get_sort_order, sort_order
+from config import CONTACT_LOG, USER_PROFILE
+from data_loader import CLIENT_ID_COLUMN
+from dataset_cache import dataset_path, get_derived
+from kpi_cube import build_kpi_cube
+from script_cache import invalidate_client
+
+
+CONTACT_COLUMN = "Days Since Contact"
+LAST_CONTACT_COLUMN = "Last Contact"
+
+LOG_FIELDS = [CLIENT_ID_COLUMN, "Contact Date", "Contact Type", "RM", "Notes", "Next Action", "Logged At"]
+
+
+def days_since(last_contact, as_of):
+    """Whole days from each last contact date to as_of"""
+    return (np.datetime64(as_of, "D") - last_contact).astype(np.int64)
+
+
+class ContactLog:
+    """Contact events appended to a CSV log, folded into a snapshot of last contact dates every compact_every events"""
+
+    def __init__(self, log_path=CONTACT_LOG['log_path'], snapshot_path=CONTACT_LOG['snapshot_path'],
+                 compact_every=CONTACT_LOG['compact_every']):
+        self.log_path = log_path
+        self.snapshot_path = snapshot_path
+        self.compact_every = compact_every
+        self.compactions = 0
+        self._lock = threading.Lock()
+        self._pending = len(self._read_log())
+
+    def _read_log(self):
+        if not os.path.exists(self.log_path):
+            return pd.DataFrame(columns=LOG_FIELDS)
+        return pd.read_csv(self.log_path, names=LOG_FIELDS, dtype={"Notes": str, "Next Action": str},
+                           keep_default_na=False)
+
+    def append(self, client_id, contact_date, contact_type, notes="", next_action="", rm=None):
+        """Append one contact; compacts the log once it holds compact_every events"""
+        row = [
+            int(client_id),
+            pd.Timestamp(contact_date).date().isoformat(),
+            contact_type,
+            rm if rm is not None else USER_PROFILE['name'],
+            notes or "",
+            next_action or "",
+            datetime.now().isoformat(timespec="seconds")
+        ]
+        with self._lock:
+            directory = os.path.dirname(self.log_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.log_path, "a", newline="", encoding="utf-8") as handle:
+                csv.writer(handle).writerow(row)
+            self._pending += 1
+            if self._pending >= self.compact_every:
+                self._compact()
+
+    def last_contacts(self):
+        """Last logged contact date per client ID (snapshot plus the events not compacted yet)"""
+        with self._lock:
+            return self._last_contacts()
+
+    def _last_contacts(self):
+        frames = []
+        if os.path.exists(self.snapshot_path):
+            frames.append(read_client_store(self.snapshot_path))
+        events = self._read_log()
+        if len(events):
+            frames.append(pd.DataFrame({
+                CLIENT_ID_COLUMN: events[CLIENT_ID_COLUMN].to_numpy(dtype=np.int64),
+                LAST_CONTACT_COLUMN: pd.to_datetime(events["Contact Date"]).to_numpy().astype("datetime64[D]")
+            }))
+        if not frames:
+            return pd.Series(np.array([], dtype="datetime64[D]"), index=pd.Index([], dtype=np.int64),
+                             name=LAST_CONTACT_COLUMN)
+        merged = pd.concat(frames, ignore_index=True)
+        return merged.groupby(CLIENT_ID_COLUMN)[LAST_CONTACT_COLUMN].max()
+
+    def compact(self):
+        """Fold the log into the snapshot and start a new log; the old one is kept beside it"""
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        if not self._pending:
+            return
+        last = self._last_contacts()
+        write_client_store(last.reset_index(), self.snapshot_path)
+        stamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
+        os.replace(self.log_path, f"{self.log_path}.{stamp}")
+        self._pending = 0
+        self.compactions += 1
+
+    def stats(self):
+        """Events waiting for compaction and compactions run"""
+        return {'pending': self._pending, 'compactions': self.compactions}
+
+
+class ContactDays:
+    """Last contact date of every row of a frame, with Days Since Contact derived from it at read time.
+
+    A row starts at the store's as_of date minus its Days Since Contact and
+    moves forward with each logged contact. The KPI cube over the live
+    values is built once per day; a recorded contact patches a copy of it
+    and swaps that in, so logging never rescans the portfolio and readers
+    never see a half-applied contact.
+    """
+
+    def __init__(self, df, contact_log, store_as_of):
+        self._frame = df
+        self._index = ClientIndex(df)
+        self._dtype = df[CONTACT_COLUMN].dtype
+        self.last_contact = np.datetime64(store_as_of, "D") - df[CONTACT_COLUMN].to_numpy().astype("timedelta64[D]")
+
+        logged = contact_log.last_contacts()
+        known = logged.index.isin(df[CLIENT_ID_COLUMN].to_numpy())
+        positions = self._index.positions(logged.index[known])
+        self.last_contact[positions] = np.maximum(self.last_contact[positions],
+                                                  logged.to_numpy()[known].astype("datetime64[D]"))
+
+        self.version = 0
+        self._cube = None
+        self._cube_as_of = None
+        self._sort_orders = {}
+        self._lock = threading.Lock()
+
+    def days(self, as_of=None):
+        """Days since contact of every row on as_of (default today)"""
+        return days_since(self.last_contact, as_of or date.today()).astype(self._dtype)
+
+    def apply(self, df, as_of=None):
+        """The frame with its Days Since Contact column replaced by the live values (df must be the dataset frame)"""
+        frame = df.copy(deep=False)
+        frame[CONTACT_COLUMN] = self.days(as_of)
+        return frame
+
+    def kpi_cube(self, as_of=None):
+        """KPI cube over the live Days Since Contact, rebuilt when the day changes"""
+        as_of = as_of or date.today()
+        with self._lock:
+            if self._cube_as_of != as_of:
+                self._cube = build_kpi_cube(self.apply(self._frame, as_of))
+                self._cube_as_of = as_of
+            return self._cube
+
+    def sort_order(self, ascending=True, as_of=None):
+        """Row positions sorted by the live Days Since Contact; ties keep frame order"""
+        as_of = as_of or date.today()
+        key = (ascending, as_of, self.version)
+        if key not in self._sort_orders:
+            self._sort_orders = {key: sort_order(self.apply(self._frame, as_of), CONTACT_COLUMN, ascending)}
+        return self._sort_orders[key]
+
+    def record(self, client_id, contact_date):
+        """Move a client's last contact forward; returns False if the date is not newer"""
+        position = self._index.position(client_id)
+        contact_date = np.datetime64(pd.Timestamp(contact_date).date(), "D")
+        if contact_date > np.datetime64(date.today(), "D"):
+            raise ValueError(f"Contact date {contact_date} is in the future")
+        with self._lock:
+            if contact_date <= self.last_contact[position]:
+                return False
+            cube = self._cube.copy() if self._cube is not None else None
+            if cube is not None:
+                cube.add(self._live_row(position), sign=-1)
+            self.last_contact[position] = contact_date
+            if cube is not None:
+                cube.add(self._live_row(position))
+                self._cube = cube
+            self.version += 1
+        return True
+
+    def _live_row(self, position):
+        """One row with its Days Since Contact as of the cube's day"""
+        row = self._frame.iloc[[position]].copy(deep=False)
+        row[CONTACT_COLUMN] = days_since(self.last_contact[[position]], self._cube_as_of).astype(self._dtype)
+        return row
+
+
+_default_log = None
+_log_lock = threading.Lock()
+
+
+def get_contact_log():
+    """Process-wide contact log at the configured paths"""
+    global _default_log
+    with _log_lock:
+        if _default_log is None:
+            _default_log = ContactLog()
+    return _default_log
+
+
+def _build_contact_days(df):
+    # The as_of date of the store the shared dataset was actually loaded from
+    path = dataset_path()
+    as_of = read_store_as_of(path)
+    if as_of is None:
+        as_of = date.fromtimestamp(os.path.getmtime(path))
+    return ContactDays(df, get_contact_log(), as_of)
+
+
+def get_contact_days():
+    """Live contact days of the process-wide dataset, built once per dataset version"""
+    return get_derived('contact_days', _build_contact_days)
+
+
+def get_live_sort_order(column, ascending=True):
+    """Cached sort order of the dataset, by the live values for Days Since Contact"""
+    if column == CONTACT_COLUMN:
+        return get_contact_days().sort_order(ascending)
+    return get_sort_order(column, ascending)
+
+
+def log_contact(client_id, contact_date, contact_type, notes="", next_action=""):
+    """Log a contact and update the client's Days Since Contact and the KPI cube in place"""
+    # Recorded first, so a contact record() rejects never reaches the log
+    moved = get_contact_days().record(client_id, contact_date)
+    get_contact_log().append(client_id, contact_date, contact_type, notes, next_action)
+    # The client's context changed, so its generated texts are drafted afresh
+    invalidate_client(client_id)
+    return moved
@@ -5,107 +5,189 @@ Handles all data generation and loading operations
 
 import pandas as pd
 import numpy as np
-from config import THRESHOLDS
+import pyarrow as pa
+from config import THRESHOLDS, LOYALTY_COLORS
+from rules_engine import evaluate_tag_codes, opportunity_tags, potential_values
 
 
-def load_data():
+CLIENT_ID_COLUMN = "Client ID"
+
+CLIENT_NAMES = [
+    "PT. Maju Mundur", "PT. Karya Sejahtera", "PT. Sukses Bersama",
+    "PT. Indo Makmur", "PT. Sentosa Jaya", "PT. Buana Perkasa",
+    "PT. Mega Indah", "PT. Surya Gemilang", "PT. Citra Abadi",
+    "PT. Duta Mandiri", "PT. Graha Prima", "PT. Harapan Kita",
+    "PT. Jaya Raya", "PT. Kartika Sari", "PT. Lestari Makmur",
+    "PT. Mitra Usaha", "PT. Nusantara Sejahtera", "PT. Pelita Harapan",
+    "PT. Rezeki Berlimpah", "PT. Trijaya Abadi"
+]
+
+LAST_NOTES_SAMPLES = [
+    "Anak pemilik baru lulus kuliah dari ITB jurusan Teknik Industri",
+    "Komplain kliring bulan lalu sudah selesai, klien puas dengan penanganan",
+    "Merayakan ulang tahun perusahaan ke-20 bulan depan",
+    "Sedang ekspansi ke Surabaya, butuh info cabang di sana",
+    "Direktur baru dilantik 3 bulan lalu, masih adaptasi",
+    "Pernah komplain tentang service charge, sudah direview",
+    "Loyal sejak era Pak Harto, generasi ke-2 sekarang yang handle",
+    "Istri owner adalah guru besar UI, sering keluar negeri",
+    "Baru saja merger dengan PT lain, struktur organisasi berubah",
+    "Klien sangat peduli CSR, aktif di Rotary Club",
+    "Pernah ada issue fraud internal tahun lalu, sudah clear",
+    "Owner hobi golf, member di Pondok Indah Golf",
+    "Perusahaan keluarga, sangat menjaga privasi",
+    "Sedang proses suksesi ke anak, butuh pendampingan",
+    "Pernah pindah ke bank lain, kembali 2 tahun lalu",
+    "Supplier utama untuk perusahaan BUMN",
+    "Cash flow sangat teratur, jarang ada masalah",
+    "Owner adalah alumni Mandiri program beasiswa",
+    "Bisnis turun-temurun sejak kakek, sudah 3 generasi",
+    "Baru selesai renovasi kantor besar-besaran"
+]
+
+# Sampling distributions per column: (values, probabilities)
+GIRO_DISTRIBUTION = (
+    [500, 800, 1200, 1500, 2500, 3500, 5000, 8000, 10000],
+    [0.15, 0.15, 0.15, 0.15, 0.15, 0.10, 0.08, 0.04, 0.03]
+)
+SME_DISTRIBUTION = (["None", "Active"], [0.75, 0.25])
+PAYROLL_DISTRIBUTION = (["None", "Active"], [0.60, 0.40])
+TXN_FREQ_DISTRIBUTION = (["Low", "Medium", "High"], [0.2, 0.5, 0.3])
+TENURE_DISTRIBUTION = (
+    [1, 2, 3, 4, 5, 6, 7, 8, 10, 12, 15, 18, 20, 22, 25],
+    [0.05, 0.05, 0.08, 0.08, 0.10, 0.10, 0.10, 0.10, 0.10, 0.08, 0.06, 0.04, 0.03, 0.02, 0.01]
+)
+DAYS_SINCE_CONTACT_DISTRIBUTION = (
+    [3, 7, 14, 21, 30, 45, 60, 90, 120, 180, 240, 365],
+    [0.15, 0.15, 0.15, 0.12, 0.10, 0.08, 0.07, 0.06, 0.05, 0.04, 0.02, 0.01]
+)
+
+# Compact schema: fixed-category enums and narrow numeric types.
+# Giro stays integer (whole millions) so rendered values keep their format.
+# Last Note repeats a handful of notes, so its categories are taken from the data
+# (any note survives the conversion). Client Names are unique, so they only drop
+# to 32-bit string offsets.
+COMPACT_SCHEMA = {
+    CLIENT_ID_COLUMN: "int32",
+    "Avg Giro Balance (M)": "int32",
+    "Transaction Frequency": pd.CategoricalDtype(TXN_FREQ_DISTRIBUTION[0]),
+    "SME Loan Status": pd.CategoricalDtype(SME_DISTRIBUTION[0]),
+    "Payroll Status": pd.CategoricalDtype(PAYROLL_DISTRIBUTION[0]),
+    "Opportunity Tag": pd.CategoricalDtype(opportunity_tags()),
+    "Potential Value (M)": "float32",
+    "Tenure Years": "int8",
+    "Days Since Contact": "int16",
+    "Loyalty Status": pd.CategoricalDtype(list(LOYALTY_COLORS)),
+    "Client Name": pd.ArrowDtype(pa.string()),
+    "Last Note": "category"
+}
+
+STANDARD_SCHEMA = {
+    CLIENT_ID_COLUMN: "int64",
+    "Client Name": "str",
+    "Avg Giro Balance (M)": "int64",
+    "Transaction Frequency": "str",
+    "SME Loan Status": "str",
+    "Payroll Status": "str",
+    "Opportunity Tag": "str",
+    "Potential Value (M)": "float64",
+    "Tenure Years": "int64",
+    "Days Since Contact": "int64",
+    "Loyalty Status": "str",
+    "Last Note": "str"
+}
+
+
+def _draw(rng, distribution, n_clients):
+    """Draw a whole column from a (values, probabilities) distribution in one call"""
+    values, probabilities = distribution
+    return np.asarray(values)[rng.choice(len(values), size=n_clients, p=probabilities)]
+
+
+def _client_names(n_clients):
+    """Build client names, suffixing a branch number once the base list is exhausted"""
+    base = np.asarray(CLIENT_NAMES, dtype=object)
+    positions = np.arange(n_clients)
+    names = base[positions % len(base)]
+    cycle = positions // len(base)
+    if n_clients > len(base):
+        names = np.where(cycle > 0, names + " " + (cycle + 1).astype(str).astype(object), names)
+    return names
+
+
+def load_data(n_clients=len(CLIENT_NAMES), seed=42, compact=False):
     """Generate dummy corporate client data reflecting liquidity mismatch scenario"""
-    np.random.seed(42)
-    
-    client_names = [
-        "PT. Maju Mundur", "PT. Karya Sejahtera", "PT. Sukses Bersama",
-        "PT. Indo Makmur", "PT. Sentosa Jaya", "PT. Buana Perkasa",
-        "PT. Mega Indah", "PT. Surya Gemilang", "PT. Citra Abadi",
-        "PT. Duta Mandiri", "PT. Graha Prima", "PT. Harapan Kita",
-        "PT. Jaya Raya", "PT. Kartika Sari", "PT. Lestari Makmur",
-        "PT. Mitra Usaha", "PT. Nusantara Sejahtera", "PT. Pelita Harapan",
-        "PT. Rezeki Berlimpah", "PT. Trijaya Abadi"
-    ]
-    
-    last_notes_samples = [
-        "Anak pemilik baru lulus kuliah dari ITB jurusan Teknik Industri",
-        "Komplain kliring bulan lalu sudah selesai, klien puas dengan penanganan",
-        "Merayakan ulang tahun perusahaan ke-20 bulan depan",
-        "Sedang ekspansi ke Surabaya, butuh info cabang di sana",
-        "Direktur baru dilantik 3 bulan lalu, masih adaptasi",
-        "Pernah komplain tentang service charge, sudah direview",
-        "Loyal sejak era Pak Harto, generasi ke-2 sekarang yang handle",
-        "Istri owner adalah guru besar UI, sering keluar negeri",
-        "Baru saja merger dengan PT lain, struktur organisasi berubah",
-        "Klien sangat peduli CSR, aktif di Rotary Club",
-        "Pernah ada issue fraud internal tahun lalu, sudah clear",
-        "Owner hobi golf, member di Pondok Indah Golf",
-        "Perusahaan keluarga, sangat menjaga privasi",
-        "Sedang proses suksesi ke anak, butuh pendampingan",
-        "Pernah pindah ke bank lain, kembali 2 tahun lalu",
-        "Supplier utama untuk perusahaan BUMN",
-        "Cash flow sangat teratur, jarang ada masalah",
-        "Owner adalah alumni Mandiri program beasiswa",
-        "Bisnis turun-temurun sejak kakek, sudah 3 generasi",
-        "Baru selesai renovasi kantor besar-besaran"
-    ]
-    
-    data = []
-    for i, name in enumerate(client_names):
-        # Generate data with intentional mismatch (high giro, low loans)
-        giro_balance = np.random.choice([500, 800, 1200, 1500, 2500, 3500, 5000, 8000, 10000], 
-                                       p=[0.15, 0.15, 0.15, 0.15, 0.15, 0.10, 0.08, 0.04, 0.03])
-        
-        # Most clients don't have SME loans (reflecting the gap)
-        sme_status = np.random.choice(["None", "Active"], p=[0.75, 0.25])
-        
-        # Mix of payroll statuses
-        payroll_status = np.random.choice(["None", "Active"], p=[0.60, 0.40])
-        
-        # Transaction frequency
-        txn_freq = np.random.choice(["Low", "Medium", "High"], p=[0.2, 0.5, 0.3])
-        
-        # Relationship Health fields
-        tenure_years = np.random.choice(
-            [1, 2, 3, 4, 5, 6, 7, 8, 10, 12, 15, 18, 20, 22, 25],
-            p=[0.05, 0.05, 0.08, 0.08, 0.10, 0.10, 0.10, 0.10, 0.10, 0.08, 0.06, 0.04, 0.03, 0.02, 0.01]
-        )
-        
-        # Days since contact - weighted towards recent but some neglected
-        days_since_contact = np.random.choice(
-            [3, 7, 14, 21, 30, 45, 60, 90, 120, 180, 240, 365],
-            p=[0.15, 0.15, 0.15, 0.12, 0.10, 0.08, 0.07, 0.06, 0.05, 0.04, 0.02, 0.01]
-        )
-        
-        # Loyalty Status based on tenure
-        if tenure_years > THRESHOLDS['platinum_years']:
-            loyalty_status = "Platinum"
-        elif tenure_years > THRESHOLDS['gold_years']:
-            loyalty_status = "Gold"
-        else:
-            loyalty_status = "Silver"
-        
-        # Last note
-        last_note = last_notes_samples[i]
-        
-        # Calculate opportunity tag
-        if giro_balance >= THRESHOLDS['high_value_giro'] and sme_status == "None":
-            tag = "TARGET SME LOAN"
-            potential_value = giro_balance * 0.7  # 70% of balance as loan potential
-        elif giro_balance >= THRESHOLDS['medium_value_giro'] and payroll_status == "None":
-            tag = "TARGET PAYROLL"
-            potential_value = giro_balance * 0.05  # 5% monthly fee potential
-        else:
-            tag = "MAINTAIN"
-            potential_value = giro_balance * 0.02
-        
-        data.append({
-            "Client Name": name,
-            "Avg Giro Balance (M)": giro_balance,
-            "Transaction Frequency": txn_freq,
-            "SME Loan Status": sme_status,
-            "Payroll Status": payroll_status,
-            "Opportunity Tag": tag,
-            "Potential Value (M)": round(potential_value, 1),
-            "Tenure Years": tenure_years,
-            "Days Since Contact": days_since_contact,
-            "Loyalty Status": loyalty_status,
-            "Last Note": last_note
-        })
-    
-    return pd.DataFrame(data)
+    rng = np.random.default_rng(seed)
+
+    # Generate data with intentional mismatch (high giro, low loans)
+    giro_balance = _draw(rng, GIRO_DISTRIBUTION, n_clients)
+
+    # Most clients don't have SME loans (reflecting the gap)
+    sme_status = _draw(rng, SME_DISTRIBUTION, n_clients)
+
+    # Mix of payroll statuses
+    payroll_status = _draw(rng, PAYROLL_DISTRIBUTION, n_clients)
+
+    # Transaction frequency
+    txn_freq = _draw(rng, TXN_FREQ_DISTRIBUTION, n_clients)
+
+    # Relationship Health fields
+    tenure_years = _draw(rng, TENURE_DISTRIBUTION, n_clients)
+
+    # Days since contact - weighted towards recent but some neglected
+    days_since_contact = _draw(rng, DAYS_SINCE_CONTACT_DISTRIBUTION, n_clients)
+
+    # Loyalty Status based on tenure
+    loyalty_status = np.select(
+        [tenure_years > THRESHOLDS['platinum_years'], tenure_years > THRESHOLDS['gold_years']],
+        ["Platinum", "Gold"],
+        default="Silver"
+    )
+
+    # Last note
+    last_note = np.asarray(LAST_NOTES_SAMPLES, dtype=object)[np.arange(n_clients) % len(LAST_NOTES_SAMPLES)]
+
+    df = pd.DataFrame({
+        # Stable IDs: names are not unique once the base list is exhausted
+        CLIENT_ID_COLUMN: np.arange(1, n_clients + 1),
+        "Client Name": _client_names(n_clients),
+        "Avg Giro Balance (M)": giro_balance,
+        "Transaction Frequency": txn_freq,
+        "SME Loan Status": sme_status,
+        "Payroll Status": payroll_status,
+        "Tenure Years": tenure_years,
+        "Days Since Contact": days_since_contact,
+        "Loyalty Status": loyalty_status,
+        "Last Note": last_note
+    })
+
+    # Calculate opportunity tag and potential value from the configured rules
+    tag_codes = evaluate_tag_codes(df)
+    df.insert(6, "Opportunity Tag", np.asarray(opportunity_tags(), dtype=object)[tag_codes])
+    df.insert(7, "Potential Value (M)", potential_values(giro_balance, tag_codes))
+
+    return to_compact(df) if compact else df
+
+
+def _convert(df, schema):
+    return df.astype({column: dtype for column, dtype in schema.items() if column in df.columns})
+
+
+def to_compact(df):
+    """Convert a client frame to the compact schema"""
+    return _convert(df, COMPACT_SCHEMA)
+
+
+def to_standard(df):
+    """Convert a client frame back to the standard (string/int64/float64) schema"""
+    return _convert(df, STANDARD_SCHEMA)
+
+
+def memory_report(df):
+    """Compare per-column memory of the standard and compact schemas, in MB"""
+    standard = to_standard(df).memory_usage(deep=True, index=False)
+    compact = to_compact(df).memory_usage(deep=True, index=False)
+    report = pd.DataFrame({"Standard (MB)": standard / 1e6, "Compact (MB)": compact / 1e6})
+    report.loc["Total"] = report.sum()
+    report["Reduction (x)"] = report["Standard (MB)"] / report["Compact (MB)"]
+    return report.round(2)
@@ -0,0 +1,155 @@
+"""
+Dataset cache module
+Holds one shared, read-only portfolio frame per server process
+"""
+
+import hashlib
+import os
+import threading
+
+from client_store import ensure_client_store, read_client_store
+from config import CLIENT_STORE
+
+
+def file_fingerprint(path, chunk_size=1 << 20):
+    """Content hash of a file, read in chunks"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class _Entry:
+    """Immutable snapshot of a loaded dataset"""
+
+    def __init__(self, fingerprint, frame, previous=None):
+        self.fingerprint = fingerprint
+        self.frame = frame
+        self.derived = {}
+        self.previous = previous or {}  # refreshable artifacts of the dataset this one replaced
+        self.lock = threading.Lock()
+
+
+class DatasetCache:
+    """Process-wide dataset cache keyed on a content fingerprint of the source"""
+
+    def __init__(self, path=CLIENT_STORE['path'], loader=read_client_store):
+        self.path = path
+        self.loader = loader
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self._entry = None
+        self._stat = None
+        self._stat_fingerprint = None
+        self._refreshable = set()
+        self._reload_listeners = []
+        self._lock = threading.Lock()
+
+    def _fingerprint(self):
+        """Return the content fingerprint, only rehashing when the file stat changes"""
+        stat = os.stat(self.path)
+        signature = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        if signature != self._stat:
+            self._stat_fingerprint = file_fingerprint(self.path)
+            self._stat = signature
+        return self._stat_fingerprint
+
+    def _current(self, count):
+        """Snapshot of the current source, loaded if it changed; count records it as a dataset hit or miss"""
+        ensure_client_store(self.path)
+        with self._lock:
+            fingerprint = self._fingerprint()
+            if self._entry is None or self._entry.fingerprint != fingerprint:
+                if count:
+                    self.misses += 1
+                previous = {}
+                if self._entry is not None:
+                    self.reloads += 1
+                    previous = {name: artifact for name, artifact in self._entry.derived.items()
+                                if name in self._refreshable}
+                # Build the new snapshot fully before swapping it in, so readers
+                # always see either the old or the new dataset
+                old_entry = self._entry
+                self._entry = _Entry(fingerprint, self.loader(self.path), previous)
+                if old_entry is not None:
+                    for listener in self._reload_listeners:
+                        listener(old_entry.frame, self._entry.frame)
+            elif count:
+                self.hits += 1
+            return self._entry
+
+    def add_reload_listener(self, listener):
+        """Call listener(old_frame, new_frame) each time the source changes and is reloaded"""
+        self._reload_listeners.append(listener)
+
+    def get(self):
+        """Return the shared dataset; callers get a shallow copy so they cannot mutate it"""
+        return self._current(count=True).frame.copy(deep=False)
+
+    def derived(self, name, builder, refresh=None):
+        """Artifact built once from the shared frame (cube, index, ...) and dropped on reload.
+
+        With refresh, a reload passes the previous dataset's artifact to refresh(artifact, frame)
+        instead of building it from scratch.
+        """
+        if refresh is not None:
+            self._refreshable.add(name)
+        entry = self._current(count=False)
+        with entry.lock:
+            if name not in entry.derived:
+                previous = entry.previous.pop(name, None)
+                if refresh is not None and previous is not None:
+                    entry.derived[name] = refresh(previous, entry.frame)
+                else:
+                    entry.derived[name] = builder(entry.frame)
+            return entry.derived[name]
+
+    @property
+    def version(self):
+        """Fingerprint of the dataset currently held"""
+        entry = self._entry
+        return entry.fingerprint if entry is not None else None
+
+    def stats(self):
+        """Hit/miss/reload counters"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'reloads': self.reloads,
+            'version': self.version
+        }
+
+
+_default_cache = DatasetCache()
+
+
+def get_dataset():
+    """Return the process-wide portfolio frame"""
+    return _default_cache.get()
+
+
+def get_derived(name, builder, refresh=None):
+    """Artifact derived from the process-wide dataset, rebuilt (or refreshed) when the dataset changes"""
+    return _default_cache.derived(name, builder, refresh)
+
+
+def on_dataset_reload(listener):
+    """Call listener(old_frame, new_frame) whenever the process-wide dataset is reloaded"""
+    _default_cache.add_reload_listener(listener)
+
+
+def dataset_path():
+    """Source file of the process-wide dataset"""
+    return _default_cache.path
+
+
+def dataset_version():
+    """Fingerprint of the process-wide dataset"""
+    return _default_cache.version
+
+
+def cache_stats():
+    """Counters of the process-wide dataset cache"""
+    return _default_cache.stats()
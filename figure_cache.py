@@ -0,0 +1,124 @@
+"""
+Figure cache module
+Keeps serialized Plotly figures across reruns and sessions, keyed on the dataset version and the view parameters
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from config import FIGURE_CACHE
+from dataset_cache import dataset_version
+from script_cache import plain_value
+
+
+class FigureCache:
+    """Thread-safe LRU of figure JSON, evicting least recently used figures beyond max_bytes"""
+
+    def __init__(self, max_bytes=FIGURE_CACHE['max_mb'] * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> UTF-8 figure JSON
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, key):
+        """Cached figure JSON for key, or None"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def store(self, key, spec):
+        """Cache figure JSON; a figure larger than the whole cache is not kept"""
+        if len(spec) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key))
+            self._entries[key] = spec
+            self.size += len(spec)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def get(self, key, build):
+        """Figure for key, from cache or from build() (which is then cached)"""
+        spec = self.lookup(key)
+        if spec is None:
+            # Build outside the lock; a concurrent miss just builds the same figure twice
+            figure = build()
+            self.store(key, pio.to_json(figure, validate=False).encode())
+            return figure
+        # The JSON came from a validated figure, so it is not validated again
+        return go.Figure(json.loads(spec), _validate=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        """Hit/miss/eviction counters, size and hit rate"""
+        requests = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / requests if requests else 0.0
+        }
+
+
+def array_digest(values):
+    """Digest of an array's contents, for figures that read live per-row data"""
+    values = np.ascontiguousarray(values)
+    return hashlib.blake2b(values.view(np.uint8), digest_size=16).hexdigest() + str(values.dtype)
+
+
+def values_key(data):
+    """Plain rows of a small aggregate (Series or DataFrame, with its labels), to key a figure on what it draws"""
+    return tuple(tuple(row) for row in data.reset_index().to_numpy().tolist())
+
+
+def figure_key(name, version, params=()):
+    """Digest of a figure name, the dataset version and the view parameters it is drawn from"""
+    payload = repr((name, version, tuple(plain_value(param) for param in params)))
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+_default_cache = FigureCache()
+
+
+def cached_figure(name, params, build):
+    """Figure drawn by build(), reused while the dataset and params stay the same"""
+    version = dataset_version()
+    if version is None:
+        # Not drawn from the shared dataset: nothing to key it on
+        return build()
+    return _default_cache.get(figure_key(name, version, params), build)
+
+
+def clear_figure_cache():
+    """Drop every cached figure of the process-wide cache"""
+    _default_cache.clear()
+
+
+def figure_cache_stats():
+    """Counters of the process-wide figure cache"""
+    return _default_cache.stats()
@@ -0,0 +1,33 @@
+"""
+Fragment timing
+Runs page regions as Streamlit fragments and records how long each run of a region takes
+"""
+
+import functools
+import time
+
+import streamlit as st
+
+
+def record_timing(name, seconds):
+    """Keep the last run duration of a region in the session"""
+    st.session_state.setdefault('render_timings', {})[name] = seconds * 1000
+
+
+def render_timings():
+    """Last run duration per region in milliseconds"""
+    return dict(st.session_state.get('render_timings', {}))
+
+
+def timed_fragment(name):
+    """Decorator: run a region as an st.fragment, so its widgets rerun only the region, and time each run"""
+    def decorate(function):
+        @functools.wraps(function)
+        def run(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record_timing(name, time.perf_counter() - start)
+        return st.fragment(run)
+    return decorate
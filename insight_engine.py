@@ -0,0 +1,135 @@
+"""
+Insight engine
+Evaluates the AI insight rules as whole-column masks and stores them as a compact per-client table
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from client_store import ensure_client_store, read_client_store, write_client_store
+from config import THRESHOLDS, DATA_DIR
+from data_loader import CLIENT_ID_COLUMN, load_data
+from dataset_cache import get_derived
+from rules_engine import GIRO_COLUMN, rule_multiplier
+
+
+# Insight types in display order: (code, label, message template)
+INSIGHT_TYPES = [
+    ('critical_alert', "Critical Alert",
+     "🔴 **CRITICAL ALERT:** {name} memiliki saldo Giro {giro}M namun tidak memiliki pinjaman SME. Risiko tinggi churn ke competitor yang menawarkan lending."),
+    ('giro_warning', "Peringatan Giro",
+     "⚠️ **PERINGATAN:** Saldo Giro {giro}M cukup tinggi. Opportunity untuk deepening relationship."),
+    ('sme_opportunity', "SME Opportunity",
+     "💡 **OPPORTUNITY:** Estimasi kebutuhan modal kerja ~Rp {sme_estimate}M berdasarkan pola transaksi. Pitch Kredit Modal Kerja dengan tenor 12-24 bulan."),
+    ('payroll_cross_sell', "Payroll Cross-Sell",
+     "💼 **CROSS-SELL:** Tidak ada Payroll aktif. Potensi revenue Rp {payroll_fee}M/bulan dari fee Kopra Payroll."),
+    ('healthy_behavior', "Behavior Insight",
+     "📊 **BEHAVIOR INSIGHT:** Frekuensi transaksi tinggi menunjukkan aktivitas bisnis yang sehat. Client engagement score: 9/10."),
+    ('churn_risk', "Churn Risk",
+     "⚠️ **CHURN RISK:** Frekuensi transaksi rendah. Perlu investigasi apakah client sudah diversifikasi ke bank lain."),
+    ('action_sme', "Action Plan SME",
+     "🎯 **ACTION PLAN:** Segera schedule meeting untuk presentasi Working Capital Loan. Siapkan proposal dengan rate kompetitif."),
+    ('action_payroll', "Action Plan Payroll",
+     "🎯 **ACTION PLAN:** Hubungi HRD untuk pitch Kopra Payroll. Emphasize kemudahan integrasi & cost efficiency.")
+]
+
+INSIGHT_BITS = {code: 1 << position for position, (code, _, _) in enumerate(INSIGHT_TYPES)}
+INSIGHT_LABELS = {code: label for code, label, _ in INSIGHT_TYPES}
+
+STABLE_MESSAGE = "Client dalam kondisi stabil. Monitoring rutin tetap diperlukan."
+
+INSIGHTS_PATH = os.path.join(DATA_DIR, 'insights.arrow')
+
+
+def insight_masks(df, thresholds=THRESHOLDS):
+    """Boolean mask per insight code over the whole frame"""
+    giro = df[GIRO_COLUMN].to_numpy()
+    high = giro >= thresholds['high_value_giro']
+    medium = giro >= thresholds['medium_value_giro']
+    no_sme = (df["SME Loan Status"] == "None").to_numpy()
+    no_payroll = (df["Payroll Status"] == "None").to_numpy()
+    txn = df["Transaction Frequency"]
+    tag = df["Opportunity Tag"]
+
+    return {
+        'critical_alert': high,
+        'giro_warning': medium & ~high,
+        'sme_opportunity': no_sme & high,
+        'payroll_cross_sell': no_payroll & medium,
+        'healthy_behavior': (txn == "High").to_numpy(),
+        'churn_risk': (txn == "Low").to_numpy(),
+        'action_sme': (tag == "TARGET SME LOAN").to_numpy(),
+        'action_payroll': (tag == "TARGET PAYROLL").to_numpy()
+    }
+
+
+def evaluate_insights(df, thresholds=THRESHOLDS):
+    """Insight table: client ID, insight bitmask and the amounts quoted in the messages"""
+    codes = np.zeros(len(df), dtype=np.uint16)
+    masks = insight_masks(df, thresholds)
+    for code, mask in masks.items():
+        codes[mask] |= INSIGHT_BITS[code]
+
+    giro = df[GIRO_COLUMN].to_numpy(dtype=np.float64)
+    return pd.DataFrame({
+        CLIENT_ID_COLUMN: df[CLIENT_ID_COLUMN].to_numpy(),
+        "Insight Codes": codes,
+        "SME Estimate (M)": np.where(masks['sme_opportunity'], giro * rule_multiplier("TARGET SME LOAN"), 0.0),
+        "Payroll Fee (M)": np.where(masks['payroll_cross_sell'], giro * rule_multiplier("TARGET PAYROLL"), 0.0)
+    })
+
+
+def has_insight(insights, code):
+    """Mask of the insight-table rows carrying an insight code"""
+    return (insights["Insight Codes"].to_numpy() & INSIGHT_BITS[code]) != 0
+
+
+def insight_counts(insights):
+    """Number of clients per insight label"""
+    return pd.Series({label: int(has_insight(insights, code).sum()) for code, label, _ in INSIGHT_TYPES})
+
+
+def format_insights(name, giro, codes, sme_estimate=0.0, payroll_fee=0.0):
+    """Render one client's insight codes as the markdown shown in the analysis panel"""
+    messages = [
+        template.format(name=name, giro=giro, sme_estimate=sme_estimate, payroll_fee=payroll_fee)
+        for code, _, template in INSIGHT_TYPES
+        if codes & INSIGHT_BITS[code]
+    ]
+    return "\n\n".join(messages) if messages else STABLE_MESSAGE
+
+
+def get_insights():
+    """Insight table of the process-wide dataset, built once per dataset version"""
+    return get_derived('insights', evaluate_insights)
+
+
+def main():
+    """Precompute the insight table for the whole client store"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--output", default=INSIGHTS_PATH, help="Arrow (.arrow) or Parquet (.parquet) output path")
+    parser.add_argument("--n-clients", type=int, help="Generate a synthetic portfolio instead of reading the store")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.n_clients:
+        df = load_data(args.n_clients, compact=True)
+    else:
+        df = read_client_store(ensure_client_store())
+    loaded = time.perf_counter()
+
+    insights = evaluate_insights(df)
+    evaluated = time.perf_counter()
+    write_client_store(insights, args.output)
+
+    print(f"{len(insights):,} clients: load {loaded - start:.2f}s, "
+          f"evaluate {evaluated - loaded:.2f}s, write {time.perf_counter() - evaluated:.2f}s -> {args.output}")
+    print(insight_counts(insights).to_string())
+
+
+if __name__ == "__main__":
+    main()
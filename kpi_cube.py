@@ -0,0 +1,297 @@
+"""
+KPI aggregation cube
+Pre-aggregates the portfolio over all KPI dimensions in a single pass
+"""
+
+import copy
+import operator
+
+import numpy as np
+import pandas as pd
+
+from config import KPI_CUBE_EDGES, LOYALTY_COLORS
+from dataset_cache import get_derived
+from rules_engine import GIRO_COLUMN, opportunity_tags
+
+
+# Categorical dimensions: (cube name, frame column, categories)
+CATEGORICAL_DIMENSIONS = [
+    ('tag', "Opportunity Tag", opportunity_tags()),
+    ('sme', "SME Loan Status", ["None", "Active"]),
+    ('payroll', "Payroll Status", ["None", "Active"]),
+    ('loyalty', "Loyalty Status", list(LOYALTY_COLORS)),
+    ('txn', "Transaction Frequency", ["Low", "Medium", "High"])
+]
+
+# Bucketed numeric dimensions: (cube name, frame column)
+BUCKET_DIMENSIONS = [
+    ('contact', "Days Since Contact"),
+    ('giro', "Avg Giro Balance (M)"),
+    ('tenure', "Tenure Years")
+]
+
+# Dimensions the Data View filters and reports on; giro is handled by FilterCube
+FILTER_DIMENSIONS = [
+    dimension for dimension in CATEGORICAL_DIMENSIONS if dimension[0] in ('tag', 'sme', 'payroll')
+]
+
+# Measures: (cube name, frame column); 'clients' is the row count
+MEASURES = [
+    ('giro', "Avg Giro Balance (M)"),
+    ('potential', "Potential Value (M)"),
+    ('tenure', "Tenure Years"),
+    ('days', "Days Since Contact")
+]
+
+_OPERATORS = {
+    '>=': operator.ge,
+    '>': operator.gt,
+    '<=': operator.le,
+    '<': operator.lt,
+    '==': operator.eq
+}
+
+
+def bucket_codes(values, edges):
+    """Bucket per value: 2i for the open interval below edges[i], 2i+1 for exactly edges[i]"""
+    edges = np.asarray(edges)
+    return (np.searchsorted(edges, values, side="left")
+            + np.searchsorted(edges, values, side="right")).astype(np.int16)
+
+
+def _bucket_representatives(edges):
+    """A value inside each bucket; comparisons against an edge give the same answer for the whole bucket"""
+    edges = np.asarray(edges, dtype=float)
+    bounds = np.concatenate([[edges[0] - 1], edges, [edges[-1] + 1]])
+    representatives = []
+    for position in range(2 * len(edges) + 1):
+        if position % 2:
+            representatives.append(edges[position // 2])
+        else:
+            representatives.append((bounds[position // 2] + bounds[position // 2 + 1]) / 2)
+    return np.array(representatives)
+
+
+def _category_codes(column, categories):
+    if isinstance(column.dtype, pd.CategoricalDtype) and list(column.cat.categories) == list(categories):
+        return column.cat.codes.to_numpy()
+    return pd.Categorical(column, categories=categories).codes
+
+
+class KpiCube:
+    """Dense cube of client counts and sums over tag × SME × payroll × loyalty × txn × contact × giro × tenure"""
+
+    def __init__(self, edges=KPI_CUBE_EDGES, categorical=CATEGORICAL_DIMENSIONS, buckets=BUCKET_DIMENSIONS):
+        self.categorical = categorical
+        self.buckets = buckets
+        self.edges = {name: list(edges[name]) for name, _ in buckets}
+        self.dimensions = [name for name, _, _ in categorical] + [name for name, _ in buckets]
+        self.labels = {name: list(categories) for name, _, categories in categorical}
+        self.shape = tuple(
+            [len(categories) for _, _, categories in categorical]
+            + [2 * len(self.edges[name]) + 1 for name, _ in buckets]
+        )
+        size = int(np.prod(self.shape))
+        self.values = {'clients': np.zeros(size)}
+        self.values.update({name: np.zeros(size) for name, _ in MEASURES})
+
+        # Coordinates of every cell along each dimension, for cell masks
+        self._coordinates = dict(zip(self.dimensions, np.indices(self.shape).reshape(len(self.shape), -1)))
+        self._representatives = {name: _bucket_representatives(self.edges[name]) for name, _ in buckets}
+
+    def cell_keys(self, df):
+        """Flat cell index of every row"""
+        codes = [_category_codes(df[column], categories) for _, column, categories in self.categorical]
+        codes += [bucket_codes(df[column].to_numpy(), self.edges[name]) for name, column in self.buckets]
+        if any((code < 0).any() for code in codes[:len(self.categorical)]):
+            raise ValueError("Client frame has a category value the KPI cube does not know")
+        return np.ravel_multi_index(codes, self.shape)
+
+    def copy(self):
+        """Cube with its own measure arrays; the cell layout is shared"""
+        cube = copy.copy(self)
+        cube.values = {name: values.copy() for name, values in self.values.items()}
+        return cube
+
+    def add(self, df, sign=1):
+        """Accumulate (or with sign=-1, remove) rows into the cube"""
+        keys = self.cell_keys(df)
+        size = len(self.values['clients'])
+        self.values['clients'] += sign * np.bincount(keys, minlength=size)
+        for name, column in MEASURES:
+            weights = df[column].to_numpy(dtype=np.float64)
+            self.values[name] += sign * np.bincount(keys, weights=weights, minlength=size)
+        return self
+
+    def _dimension_mask(self, dimension, condition):
+        coordinates = self._coordinates[dimension]
+        if dimension in self.labels:
+            labels = self.labels[dimension]
+            wanted = [condition] if isinstance(condition, str) else list(condition)
+            return np.isin(coordinates, [labels.index(label) for label in wanted if label in labels])
+
+        conditions = [condition] if isinstance(condition[0], str) else list(condition)
+        mask = np.ones(len(coordinates), dtype=bool)
+        for op, threshold in conditions:
+            if threshold not in self.edges[dimension]:
+                raise ValueError(f"{threshold} is not a KPI cube edge of '{dimension}'")
+            mask &= _OPERATORS[op](self._representatives[dimension][coordinates], threshold)
+        return mask
+
+    def mask(self, **conditions):
+        """Cell mask for the given dimension filters.
+
+        Categorical dimensions take a label or a list of labels; bucketed
+        dimensions take an (op, edge) pair or a list of pairs, e.g.
+        giro=('>=', 2000) or contact=[('>', 30), ('<=', 90)].
+        """
+        mask = np.ones(len(self.values['clients']), dtype=bool)
+        for dimension, condition in conditions.items():
+            mask &= self._dimension_mask(dimension, condition)
+        return mask
+
+    def total(self, measure='clients', **conditions):
+        """Sum of a measure over the matching cells"""
+        return float(self.values[measure][self.mask(**conditions)].sum())
+
+    def count(self, **conditions):
+        """Number of clients matching the filters"""
+        return int(round(self.total('clients', **conditions)))
+
+    def mean(self, measure, **conditions):
+        """Per-client mean of a measure over the matching clients"""
+        clients = self.total('clients', **conditions)
+        return self.total(measure, **conditions) / clients if clients else float("nan")
+
+    def breakdown(self, dimension, measure='clients', **conditions):
+        """Measure totals per label (or bucket) of one dimension"""
+        mask = self.mask(**conditions)
+        totals = np.bincount(self._coordinates[dimension][mask], weights=self.values[measure][mask],
+                             minlength=self.shape[self.dimensions.index(dimension)])
+        index = self.labels.get(dimension, range(len(totals)))
+        return pd.Series(totals, index=index)
+
+
+class FilterCube:
+    """Tag × SME × payroll cells with giro-sorted suffix sums, so any minimum giro filter is a lookup"""
+
+    def __init__(self, df):
+        self._template = KpiCube(categorical=FILTER_DIMENSIONS, buckets=[])
+        n_cells = len(self._template.values['clients'])
+        keys = self._template.cell_keys(df)
+        giro = df[GIRO_COLUMN].to_numpy(dtype=np.float64)
+        # Row-level data for the table page: cell and giro of every row
+        self._row_cells = keys.astype(np.min_scalar_type(n_cells))
+        self._row_giro = giro
+
+        # Collapse rows sharing a (cell, giro) pair into runs sorted by cell, then giro
+        order = np.lexsort((giro, keys))
+        keys, giro = keys[order], giro[order]
+        starts = np.flatnonzero(np.r_[True, (keys[1:] != keys[:-1]) | (giro[1:] != giro[:-1])])
+        run_ids = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(keys)]))
+
+        # Rows of each run in frame order (lexsort is stable), and where each run starts
+        self._rows = order
+        self._run_rows = np.r_[starts, len(keys)]
+        self._run_giro = giro[starts]
+        self._cell_bounds = np.searchsorted(keys[starts], np.arange(n_cells + 1))
+        self.measures = ['clients'] + [name for name, _ in MEASURES]
+        sums = [np.bincount(run_ids, minlength=len(starts))]
+        sums += [np.bincount(run_ids, weights=df[column].to_numpy(dtype=np.float64)[order], minlength=len(starts))
+                 for _, column in MEASURES]
+        # Prefix sums over runs, with a leading zero column
+        self._prefix = np.concatenate([np.zeros((len(sums), 1)), np.cumsum(sums, axis=1)], axis=1)
+
+    def labels(self, dimension):
+        """Labels of a dimension that occur in the frame"""
+        present = self.select().breakdown(dimension)
+        return list(present[present > 0].index)
+
+    def _first_runs(self, min_giro):
+        """First run of every cell with giro >= min_giro"""
+        first = self._cell_bounds[:-1].copy()
+        if min_giro is not None:
+            for cell, (start, stop) in enumerate(zip(first, self._cell_bounds[1:])):
+                first[cell] = start + np.searchsorted(self._run_giro[start:stop], min_giro, side="left")
+        return first
+
+    def select(self, min_giro=None, **conditions):
+        """KPI cube of the clients with giro >= min_giro matching the tag/SME/payroll filters"""
+        cube = KpiCube(categorical=FILTER_DIMENSIONS, buckets=[])
+        first = self._first_runs(min_giro)
+        last = self._cell_bounds[1:]
+
+        mask = cube.mask(**conditions)
+        for position, name in enumerate(self.measures):
+            cube.values[name] = np.where(mask, self._prefix[position, last] - self._prefix[position, first], 0.0)
+        return cube
+
+    def giro_positions(self, start, stop, ascending=True, min_giro=None, **conditions):
+        """Row positions [start, stop) of the matching clients sorted by giro, ties in frame order.
+
+        Only the first stop rows of each matching cell are read and merged, so the
+        cost depends on the page, not on the number of clients.
+        """
+        first = self._first_runs(min_giro)
+        candidates = []
+        for cell in np.flatnonzero(self._template.mask(**conditions)):
+            begin, end = self._run_rows[first[cell]], self._run_rows[self._cell_bounds[cell + 1]]
+            if ascending:
+                candidates.append(self._rows[begin:min(end, begin + stop)])
+            elif end - begin <= stop:
+                candidates.append(self._rows[begin:end])
+            else:
+                # Descending: runs from the top of the cell, each in frame order. The lowest
+                # run taken may be cut short, keeping its first rows in frame order
+                run = np.searchsorted(self._run_rows, end - stop, side="right") - 1
+                run_start, run_end = self._run_rows[run], self._run_rows[run + 1]
+                candidates.append(self._rows[run_start:run_start + stop - (end - run_end)])
+                candidates.append(self._rows[run_end:end])
+        rows = np.concatenate(candidates) if candidates else np.empty(0, dtype=np.int64)
+        giro = self._row_giro[rows]
+        return rows[np.lexsort((rows, giro if ascending else -giro))][start:stop]
+
+    def positions(self, start, stop, min_giro=None, order=None, **conditions):
+        """Row positions [start, stop) of the matching clients in order (frame order when None).
+
+        The order is scanned from its head in growing chunks until the page is
+        filled, so only the rows up to the requested page are looked at.
+        """
+        selected = self._template.mask(**conditions)
+        n_rows = len(self._row_cells)
+        found, n_found, offset, chunk = [], 0, 0, max(stop, 1024)
+        while n_found < stop and offset < n_rows:
+            rows = order[offset:offset + chunk] if order is not None else np.arange(offset, min(offset + chunk, n_rows))
+            keep = selected[self._row_cells[rows]]
+            if min_giro is not None:
+                keep &= self._row_giro[rows] >= min_giro
+            found.append(rows[keep])
+            n_found += int(keep.sum())
+            offset += chunk
+            chunk *= 2
+        rows = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+        return rows[start:stop]
+
+
+def build_kpi_cube(df, edges=KPI_CUBE_EDGES):
+    """Aggregate a client frame into a KPI cube"""
+    return KpiCube(edges).add(df)
+
+
+def get_kpi_cube():
+    """KPI cube of the process-wide dataset, built once per dataset version"""
+    return get_derived('kpi_cube', build_kpi_cube)
+
+
+def get_filter_cube():
+    """Data View filter cube of the process-wide dataset, built once per dataset version"""
+    return get_derived('filter_cube', FilterCube)
+
+
+def range_counts(cube, dimension, bins, labels, measure='clients'):
+    """Totals per right-closed bin (first bin includes its lower edge), like pd.cut(include_lowest=True)"""
+    totals = []
+    for position, label in enumerate(labels):
+        lower = ('>=' if position == 0 else '>', bins[position])
+        totals.append(cube.total(measure, **{dimension: [lower, ('<=', bins[position + 1])]}))
+    return pd.Series(totals, index=labels)
@@ -0,0 +1,129 @@
+"""
+Priority lead index
+Keeps the target clients of each tag ranked by potential value so the top K leads are a merge of list heads
+"""
+
+import copy
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from dataset_cache import get_derived
+from rules_engine import target_tags
+
+
+POTENTIAL_COLUMN = "Potential Value (M)"
+
+
+class LeadIndex:
+    """Per-tag row positions sorted by potential value (descending, ties in frame order)"""
+
+    def __init__(self, df, tags=None):
+        self.tags = list(tags) if tags is not None else target_tags()
+        self._positions = {}
+        self._keys = {}  # negated potential, ascending
+        tag_codes, potential = self._row_keys(df)
+        # Current key of every row, so an update can find its old entry
+        self._row_tag = tag_codes
+        self._row_potential = potential
+        for code, tag in enumerate(self.tags):
+            positions = np.flatnonzero(tag_codes == code)
+            order = np.lexsort((positions, -potential[positions]))
+            self._positions[tag] = positions[order]
+            self._keys[tag] = -potential[positions][order]
+
+    def _row_keys(self, df):
+        """Tag code (-1 for non-targets) and potential value of every row of df"""
+        column = df["Opportunity Tag"]
+        potential = df[POTENTIAL_COLUMN].to_numpy(dtype=np.float64)
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            # Map category codes through a lookup table; code -1 (missing) hits the trailing -1
+            lookup = np.full(len(column.cat.categories) + 1, -1, dtype=np.int8)
+            for code, tag in enumerate(self.tags):
+                if tag in column.cat.categories:
+                    lookup[column.cat.categories.get_loc(tag)] = code
+            return lookup[column.cat.codes.to_numpy()], potential
+        tag_values = column.to_numpy()
+        tag_codes = np.full(len(df), -1, dtype=np.int8)
+        for code, tag in enumerate(self.tags):
+            tag_codes[tag_values == tag] = code
+        return tag_codes, potential
+
+    def __len__(self):
+        return sum(len(positions) for positions in self._positions.values())
+
+    def count(self, tag):
+        """Number of indexed leads with a tag"""
+        return len(self._positions[tag])
+
+    def top_k(self, k, tags=None):
+        """Row positions of the k highest-potential leads, best first (matches DataFrame.nlargest)"""
+        heads = [
+            zip(self._keys[tag][:k], self._positions[tag][:k])
+            for tag in (tags if tags is not None else self.tags)
+        ]
+        return np.array([int(position) for _, position in heapq.merge(*heads)][:k], dtype=np.int64)
+
+    def _locate(self, tag, positions, potential):
+        """Index of each (potential, position) key in a tag's sorted arrays, by binary search"""
+        keys = self._keys[tag]
+        points = np.searchsorted(keys, -potential, side="left")
+        tied = points < len(keys)
+        tied[tied] = keys[points[tied]] == -potential[tied]
+        if tied.any():
+            # Equal potentials are ordered by position: search (run of equal keys, position) pairs
+            runs = np.concatenate(([0], np.cumsum(keys[1:] != keys[:-1])))
+            stride = len(self._row_tag)
+            pairs = runs * stride + self._positions[tag]
+            points[tied] = np.searchsorted(pairs, runs[points[tied]] * stride + positions[tied])
+        return points
+
+    def changed_rows(self, df):
+        """Positions of the rows of df whose tag or potential differs from the indexed one"""
+        tag_codes, potential = self._row_keys(df)
+        return np.flatnonzero((tag_codes != self._row_tag) | (potential != self._row_potential))
+
+    def update(self, df, positions):
+        """Re-index rows of df whose tag or potential value changed, in O(changed * log n) searches.
+
+        Arrays are replaced rather than modified, so updating a shallow copy leaves the original intact.
+        """
+        positions = np.unique(np.asarray(positions, dtype=np.int64))
+        self._positions = dict(self._positions)
+        self._keys = dict(self._keys)
+        tag_codes, potential = self._row_keys(df.iloc[positions])
+        potential_all = self._row_potential.copy()
+        row_tag = self._row_tag.copy()
+        for code, tag in enumerate(self.tags):
+            removed = positions[row_tag[positions] == code]
+            points = self._locate(tag, removed, potential_all[removed])
+            self._positions[tag] = np.delete(self._positions[tag], points)
+            self._keys[tag] = np.delete(self._keys[tag], points)
+
+            added = tag_codes == code
+            # Rows sharing an insertion point go in the index order: potential, then position
+            order = np.lexsort((positions[added], -potential[added]))
+            added_positions = positions[added][order]
+            added_potential = potential[added][order]
+            points = self._locate(tag, added_positions, added_potential)
+            self._positions[tag] = np.insert(self._positions[tag], points, added_positions)
+            self._keys[tag] = np.insert(self._keys[tag], points, -added_potential)
+
+        row_tag[positions] = tag_codes
+        potential_all[positions] = potential
+        self._row_tag = row_tag
+        self._row_potential = potential_all
+        return self
+
+
+def _refresh_lead_index(index, df):
+    """Carry the previous dataset's index over to df, re-indexing only the rows that changed"""
+    if len(index._row_tag) != len(df) or index.tags != target_tags():
+        return LeadIndex(df)
+    return copy.copy(index).update(df, index.changed_rows(df))
+
+
+def get_lead_index():
+    """Lead index of the process-wide dataset, updated from the previous version's index on reload"""
+    return get_derived('lead_index', LeadIndex, refresh=_refresh_lead_index)
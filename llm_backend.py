@@ -0,0 +1,336 @@
+"""
+LLM analysis backend
+Asyncio client for a model server that batches clients, caps concurrency and falls back to mock_ai_analysis
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import random
+import threading
+import time
+import urllib.parse
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from config import LLM_BACKEND
+from data_loader import CLIENT_ID_COLUMN
+from script_cache import ANALYSIS_FIELDS, ScriptCache, cached_analysis, has_cached_analysis, plain_value, text_key
+from utils import mock_ai_analysis
+
+
+def client_payload(client_row):
+    """JSON-ready request entry of one client"""
+    return {
+        'client_id': plain_value(client_row[CLIENT_ID_COLUMN]),
+        'fields': {field: plain_value(client_row[field]) for field in ANALYSIS_FIELDS}
+    }
+
+
+async def _read_headers(reader):
+    """Response header fields up to the blank line, names lower-cased"""
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _read_chunked(reader):
+    """Body of a Transfer-Encoding: chunked response"""
+    chunks = []
+    while True:
+        size = int((await reader.readline()).split(b";")[0].strip(), 16)
+        if size == 0:
+            # Skip the trailer fields
+            await _read_headers(reader)
+            return b"".join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readline()
+
+
+async def post_json(url, payload):
+    """POST a JSON body and return the decoded JSON response (HTTP/1.1, one connection per request)"""
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ('http', 'https'):
+        raise ValueError(f"Unsupported backend url: {url}")
+    https = parts.scheme == 'https'
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or (443 if https else 80), ssl=https or None)
+    body = json.dumps(payload).encode()
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    header = (f"POST {path} HTTP/1.1\r\nHost: {parts.netloc}\r\nContent-Type: application/json\r\n"
+              f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n")
+    try:
+        writer.write(header.encode() + body)
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        headers = await _read_headers(reader)
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            response = await _read_chunked(reader)
+        elif "content-length" in headers:
+            response = await reader.readexactly(int(headers["content-length"]))
+        else:
+            response = await reader.read()
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            # The server may drop the connection first; the response is already read
+            pass
+    if status != 200:
+        raise RuntimeError(f"Backend answered HTTP {status}")
+    return json.loads(response)
+
+
+class AnalysisClient:
+    """Model-server analysis behind a synchronous call with a latency budget.
+
+    Requests from all callers are queued on a private event loop, grouped into
+    batches of up to batch_size clients and sent with at most max_concurrency
+    requests in flight. Answers are cached per distinct client data; a call
+    that misses its budget returns the mock analysis while the request keeps
+    running, so the model's answer is served from cache next time.
+    """
+
+    def __init__(self, url, batch_size=LLM_BACKEND['batch_size'], batch_wait_ms=LLM_BACKEND['batch_wait_ms'],
+                 max_concurrency=LLM_BACKEND['max_concurrency'], request_timeout=LLM_BACKEND['request_timeout_s'],
+                 latency_budget=LLM_BACKEND['latency_budget_s'], cache_entries=LLM_BACKEND['cache_entries'],
+                 fallback=mock_ai_analysis):
+        self.url = url
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait_ms / 1000
+        self.max_concurrency = max_concurrency
+        self.request_timeout = request_timeout
+        self.latency_budget = latency_budget
+        self.fallback = fallback
+        self.cache = ScriptCache(cache_entries)
+        self.fallbacks = 0
+        self.batches = 0
+        self.failures = 0
+        self._latencies = deque(maxlen=10000)
+        self._inflight = {}
+        self._tasks = set()
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-backend", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+
+    async def _start(self):
+        self._queue = asyncio.Queue()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._spawn(self._run_batcher())
+
+    def _spawn(self, coroutine):
+        # Keep a reference so pending tasks are not garbage collected
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batcher(self):
+        """Group queued clients into batches: full, or after batch_wait since the first one"""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.batch_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            self._spawn(self._send(batch))
+
+    async def _send(self, batch):
+        """One backend request for a batch of (key, slot, payload, future)"""
+        async with self._semaphore:
+            self.batches += 1
+            try:
+                response = await asyncio.wait_for(
+                    post_json(self.url, {'clients': [payload for _, _, payload, _ in batch]}),
+                    self.request_timeout
+                )
+                texts = {item['client_id']: item['analysis'] for item in response['analyses']}
+            except Exception as error:
+                self.failures += 1
+                for key, _, _, future in batch:
+                    self._inflight.pop(key, None)
+                    future.set_exception(error)
+                return
+
+        for key, slot, payload, future in batch:
+            self._inflight.pop(key, None)
+            if payload['client_id'] in texts:
+                self.cache.store(key, slot, texts[payload['client_id']])
+                future.set_result(texts[payload['client_id']])
+            else:
+                future.set_exception(KeyError(f"Backend returned no analysis for client {payload['client_id']}"))
+
+    async def _request(self, key, slot, payload):
+        # Identical requests already on their way share one answer
+        if key not in self._inflight:
+            future = self._loop.create_future()
+            self._inflight[key] = future
+            await self._queue.put((key, slot, payload, future))
+        return await asyncio.shield(self._inflight[key])
+
+    def _key(self, client_row):
+        return text_key(AnalysisClient.analyze, [client_row[field] for field in ANALYSIS_FIELDS], settings=())
+
+    def has_cached(self, client_row):
+        """Whether the model server's analysis of a client is cached; not counted as a cache request"""
+        return self.cache.contains(self._key(client_row))
+
+    def analyze(self, client_row):
+        """Analysis text of a client from the model server, or the mock analysis if over budget"""
+        start = time.perf_counter()
+        key = self._key(client_row)
+        text = self.cache.lookup(key)
+        if text is None:
+            slot = ('AnalysisClient.analyze', plain_value(client_row[CLIENT_ID_COLUMN]))
+            future = asyncio.run_coroutine_threadsafe(self._request(key, slot, client_payload(client_row)), self._loop)
+            try:
+                text = future.result(timeout=self.latency_budget)
+            except Exception:
+                # The request keeps running; only its answer for this call is given up
+                self.fallbacks += 1
+                text = cached_analysis(client_row, self.fallback)
+        self._latencies.append(time.perf_counter() - start)
+        return text
+
+    def analyze_many(self, client_rows):
+        """Analyses for several clients, requested concurrently so they share batches"""
+        # Enough callers to keep every concurrent request slot filled with a full batch
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.batch_size * self.max_concurrency) as executor:
+            return list(executor.map(self.analyze, client_rows))
+
+    def latency_percentiles(self, percentiles=(50, 95)):
+        """Caller-observed latency percentiles in milliseconds"""
+        if not self._latencies:
+            return {f"p{p}": float("nan") for p in percentiles}
+        values = np.percentile(np.array(self._latencies) * 1000, percentiles)
+        return {f"p{p}": float(value) for p, value in zip(percentiles, values)}
+
+    def stats(self):
+        """Request counters, cache hit rate and latency percentiles"""
+        stats = {
+            'requests': len(self._latencies),
+            'batches': self.batches,
+            'failures': self.failures,
+            'fallbacks': self.fallbacks,
+            'cache_hit_rate': self.cache.stats()['hit_rate']
+        }
+        stats.update(self.latency_percentiles())
+        return stats
+
+    async def _cancel_tasks(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def close(self):
+        """Cancel pending requests and stop the event loop thread"""
+        asyncio.run_coroutine_threadsafe(self._cancel_tasks(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+_default_client = None
+_client_lock = threading.Lock()
+
+
+def get_analysis_client():
+    """Process-wide model-server client, or None when no backend url is configured"""
+    global _default_client
+    if not LLM_BACKEND['url']:
+        return None
+    with _client_lock:
+        if _default_client is None:
+            _default_client = AnalysisClient(LLM_BACKEND['url'])
+    return _default_client
+
+
+def analyze_client(client_row):
+    """Insights for a client from the configured backend, or the cached mock analysis"""
+    client = get_analysis_client()
+    if client is None:
+        return cached_analysis(client_row)
+    return client.analyze(client_row)
+
+
+def is_analysis_cached(client_row):
+    """Whether analyze_client would answer a client from cache"""
+    client = get_analysis_client()
+    if client is None:
+        return has_cached_analysis(client_row)
+    return client.has_cached(client_row)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Answers analysis batches with mock_ai_analysis after a simulated model delay"""
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        time.sleep(random.uniform(server.delay, server.delay * (1 + server.jitter)))
+        if random.random() < server.failure_rate:
+            self.send_error(503)
+            return
+        analyses = [
+            {'client_id': client['client_id'],
+             'analysis': mock_ai_analysis(pd.Series({CLIENT_ID_COLUMN: client['client_id'], **client['fields']}))}
+            for client in request['clients']
+        ]
+        body = json.dumps({'analyses': analyses}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_stub(port=0, delay_ms=200, jitter=0.5, failure_rate=0.0):
+    """Start a local stub model server in a background thread; returns the server (url in server.url)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), _StubHandler)
+    server.daemon_threads = True
+    server.delay = delay_ms / 1000
+    server.jitter = jitter
+    server.failure_rate = failure_rate
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/analyze"
+    threading.Thread(target=server.serve_forever, name="llm-stub", daemon=True).start()
+    return server
+
+
+def main():
+    """Run a local stub model server for the analysis backend"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay-ms", type=int, default=200, help="Minimum simulated model latency per batch")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Extra latency as a fraction of the delay")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of batches answered with HTTP 503")
+    args = parser.parse_args()
+
+    server = serve_stub(args.port, args.delay_ms, args.jitter, args.failure_rate)
+    print(f"Stub backend on {server.url} (set LLM_BACKEND_URL to use it)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Message template engine
+Loads the WhatsApp templates from templates/<language>/ once and renders them by filling slots
+"""
+
+import os
+import string
+
+import numpy as np
+
+from config import MESSAGE_TEMPLATES, TEMPLATE_DIR, USER_PROFILE
+from rules_engine import rule_multiplier
+
+
+# Slots a template may use
+PROFILE_SLOTS = ['user_name', 'user_branch', 'user_phone']
+CLIENT_SLOTS = ['client_name', 'giro_balance', 'sme_limit', 'payroll_fee',
+                'tenure_years', 'loyalty_status', 'last_note']
+
+
+class MessageTemplate:
+    """A template parsed into literal segments and slot names"""
+
+    def __init__(self, text, name="<template>"):
+        self.name = name
+        self.literals = []
+        self.slots = []
+        self._compiled = {}  # sorted constants -> (function, argument slots)
+        for literal, field, spec, conversion in string.Formatter().parse(text):
+            self.literals.append(literal)
+            if field is None:
+                continue
+            if field not in PROFILE_SLOTS + CLIENT_SLOTS:
+                raise ValueError(f"{name}: unknown slot '{{{field}}}'")
+            if spec or conversion:
+                raise ValueError(f"{name}: slot '{{{field}}}' takes no format spec or conversion "
+                                 f"(got '{{{field}{'!' + conversion if conversion else ''}{':' + spec if spec else ''}}}')")
+            self.slots.append(field)
+        # Positional format string over the segments: rendering is a single str.format call
+        self._format = "".join(
+            literal.replace("{", "{{").replace("}", "}}") + (f"{{{position}}}" if position < len(self.slots) else "")
+            for position, literal in enumerate(self.literals)
+        )
+
+    def render(self, **values):
+        """Fill the slots of one message"""
+        return self._format.format(*[values[slot] for slot in self.slots])
+
+    def compile(self, constants=None):
+        """Compiled f-string function of the non-constant slots, built once per set of constants"""
+        constants = constants or {}
+        key = tuple(sorted(constants.items()))
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            # A concurrent first call just compiles the same function twice
+            compiled = self._compiled[key] = self._compile(constants)
+        return compiled
+
+    def _compile(self, constants):
+        """Compile to an f-string function of the non-constant slots; returns (function, argument slots)"""
+        arguments = [slot for slot in dict.fromkeys(self.slots) if slot not in constants]
+        parts = []
+        for position, literal in enumerate(self.literals):
+            parts.append(_escape(literal))
+            if position < len(self.slots):
+                slot = self.slots[position]
+                # Slot names are validated identifiers; constants are inlined as escaped literals
+                parts.append(_escape(str(constants[slot])) if slot in constants else f"{{{slot}}}")
+        source = f"lambda {', '.join(arguments)}: f'{''.join(parts)}'"
+        return eval(compile(source, self.name, "eval"), {}), arguments
+
+    def render_many(self, columns, constants=None):
+        """Fill the slots from equal-length columns (lists/arrays); constants are shared by every row"""
+        function, arguments = self.compile(constants)
+        if not arguments:
+            n_rows = len(next(iter(columns.values()))) if columns else 1
+            return [function()] * n_rows
+        return list(map(function, *[columns[slot] for slot in arguments]))
+
+
+def _escape(text):
+    """Text as the literal part of a single-quoted f-string"""
+    return (text.replace("\\", "\\\\").replace("'", "\\'").replace("\n", "\\n").replace("\r", "\\r")
+            .replace("{", "{{").replace("}", "}}"))
+
+
+def load_templates(directory=TEMPLATE_DIR):
+    """Parse every templates/<language>/<name>.txt file"""
+    templates = {}
+    for language in sorted(os.listdir(directory)):
+        language_dir = os.path.join(directory, language)
+        if not os.path.isdir(language_dir):
+            continue
+        for filename in sorted(os.listdir(language_dir)):
+            name, extension = os.path.splitext(filename)
+            if extension != ".txt":
+                continue
+            with open(os.path.join(language_dir, filename), encoding="utf-8") as handle:
+                text = handle.read()
+            # Files end with a newline; messages do not
+            text = text[:-1] if text.endswith("\n") else text
+            templates[(language, name)] = MessageTemplate(text, f"{language}/{filename}")
+    return templates
+
+
+_TEMPLATES = load_templates()
+
+
+def get_template(name, language=None):
+    """Template by name in the given (or the RM's) language"""
+    language = language or USER_PROFILE['language']
+    if (language, name) not in _TEMPLATES:
+        raise KeyError(f"No template '{name}' for language '{language}' in {TEMPLATE_DIR}")
+    return _TEMPLATES[(language, name)]
+
+
+def template_for_tag(tag, language=None):
+    """Opportunity template selected by tag"""
+    return get_template(MESSAGE_TEMPLATES.get(tag, MESSAGE_TEMPLATES['default']), language)
+
+
+def profile_slots(profile=USER_PROFILE):
+    """Slot values of the RM sending the messages"""
+    return {'user_name': profile['name'], 'user_branch': profile['branch'], 'user_phone': profile['phone']}
+
+
+def opportunity_slots(client_name, giro_balance):
+    """Client slot values of an opportunity message"""
+    return {
+        'client_name': client_name,
+        'giro_balance': giro_balance,
+        'sme_limit': giro_balance * rule_multiplier("TARGET SME LOAN"),
+        'payroll_fee': giro_balance * rule_multiplier("TARGET PAYROLL")
+    }
+
+
+def render_opportunity_scripts(names, tags, giro_balances, language=None):
+    """Opportunity scripts for columns of clients, rendered one tag group at a time"""
+    tags = np.asarray(tags, dtype=object)
+    giro = np.asarray(giro_balances)
+    names = np.asarray(names, dtype=object)
+    scripts = np.empty(len(tags), dtype=object)
+    constants = profile_slots()
+    for tag in set(tags.tolist()):
+        rows = np.flatnonzero(tags == tag)
+        group_giro = giro[rows]
+        columns = {
+            'client_name': names[rows],
+            'giro_balance': group_giro.tolist(),
+            'sme_limit': (group_giro * rule_multiplier("TARGET SME LOAN")).tolist(),
+            'payroll_fee': (group_giro * rule_multiplier("TARGET PAYROLL")).tolist()
+        }
+        scripts[rows] = template_for_tag(tag, language).render_many(columns, constants)
+    return scripts.tolist()
+
+
+def render_relationship_scripts(names, tenure_years, loyalty_statuses, last_notes, language=None):
+    """Relationship greeting scripts for columns of clients"""
+    return get_template(MESSAGE_TEMPLATES['relationship'], language).render_many({
+        'client_name': names,
+        'tenure_years': tenure_years,
+        'loyalty_status': loyalty_statuses,
+        'last_note': last_notes
+    }, profile_slots())
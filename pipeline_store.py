@@ -0,0 +1,229 @@
+"""
+Pipeline store
+Shared SQLite log of pipeline updates with the current status of every client, queried by client, status and RM
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from config import PIPELINE_STATUSES, PIPELINE_STORE, USER_PROFILE
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pipeline_events (
+    event_id INTEGER PRIMARY KEY,
+    client_id INTEGER NOT NULL,
+    rm TEXT NOT NULL,
+    status TEXT NOT NULL,
+    notes TEXT NOT NULL DEFAULT '',
+    next_action TEXT NOT NULL DEFAULT '',
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pipeline_events_client ON pipeline_events (client_id, event_id);
+CREATE INDEX IF NOT EXISTS pipeline_events_rm ON pipeline_events (rm, event_id);
+
+-- Latest event per client, kept in step with the log so aggregates never scan it
+CREATE TABLE IF NOT EXISTS pipeline_current (
+    client_id INTEGER PRIMARY KEY,
+    event_id INTEGER NOT NULL,
+    rm TEXT NOT NULL,
+    status TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pipeline_current_status ON pipeline_current (status);
+CREATE INDEX IF NOT EXISTS pipeline_current_rm ON pipeline_current (rm, status);
+CREATE INDEX IF NOT EXISTS pipeline_current_event ON pipeline_current (event_id);
+"""
+
+_INSERT_EVENTS = """
+INSERT INTO pipeline_events (client_id, rm, status, notes, next_action, updated_at)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# Only the last event of each client in a batch moves its current status. NOT INDEXED keeps
+# the batch lookup on a rowid range instead of a scan of the whole client index.
+_UPSERT_CURRENT = """
+INSERT INTO pipeline_current (client_id, event_id, rm, status, updated_at)
+SELECT client_id, event_id, rm, status, updated_at FROM pipeline_events
+WHERE event_id IN (SELECT MAX(event_id) FROM pipeline_events NOT INDEXED WHERE event_id > ? GROUP BY client_id)
+ON CONFLICT (client_id) DO UPDATE SET
+    event_id = excluded.event_id, rm = excluded.rm, status = excluded.status, updated_at = excluded.updated_at
+"""
+
+_UPDATE_COLUMNS = ['client_id', 'rm', 'status', 'notes', 'next_action', 'updated_at']
+
+
+def _where(rm=None, status=None):
+    """WHERE clause and parameters for the optional RM and status filters"""
+    clauses, params = [], []
+    if rm is not None:
+        clauses.append("rm = ?")
+        params.append(rm)
+    if status is not None:
+        clauses.append("status = ?")
+        params.append(status)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+class PipelineStore:
+    """Append-only pipeline event log plus a current-status table, in one WAL-mode SQLite file.
+
+    Updates are buffered and written in batches of batch_size (or on flush),
+    each batch in one transaction that also moves the clients' current
+    status. Every thread gets its own connection; WAL lets Streamlit sessions
+    read while another one writes.
+    """
+
+    def __init__(self, path=PIPELINE_STORE['path'], batch_size=PIPELINE_STORE['batch_size']):
+        self.path = path
+        self.batch_size = batch_size
+        self.writes = 0
+        self._pending = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=PIPELINE_STORE['busy_timeout_s'])
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA cache_size=-{PIPELINE_STORE['cache_mb'] * 1024}")
+            self._local.connection = connection
+        return connection
+
+    def _query(self, sql, params=()):
+        return self._connection().execute(sql, params).fetchall()
+
+    def add(self, client_id, status, notes="", next_action="", rm=None, updated_at=None):
+        """Buffer one update; the buffer is written once it holds batch_size updates"""
+        if status not in PIPELINE_STATUSES:
+            raise ValueError(f"Unknown pipeline status: {status}")
+        update = (
+            int(client_id),
+            rm if rm is not None else USER_PROFILE['name'],
+            status,
+            notes or "",
+            next_action or "",
+            updated_at or datetime.now().strftime("%Y-%m-%d %H:%M")
+        )
+        with self._lock:
+            self._pending.append(update)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def add_many(self, updates):
+        """Write (client_id, rm, status, notes, next_action, updated_at) tuples in batches"""
+        batch = []
+        for update in updates:
+            batch.append(update)
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    def flush(self):
+        """Write the buffered updates"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch):
+        connection = self._connection()
+        with connection:
+            last_event = connection.execute("SELECT COALESCE(MAX(event_id), 0) FROM pipeline_events").fetchone()[0]
+            connection.executemany(_INSERT_EVENTS, batch)
+            connection.execute(_UPSERT_CURRENT, (last_event,))
+        self.writes += 1
+
+    def record(self, client_id, status, notes="", next_action="", rm=None, updated_at=None):
+        """Add one update and write it right away, with anything already buffered"""
+        self.add(client_id, status, notes, next_action, rm, updated_at)
+        self.flush()
+
+    def latest(self, client_id):
+        """The client's most recent update as a dict, or None"""
+        rows = self._query(
+            f"SELECT {', '.join(_UPDATE_COLUMNS)} FROM pipeline_events WHERE client_id = ? "
+            "ORDER BY event_id DESC LIMIT 1",
+            (int(client_id),)
+        )
+        return dict(zip(_UPDATE_COLUMNS, rows[0])) if rows else None
+
+    def history(self, client_id, limit=None):
+        """The client's updates, newest first"""
+        return pd.read_sql_query(
+            f"SELECT {', '.join(_UPDATE_COLUMNS)} FROM pipeline_events WHERE client_id = ? "
+            "ORDER BY event_id DESC LIMIT ?",
+            self._connection(), params=(int(client_id), -1 if limit is None else limit)
+        )
+
+    def current(self, rm=None, status=None, limit=None):
+        """Current status of the clients in the pipeline, most recently updated first"""
+        where, params = _where(rm, status)
+        return pd.read_sql_query(
+            f"SELECT client_id, rm, status, updated_at FROM pipeline_current{where} "
+            "ORDER BY event_id DESC LIMIT ?",
+            self._connection(), params=params + [-1 if limit is None else limit]
+        )
+
+    def client_ids(self, rm=None, status=None):
+        """IDs of the clients in the pipeline"""
+        where, params = _where(rm, status)
+        return pd.read_sql_query(
+            f"SELECT client_id FROM pipeline_current{where}", self._connection(), params=params
+        )['client_id'].to_numpy()
+
+    def count(self, rm=None, status=None):
+        """Number of clients in the pipeline"""
+        where, params = _where(rm, status)
+        return self._query(f"SELECT COUNT(*) FROM pipeline_current{where}", params)[0][0]
+
+    def status_counts(self, rm=None):
+        """Clients per current status, largest first"""
+        where, params = _where(rm)
+        rows = self._query(
+            f"SELECT status, COUNT(*) AS clients FROM pipeline_current{where} "
+            "GROUP BY status ORDER BY clients DESC, status",
+            params
+        )
+        return pd.Series(dict(rows), dtype="int64", name="clients")
+
+    def conversion(self, rm=None, won_status=PIPELINE_STORE['won_status']):
+        """Clients in the pipeline, clients won and the conversion rate (0..1)"""
+        where, params = _where(rm)
+        total, won = self._query(
+            f"SELECT COUNT(*), COALESCE(SUM(status = ?), 0) FROM pipeline_current{where}",
+            [won_status] + params
+        )[0]
+        return {'clients': total, 'won': won, 'rate': won / total if total else 0.0}
+
+    def event_counts(self, rm=None):
+        """Number of logged updates per status (every event, not only the current ones)"""
+        where, params = _where(rm)
+        return pd.Series(dict(self._query(
+            f"SELECT status, COUNT(*) FROM pipeline_events{where} GROUP BY status", params
+        )), dtype="int64")
+
+
+_default_store = None
+_store_lock = threading.Lock()
+
+
+def get_pipeline_store():
+    """Process-wide pipeline store at the configured path"""
+    global _default_store
+    with _store_lock:
+        if _default_store is None:
+            _default_store = PipelineStore()
+    return _default_store
@@ -0,0 +1,89 @@
+"""
+Prefetch module
+Warms the script cache for the clients on screen on a small thread pool, so the analysis panel opens from cache
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import PREFETCH
+from data_loader import CLIENT_ID_COLUMN
+from llm_backend import analyze_client, is_analysis_cached
+from script_cache import cached_script, has_cached_script
+from utils import generate_script
+
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    """Submits each client's insight and script generation once until it has finished"""
+
+    def __init__(self, max_workers=PREFETCH['workers']):
+        self.submitted = 0
+        self.skipped = 0
+        self.cached = 0
+        self.failures = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def _warm(self, client_id, client_row, script_generator):
+        try:
+            analyze_client(client_row)
+            cached_script(client_row, script_generator)
+        finally:
+            with self._lock:
+                self._pending.discard(client_id)
+
+    def _log_failure(self, future, client_id):
+        """Done callback: nobody reads the prefetch futures, so a failed warm-up is logged here"""
+        error = future.exception()
+        if error is not None:
+            with self._lock:
+                self.failures += 1
+            logger.warning("Prefetch of client %s failed", client_id, exc_info=error)
+
+    def prefetch(self, rows, script_generator=generate_script):
+        """Queue the clients of a frame for warming; returns the number newly queued"""
+        queued = 0
+        for _, client_row in rows.iterrows():
+            client_id = client_row[CLIENT_ID_COLUMN]
+            # Checked without counting as cache hits, so reruns do not inflate the hit rate
+            if is_analysis_cached(client_row) and has_cached_script(client_row, script_generator):
+                with self._lock:
+                    self.cached += 1
+                continue
+            with self._lock:
+                if client_id in self._pending:
+                    self.skipped += 1
+                    continue
+                self._pending.add(client_id)
+                self.submitted += 1
+            future = self._executor.submit(self._warm, client_id, client_row, script_generator)
+            future.add_done_callback(lambda future, client_id=client_id: self._log_failure(future, client_id))
+            queued += 1
+        return queued
+
+    def pending(self):
+        """Number of clients queued or being warmed"""
+        with self._lock:
+            return len(self._pending)
+
+    def stats(self):
+        return {'submitted': self.submitted, 'skipped': self.skipped, 'cached': self.cached,
+                'failures': self.failures, 'pending': self.pending()}
+
+
+_default_prefetcher = Prefetcher()
+
+
+def prefetch_clients(rows, script_generator=generate_script):
+    """Warm the process-wide script cache for the clients of a frame in the background"""
+    return _default_prefetcher.prefetch(rows, script_generator)
+
+
+def prefetch_stats():
+    """Counters of the process-wide prefetcher"""
+    return _default_prefetcher.stats()
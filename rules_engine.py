@@ -0,0 +1,108 @@
+"""
+Opportunity rules engine
+Evaluates the tagging rules from config as whole-column masks over the client frame
+"""
+
+import operator
+
+import numpy as np
+import pandas as pd
+
+from config import THRESHOLDS, OPPORTUNITY_RULES, DEFAULT_OPPORTUNITY
+
+
+_OPERATORS = {
+    '>=': operator.ge,
+    '>': operator.gt,
+    '<=': operator.le,
+    '<': operator.lt,
+    '==': operator.eq,
+    '!=': operator.ne
+}
+
+GIRO_COLUMN = "Avg Giro Balance (M)"
+
+
+def opportunity_tags(rules=OPPORTUNITY_RULES, default=DEFAULT_OPPORTUNITY):
+    """All tags the rules can assign, in priority order"""
+    return [rule['tag'] for rule in rules] + [default['tag']]
+
+
+def target_tags(rules=OPPORTUNITY_RULES, default=DEFAULT_OPPORTUNITY):
+    """Tags that mark a client as a sales target"""
+    return [tag for tag in opportunity_tags(rules, default) if "TARGET" in tag]
+
+
+def value_multipliers(rules=OPPORTUNITY_RULES, default=DEFAULT_OPPORTUNITY):
+    """Potential value multiplier per tag code"""
+    return np.array([rule['value_multiplier'] for rule in rules] + [default['value_multiplier']])
+
+
+def rule_multiplier(tag, rules=OPPORTUNITY_RULES, default=DEFAULT_OPPORTUNITY):
+    """Potential value multiplier of a single tag"""
+    return value_multipliers(rules, default)[opportunity_tags(rules, default).index(tag)]
+
+
+def _condition_mask(df, condition, thresholds):
+    """Evaluate one condition over a whole column"""
+    column = df[condition['column']]
+    op = condition['op']
+    target = thresholds[condition['threshold']] if 'threshold' in condition else condition['value']
+
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # Compare integer codes instead of strings
+        codes = column.cat.codes.to_numpy()
+        categories = column.cat.categories
+        if op == 'in':
+            return np.isin(codes, categories.get_indexer(list(target)))
+        if op in ('==', '!='):
+            code = categories.get_loc(target) if target in categories else -2
+            return _OPERATORS[op](codes, code)
+        column = column.astype(categories.dtype)
+
+    if op == 'in':
+        return column.isin(list(target)).to_numpy(dtype=bool)
+    return _OPERATORS[op](column, target).to_numpy(dtype=bool, na_value=False)
+
+
+def rule_mask(df, rule, thresholds=THRESHOLDS):
+    """Boolean mask of the clients satisfying every condition of a rule"""
+    mask = np.ones(len(df), dtype=bool)
+    for condition in rule['conditions']:
+        mask &= _condition_mask(df, condition, thresholds)
+    return mask
+
+
+def evaluate_tag_codes(df, rules=OPPORTUNITY_RULES, thresholds=THRESHOLDS):
+    """Tag code per client (index into opportunity_tags); the first matching rule wins"""
+    codes = np.full(len(df), len(rules), dtype=np.int8)
+    # Apply rules from lowest to highest priority so earlier rules overwrite later ones
+    for position in range(len(rules) - 1, -1, -1):
+        codes[rule_mask(df, rules[position], thresholds)] = position
+    return codes
+
+
+def potential_values(giro, codes, rules=OPPORTUNITY_RULES, default=DEFAULT_OPPORTUNITY):
+    """Potential value (M) per client from its giro balance and tag code"""
+    return np.round(np.asarray(giro) * value_multipliers(rules, default)[codes], 1)
+
+
+def apply_opportunity_rules(df, rules=OPPORTUNITY_RULES, thresholds=THRESHOLDS,
+                            default=DEFAULT_OPPORTUNITY):
+    """Return a copy of the frame with Opportunity Tag and Potential Value (M) re-evaluated"""
+    codes = evaluate_tag_codes(df, rules, thresholds)
+    tags = pd.Categorical.from_codes(codes, categories=opportunity_tags(rules, default))
+    potential = potential_values(df[GIRO_COLUMN], codes, rules, default)
+
+    result = df.copy(deep=False)
+    tags = pd.Series(tags, index=df.index)
+    current_tag = df.get("Opportunity Tag")
+    if current_tag is not None and not isinstance(current_tag.dtype, pd.CategoricalDtype):
+        # Keep plain string columns as strings
+        tags = tags.astype(current_tag.dtype)
+    result["Opportunity Tag"] = tags
+
+    current_potential = df.get("Potential Value (M)")
+    dtype = current_potential.dtype if current_potential is not None else np.float64
+    result["Potential Value (M)"] = pd.Series(potential.astype(dtype), index=df.index)
+    return result
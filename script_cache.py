@@ -0,0 +1,214 @@
+"""
+Script cache module
+Memoizes generated insights and scripts across sessions, keyed on the client fields each generator reads
+"""
+
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from config import SCRIPT_CACHE, THRESHOLDS, USER_PROFILE
+from data_loader import CLIENT_ID_COLUMN
+from dataset_cache import on_dataset_reload
+from utils import generate_relationship_script, generate_script, mock_ai_analysis
+
+
+# Client fields each generator reads
+ANALYSIS_FIELDS = ["Client Name", "Avg Giro Balance (M)", "SME Loan Status",
+                   "Payroll Status", "Transaction Frequency", "Opportunity Tag"]
+SCRIPT_FIELDS = ["Client Name", "Opportunity Tag", "Avg Giro Balance (M)"]
+RELATIONSHIP_FIELDS = ["Client Name", "Tenure Years", "Loyalty Status", "Last Note"]
+
+# Every script cache of the process, so a client's texts can be dropped from all of them
+_caches = weakref.WeakSet()
+
+
+class ScriptCache:
+    """Thread-safe LRU of generated texts; a client's stale entry is dropped when its data changes"""
+
+    def __init__(self, max_entries=SCRIPT_CACHE['max_entries']):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()  # key -> (slot, text)
+        self._slots = {}               # (generator, client ID) -> key
+        self._lock = threading.Lock()
+        _caches.add(self)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _drop(self, key):
+        slot, _ = self._entries.pop(key)
+        if self._slots.get(slot) == key:
+            del self._slots[slot]
+
+    def lookup(self, key):
+        """Cached text for key, or None"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][1]
+            self.misses += 1
+            return None
+
+    def contains(self, key):
+        """Whether key is cached, without touching the counters or the LRU order"""
+        with self._lock:
+            return key in self._entries
+
+    def store(self, key, slot, text):
+        """Cache a text; slot identifies the (generator, client) it belongs to"""
+        with self._lock:
+            stale = self._slots.get(slot)
+            if stale is not None and stale != key and stale in self._entries:
+                # Same client and generator with different data: the old text is outdated
+                self._drop(stale)
+                self.invalidations += 1
+            self._entries[key] = (slot, text)
+            self._entries.move_to_end(key)
+            self._slots[slot] = key
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get(self, key, slot, build):
+        """Cached text for key, or build() and store it"""
+        text = self.lookup(key)
+        if text is None:
+            # Build outside the lock; a concurrent miss just builds the same text twice
+            text = build()
+            self.store(key, slot, text)
+        return text
+
+    def client_ids(self):
+        """IDs of the clients with cached texts"""
+        with self._lock:
+            return {client_id for _, client_id in self._slots}
+
+    def invalidate(self, client_ids):
+        """Drop every cached text of the given clients"""
+        client_ids = set(client_ids)
+        with self._lock:
+            for slot in [slot for slot in self._slots if slot[1] in client_ids]:
+                self._drop(self._slots[slot])
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._slots.clear()
+
+    def stats(self):
+        """Hit/miss/eviction counters and hit rate"""
+        requests = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'hit_rate': self.hits / requests if requests else 0.0
+        }
+
+
+def plain_value(value):
+    """Python scalar for numpy values, so equal data hashes equally in every schema"""
+    return value.item() if hasattr(value, "item") else value
+
+
+def text_key(generator, values, settings=(USER_PROFILE, THRESHOLDS)):
+    """Digest of a generator, the client field values it reads and the settings it formats in"""
+    payload = repr((
+        generator.__module__,
+        generator.__qualname__,
+        tuple(plain_value(value) for value in values),
+        [sorted(setting.items()) for setting in settings]
+    ))
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+_default_cache = ScriptCache()
+
+
+def _text_key(generator, client_row, fields):
+    return text_key(generator, [client_row[field] for field in fields])
+
+
+def _cached(generator, client_row, fields, build):
+    key = _text_key(generator, client_row, fields)
+    slot = (generator.__qualname__, plain_value(client_row.get(CLIENT_ID_COLUMN)))
+    return _default_cache.get(key, slot, build)
+
+
+def cached_analysis(client_row, generator=mock_ai_analysis):
+    """Insights for a client, generated once per distinct client data"""
+    return _cached(generator, client_row, ANALYSIS_FIELDS, lambda: generator(client_row))
+
+
+def cached_script(client_row, generator=generate_script):
+    """WhatsApp opportunity script for a client, generated once per distinct client data"""
+    return _cached(generator, client_row, SCRIPT_FIELDS, lambda: generator(
+        client_row['Client Name'],
+        client_row['Opportunity Tag'],
+        client_row['Avg Giro Balance (M)']
+    ))
+
+
+def cached_relationship_script(client_row, generator=generate_relationship_script):
+    """Relationship greeting script for a client, generated once per distinct client data"""
+    return _cached(generator, client_row, RELATIONSHIP_FIELDS, lambda: generator(client_row))
+
+
+def has_cached_analysis(client_row, generator=mock_ai_analysis):
+    """Whether a client's insights are cached; not counted as a cache request"""
+    return _default_cache.contains(_text_key(generator, client_row, ANALYSIS_FIELDS))
+
+
+def has_cached_script(client_row, generator=generate_script):
+    """Whether a client's opportunity script is cached; not counted as a cache request"""
+    return _default_cache.contains(_text_key(generator, client_row, SCRIPT_FIELDS))
+
+
+def invalidate_client(client_id):
+    """Drop the cached texts of a client whose data changed, in every script cache"""
+    for cache in list(_caches):
+        cache.invalidate([plain_value(client_id)])
+
+
+def changed_clients(old, new, client_ids, fields=ANALYSIS_FIELDS + SCRIPT_FIELDS + RELATIONSHIP_FIELDS):
+    """The given client IDs whose generator fields differ between two frames, or that are missing from either"""
+    client_ids = pd.Index(sorted(client_ids, key=repr))
+    old_positions = pd.Index(old[CLIENT_ID_COLUMN]).get_indexer(client_ids)
+    new_positions = pd.Index(new[CLIENT_ID_COLUMN]).get_indexer(client_ids)
+    changed = (old_positions < 0) | (new_positions < 0)
+    # Only the cached clients' rows are read; missing ones are already marked changed
+    old_positions, new_positions = np.maximum(old_positions, 0), np.maximum(new_positions, 0)
+    for field in dict.fromkeys(fields):
+        old_values = old[field].iloc[old_positions].to_numpy(dtype=object)
+        new_values = new[field].iloc[new_positions].to_numpy(dtype=object)
+        changed |= old_values != new_values
+    return client_ids[changed].tolist()
+
+
+def _invalidate_changed_clients(old, new):
+    """Dataset reload listener: drop the texts of cached clients whose data changed"""
+    for cache in list(_caches):
+        client_ids = cache.client_ids()
+        if client_ids:
+            cache.invalidate(changed_clients(old, new, client_ids))
+
+
+on_dataset_reload(_invalidate_changed_clients)
+
+
+def script_cache_stats():
+    """Counters of the process-wide script cache"""
+    return _default_cache.stats()
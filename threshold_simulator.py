@@ -0,0 +1,114 @@
+"""
+Threshold what-if simulator
+Re-tags only the clients whose giro balance lies between an old and a new threshold
+"""
+
+import numpy as np
+import pandas as pd
+
+from config import THRESHOLDS, OPPORTUNITY_RULES, DEFAULT_OPPORTUNITY
+from rules_engine import GIRO_COLUMN, evaluate_tag_codes, opportunity_tags, potential_values
+
+
+class ThresholdSimulator:
+    """Incremental re-tagging over a sorted index on Avg Giro Balance (M)"""
+
+    def __init__(self, df, rules=OPPORTUNITY_RULES, thresholds=THRESHOLDS, default=DEFAULT_OPPORTUNITY):
+        self.rules = rules
+        self.default = default
+        self.thresholds = dict(thresholds)
+        self.tags = opportunity_tags(rules, default)
+
+        columns = [GIRO_COLUMN] + sorted({
+            condition['column'] for rule in rules for condition in rule['conditions']
+        } - {GIRO_COLUMN})
+        order = np.argsort(df[GIRO_COLUMN].to_numpy(), kind="stable")
+        self._sorted = df[columns].iloc[order].reset_index(drop=True)
+        self._giro = self._sorted[GIRO_COLUMN].to_numpy()
+        # Thresholds that only ever gate the giro column can be updated incrementally
+        self._giro_keys = self._threshold_keys(lambda column: column == GIRO_COLUMN)
+        self._other_keys = self._threshold_keys(lambda column: column != GIRO_COLUMN)
+
+        self._baseline = evaluate_tag_codes(self._sorted, rules, self.thresholds)
+        self._codes = self._baseline.copy()
+        self._potential = potential_values(self._giro, self._codes, rules, default)
+
+        n_tags = len(self.tags)
+        self.counts = np.bincount(self._codes, minlength=n_tags)
+        self.potential_totals = np.bincount(self._codes, weights=self._potential, minlength=n_tags)
+        self._baseline_counts = self.counts.copy()
+        self._baseline_potential = self.potential_totals.copy()
+        self._flips = np.diag(self.counts).astype(np.int64)
+        self.last_evaluated = len(self._codes)
+
+    def _threshold_keys(self, predicate):
+        return {
+            condition['threshold']
+            for rule in self.rules for condition in rule['conditions']
+            if 'threshold' in condition and predicate(condition['column'])
+        }
+
+    def _affected_ranges(self, changes):
+        """Row ranges in sorted order whose tag may change, merged"""
+        ranges = []
+        for key, new_value in changes.items():
+            old_value = self.thresholds[key]
+            if key in self._other_keys:
+                return [(0, len(self._giro))]
+            if key not in self._giro_keys or new_value == old_value:
+                continue
+            low, high = sorted((old_value, new_value))
+            ranges.append((
+                int(np.searchsorted(self._giro, low, side="left")),
+                int(np.searchsorted(self._giro, high, side="right"))
+            ))
+
+        merged = []
+        for start, stop in sorted(ranges):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], stop))
+            else:
+                merged.append((start, stop))
+        return merged
+
+    def _retag(self, start, stop):
+        """Re-evaluate one slice and apply the difference to the running totals"""
+        n_tags = len(self.tags)
+        old_codes = self._codes[start:stop]
+        old_potential = self._potential[start:stop]
+        new_codes = evaluate_tag_codes(self._sorted.iloc[start:stop], self.rules, self.thresholds)
+        new_potential = potential_values(self._giro[start:stop], new_codes, self.rules, self.default)
+
+        self.counts += np.bincount(new_codes, minlength=n_tags) - np.bincount(old_codes, minlength=n_tags)
+        self.potential_totals += (np.bincount(new_codes, weights=new_potential, minlength=n_tags)
+                                  - np.bincount(old_codes, weights=old_potential, minlength=n_tags))
+
+        baseline = self._baseline[start:stop].astype(np.int64)
+        self._flips -= np.bincount(baseline * n_tags + old_codes, minlength=n_tags * n_tags).reshape(n_tags, n_tags)
+        self._flips += np.bincount(baseline * n_tags + new_codes, minlength=n_tags * n_tags).reshape(n_tags, n_tags)
+
+        self._codes[start:stop] = new_codes
+        self._potential[start:stop] = new_potential
+        return stop - start
+
+    def set_thresholds(self, **changes):
+        """Move one or more thresholds; returns the number of clients re-evaluated"""
+        ranges = self._affected_ranges(changes)
+        self.thresholds.update(changes)
+        self.last_evaluated = sum(self._retag(start, stop) for start, stop in ranges)
+        return self.last_evaluated
+
+    def summary(self):
+        """Client count and potential value per tag, baseline vs simulated"""
+        return pd.DataFrame({
+            "Tag": self.tags,
+            "Klien (Awal)": self._baseline_counts,
+            "Klien (Simulasi)": self.counts,
+            "Perubahan": self.counts - self._baseline_counts,
+            "Potensi Awal (M)": self._baseline_potential.round(1),
+            "Potensi Simulasi (M)": self.potential_totals.round(1)
+        })
+
+    def flip_matrix(self):
+        """Clients per (baseline tag, simulated tag) pair"""
+        return pd.DataFrame(self._flips, index=self.tags, columns=self.tags)